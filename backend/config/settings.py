@@ -1,28 +1,206 @@
 # config/settings.py
 import os
-from dotenv import load_dotenv
+import threading
+from typing import Any, Callable
 
-# Load environment variables from a .env file
-load_dotenv()
+_env_loaded = False
+
+
+def _load_env() -> None:
+    # The .env file is read when the first setting is accessed, not at import
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def _to_bool(value: str) -> bool:
+    return value.lower() == "true"
+
+
+class env:
+    """
+    Setting read from an environment variable on first access
+
+    The value is stored on the settings instance, so later reads are plain
+    attribute lookups and tests can still assign a setting directly.
+    """
+
+    def __init__(self, variable: str, default: str, cast: Callable[[str], Any] = str):
+        self.variable = variable
+        self.default = default
+        self.cast = cast
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        _load_env()
+        value = self.cast(os.getenv(self.variable, self.default))
+        instance.__dict__[self.name] = value
+        return value
+
+
+class deferred:
+    """
+    Module-level instance built from settings on first use
+
+    Service modules keep their global instances, but building them reads
+    settings, so it waits until something uses the instance and importing
+    the app doesn't read the .env file. Attribute and item access is passed
+    through to the instance, and so are calls.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _get(self) -> Any:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._get()(*args, **kwargs)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._get(), name, value)
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __setitem__(self, key, value) -> None:
+        self._get()[key] = value
+
+    def __delitem__(self, key) -> None:
+        del self._get()[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._get()
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self) -> int:
+        return len(self._get())
 
 
 class Settings:
     """Application settings and configuration"""
     
     # API Keys
-    GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
-    ELEVENLABS_API_KEY: str = os.getenv("ELEVENLABS_API_KEY", "")
-    SERPAPI_API_KEY: str = os.getenv("SERPAPI_KEY", "")
+    GEMINI_API_KEY: str = env("GEMINI_API_KEY", "")
+    ELEVENLABS_API_KEY: str = env("ELEVENLABS_API_KEY", "")
+    SERPAPI_API_KEY: str = env("SERPAPI_KEY", "")
     
     # Server settings
-    HOST: str = os.getenv("HOST", "0.0.0.0")
-    PORT: int = int(os.getenv("PORT", "8000"))
-    DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
+    HOST: str = env("HOST", "0.0.0.0")
+    PORT: int = env("PORT", "8000", int)
+    DEBUG: bool = env("DEBUG", "True", _to_bool)
+    
+    # Upstream HTTP connection pools (shared per provider for the life of the app)
+    HTTP_MAX_CONNECTIONS: int = env("HTTP_MAX_CONNECTIONS", "50", int)
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = env("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20", int)
+    HTTP_KEEPALIVE_EXPIRY: float = env("HTTP_KEEPALIVE_EXPIRY", "60", float)
+    HTTP2_ENABLED: bool = env("HTTP2_ENABLED", "False", _to_bool)
+    HTTP_CONNECT_TIMEOUT: float = env("HTTP_CONNECT_TIMEOUT", "5", float)
+    HTTP_READ_TIMEOUT: float = env("HTTP_READ_TIMEOUT", "60", float)
     
     # Audio settings
     AUDIO_DIR: str = "audio"
     GENERATED_AUDIO_DIR: str = "audio/generated"
     CLASSIC_AUDIO_DIR: str = "audio/classic"
+    FIXED_PHRASE_AUDIO_DIR: str = "audio/phrases"
+    
+    # Clips rendered at the same time by generate_classic_responses.py
+    PRERENDER_CONCURRENCY: int = env("PRERENDER_CONCURRENCY", "4", int)
+    
+    # Recently played clips served from memory by the /audio mount
+    AUDIO_HOT_CACHE_MAX_BYTES: int = env("AUDIO_HOT_CACHE_MAX_BYTES", str(32 * 1024 * 1024), int)
+    AUDIO_HOT_CACHE_MAX_FILE_BYTES: int = env("AUDIO_HOT_CACHE_MAX_FILE_BYTES", str(2 * 1024 * 1024), int)
+    
+    # Raw PCM format requested from ElevenLabs for streamed answers
+    ELEVENLABS_STREAM_FORMAT: str = env("ELEVENLABS_STREAM_FORMAT", "pcm_22050")
+    
+    # Compact audio formats served on request (Opus via libsndfile, AAC via ffmpeg)
+    OPUS_SAMPLE_RATE: int = env("OPUS_SAMPLE_RATE", "24000", int)
+    OPUS_COMPRESSION_LEVEL: float = env("OPUS_COMPRESSION_LEVEL", "0.9", float)  # ~30 kbps for speech
+    AAC_BITRATE: str = env("AAC_BITRATE", "48k")
+    FFMPEG_PATH: str = env("FFMPEG_PATH", "ffmpeg")
+    
+    # Audio DSP worker pool (0 workers processes audio in the calling thread).
+    # By default one core is left to the event loop.
+    DSP_POOL_WORKERS: int = env("DSP_POOL_WORKERS", str(min(4, (os.cpu_count() or 1) - 1)), int)
+    DSP_POOL_MAX_QUEUE: int = env("DSP_POOL_MAX_QUEUE", "32", int)
+    DSP_QUEUE_TIMEOUT: float = env("DSP_QUEUE_TIMEOUT", "10", float)
+    
+    # Audio cache settings
+    AUDIO_CACHE_MAX_BYTES: int = env("AUDIO_CACHE_MAX_BYTES", str(256 * 1024 * 1024), int)
+    AUDIO_CACHE_MAX_ENTRIES: int = env("AUDIO_CACHE_MAX_ENTRIES", "2000", int)
+    AUDIO_CACHE_EVICTION_POLICY: str = env("AUDIO_CACHE_EVICTION_POLICY", "lru")  # lru, age or access_count
+    AUDIO_CACHE_MAX_AGE: float = env("AUDIO_CACHE_MAX_AGE", "0", float)  # Seconds, 0 keeps clips until evicted
+    AUDIO_CACHE_SWEEP_INTERVAL: float = env("AUDIO_CACHE_SWEEP_INTERVAL", "60", float)
+    
+    # Reservoir of ready-made answers with audio for the cryptic and annoyed personas
+    RESERVOIR_DEPTH: int = env("RESERVOIR_DEPTH", "8", int)  # Answers kept per voice, 0 disables
+    RESERVOIR_MAX_AGE: float = env("RESERVOIR_MAX_AGE", "3600", float)  # Seconds, 0 keeps answers until used
+    RESERVOIR_NO_REPEAT: int = env("RESERVOIR_NO_REPEAT", "20", int)  # Recent answers a client won't get again
+    RESERVOIR_IDLE_DELAY: float = env("RESERVOIR_IDLE_DELAY", "2", float)  # Quiet seconds before refilling
+    
+    # Food questions the local intent classifier is at least this sure about skip the LLM
+    INTENT_CONFIDENCE_THRESHOLD: float = env("INTENT_CONFIDENCE_THRESHOLD", "0.9", float)
+    
+    # Speaking LLM answers sentence by sentence while Gemini is still generating them
+    SPEECH_PIPELINE_ENABLED: bool = env("SPEECH_PIPELINE_ENABLED", "True", _to_bool)
+    SPEECH_PIPELINE_CONCURRENCY: int = env("SPEECH_PIPELINE_CONCURRENCY", "3", int)  # ElevenLabs requests per answer
+    SPEECH_PIPELINE_MIN_SENTENCE_CHARS: int = env("SPEECH_PIPELINE_MIN_SENTENCE_CHARS", "30", int)  # Shorter ones join the next
+    
+    # Micro-batching of concurrent LLM calls of the same persona
+    LLM_BATCH_PERSONAS: str = env("LLM_BATCH_PERSONAS", "cryptic,annoyed")  # Empty disables batching
+    LLM_BATCH_WINDOW_MS: float = env("LLM_BATCH_WINDOW_MS", "20", float)  # How long a batch collects questions
+    LLM_BATCH_MAX_ITEMS: int = env("LLM_BATCH_MAX_ITEMS", "8", int)  # A full batch is sent at once
+    
+    # Deadline budgets: each request's upstream calls share REQUEST_BUDGET_MS, and each
+    # stage (a food pipeline stage or an upstream call) is also held to its own sub-budget
+    REQUEST_BUDGET_MS: float = env("REQUEST_BUDGET_MS", "20000", float)  # 0 disables the request deadline
+    STAGE_BUDGETS_MS: str = env("STAGE_BUDGETS_MS", "intent=4000,search=6000,annoyed=8000,description=12000,llm=10000,tts=10000")
+    
+    # Hedged upstream requests: a call slower than this percentile of recent ones is sent again
+    HEDGE_UPSTREAMS: str = env("HEDGE_UPSTREAMS", "gemini,serpapi,elevenlabs")  # Empty disables hedging
+    HEDGE_PERCENTILE: float = env("HEDGE_PERCENTILE", "95", float)
+    HEDGE_MIN_SAMPLES: int = env("HEDGE_MIN_SAMPLES", "20", int)  # Calls seen before hedging starts
+    
+    # Circuit breakers: a provider failing (or slower than BREAKER_SLOW_CALL_MS) on this share of
+    # its recent calls is skipped for BREAKER_OPEN_SECONDS, then probed before it is used again
+    BREAKER_FAILURE_RATE: float = env("BREAKER_FAILURE_RATE", "0.5", float)
+    BREAKER_SLOW_CALL_MS: float = env("BREAKER_SLOW_CALL_MS", "8000", float)  # 0 ignores latency
+    BREAKER_WINDOW: int = env("BREAKER_WINDOW", "20", int)  # Recent calls the failure rate is taken over
+    BREAKER_MIN_CALLS: int = env("BREAKER_MIN_CALLS", "5", int)  # Calls seen before the breaker can open
+    BREAKER_OPEN_SECONDS: float = env("BREAKER_OPEN_SECONDS", "30", float)
+    BREAKER_HALF_OPEN_PROBES: int = env("BREAKER_HALF_OPEN_PROBES", "1", int)  # Trial calls while half-open
+    
+    # Prometheus-style /metrics endpoint with request, stage, upstream and cache metrics
+    METRICS_ENABLED: bool = env("METRICS_ENABLED", "True", _to_bool)
+    
+    # LLM response cache (in-process LRU in front of a SQLite file).
+    # Personas not listed in LLM_CACHE_POLICIES always ask Gemini afresh.
+    LLM_CACHE_PATH: str = env("LLM_CACHE_PATH", "cache/llm_responses.sqlite3")
+    LLM_CACHE_TTL: float = env("LLM_CACHE_TTL", "86400", float)
+    LLM_CACHE_MAX_ENTRIES: int = env("LLM_CACHE_MAX_ENTRIES", "1000", int)
+    LLM_CACHE_MAX_DISK_ENTRIES: int = env("LLM_CACHE_MAX_DISK_ENTRIES", "50000", int)
+    LLM_CACHE_POLICIES: str = env("LLM_CACHE_POLICIES", "cryptic=reuse,annoyed=reuse,food_intent=reuse,food=fresh")
     
     # CORS settings
     CORS_ORIGINS: list[str] = ["*"]  # In production, specify your frontend domains
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Food-Intent Classifier Evaluation
+Runs the local food-intent classifier over a labelled set of questions and
+reports its accuracy, how many LLM calls it avoids at a confidence threshold,
+and how long a classification takes
+
+Usage: python evaluate_intent_classifier.py [--threshold T] [--errors]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from config.settings import settings
+from services.intent_classifier import FoodIntentClassifier
+
+# Labelled questions: (question, is_food_related)
+LABELLED_QUESTIONS = [
+    ("What should I eat?", True),
+    ("What should I eat for dinner tonight?", True),
+    ("Where should I go for lunch?", True),
+    ("I'm starving, help", True),
+    ("I'm so hungry", True),
+    ("Pizza or burgers?", True),
+    ("Where can I get good sushi near me?", True),
+    ("Any halal nasi lemak around here?", True),
+    ("I feel like having something spicy", True),
+    ("Best ramen place nearby?", True),
+    ("What's for breakfast?", True),
+    ("Should I get bubble tea?", True),
+    ("Korean bbq or hotpot?", True),
+    ("I want vegetarian food", True),
+    ("Recommend a cheap restaurant", True),
+    ("Where do I find good dim sum?", True),
+    ("Craving dessert, what now?", True),
+    ("What should I order for delivery?", True),
+    ("Is there a good cafe around?", True),
+    ("Steak or seafood tonight?", True),
+    ("Where to eat after work?", True),
+    ("I need coffee", True),
+    ("Mamak or mcd?", True),
+    ("What is a good healthy meal?", True),
+    ("Need a snack", True),
+    ("Tacos?", True),
+    ("What should I have for supper?", True),
+    ("Thai food or Indian curry?", True),
+    ("Where can I get roti canai?", True),
+    ("Something warm like soup maybe", True),
+    ("Is pineapple on pizza acceptable?", True),
+    ("Any good laksa in town?", True),
+    ("Should I quit my job?", False),
+    ("Will I find love?", False),
+    ("What is the meaning of life?", False),
+    ("Should I text them?", False),
+    ("Will it rain tomorrow?", False),
+    ("Should I buy a new car?", False),
+    ("Is my crush into me?", False),
+    ("Will I pass my exam?", False),
+    ("Should I invest in crypto?", False),
+    ("What movie should I watch?", False),
+    ("Should I get a haircut?", False),
+    ("Do I need a new laptop?", False),
+    ("Is my boss angry at me?", False),
+    ("Should I study tonight or sleep?", False),
+    ("What game should I play?", False),
+    ("Will my ex come back?", False),
+    ("Should I travel to Japan?", False),
+    ("Am I going to be rich?", False),
+    ("Is today my lucky day?", False),
+    ("Should I call my mom?", False),
+    ("Tell me a joke", False),
+    ("What song should I listen to?", False),
+    ("Should I learn to dance?", False),
+    ("Are aliens real?", False),
+    ("Should I adopt a cat?", False),
+    ("Will my team win the match?", False),
+    ("Should I move to a new city?", False),
+    ("What's my horoscope?", False),
+]
+
+
+class Evaluation(NamedTuple):
+    """Results of running the classifier over the labelled set"""
+    total: int
+    correct: int            # Local predictions that match the label
+    confident: int          # Predictions at or above the threshold (answered without the LLM)
+    confident_correct: int  # Confident predictions that match the label
+    mean_us: float          # Mean classification time in microseconds
+    errors: list            # (question, label, prediction) for every wrong local prediction
+
+
+def evaluate(threshold: float, repeat: int = 200) -> Evaluation:
+    """
+    Evaluate the classifier on LABELLED_QUESTIONS
+
+    Args:
+        threshold: Confidence at which the LLM is skipped
+        repeat: Timing repetitions per question
+
+    Returns:
+        Accuracy, coverage and timing figures
+    """
+    classifier = FoodIntentClassifier(threshold)
+    correct = confident = confident_correct = 0
+    errors = []
+    for question, label in LABELLED_QUESTIONS:
+        prediction = classifier.classify(question)
+        hit = prediction.is_food_related == label
+        correct += hit
+        if prediction.confidence >= threshold:
+            confident += 1
+            confident_correct += hit
+        if not hit:
+            errors.append((question, label, prediction))
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for question, _ in LABELLED_QUESTIONS:
+            classifier.classify(question)
+    mean_us = (time.perf_counter() - started) / (repeat * len(LABELLED_QUESTIONS)) * 1e6
+
+    return Evaluation(len(LABELLED_QUESTIONS), correct, confident, confident_correct, mean_us, errors)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Evaluate the local food-intent classifier")
+    parser.add_argument("--threshold", type=float, default=settings.INTENT_CONFIDENCE_THRESHOLD,
+                        help="Confidence at which the LLM is skipped")
+    parser.add_argument("--errors", action="store_true", help="List the misclassified questions")
+    args = parser.parse_args()
+
+    result = evaluate(args.threshold)
+
+    print("🍽️  Food-Intent Classifier Evaluation")
+    print("=" * 60)
+    print(f"Labelled questions:          {result.total}")
+    print(f"Local accuracy (all):        {result.correct / result.total:.1%}")
+    if result.confident:
+        print(f"Accuracy above threshold:    {result.confident_correct / result.confident:.1%} "
+              f"({result.confident} questions)")
+    print(f"LLM calls avoided:           {result.confident / result.total:.1%} at threshold {args.threshold}")
+    # Deferred questions are assumed to be answered correctly by the LLM
+    combined = result.confident_correct + (result.total - result.confident)
+    print(f"Accuracy with LLM fallback:  {combined / result.total:.1%} (assuming the LLM is right)")
+    print(f"Mean classification time:    {result.mean_us:.1f} µs")
+
+    if args.errors and result.errors:
+        print()
+        print("Misclassified:")
+        for question, label, prediction in result.errors:
+            print(f"  {'food' if label else 'not food':>8}  {prediction.confidence:.2f}  {question}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
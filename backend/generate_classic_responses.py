@@ -1,10 +1,30 @@
 #!/usr/bin/env python3
 """
 Generate Classic Conch Responses with Deep_Ah Voice
-Creates unique versions of the classic responses: Yes, No, Maybe, and Definitely not
-Each response will have a unique mystical variation based on the deep_ah vampire voice
+Pre-renders every line of a phrase catalog (by default the classic answers:
+Yes, No, Maybe, Ask again later and Definitely not) straight into the classic
+answer bank, a few clips at a time.
+
+A manifest of content hashes and rendering parameters is kept next to the
+clips, so running the tool again only renders lines whose text, voice,
+voice settings, model or reverb changed.
+
+Usage:
+    python generate_classic_responses.py
+    python generate_classic_responses.py --catalog phrases.json --concurrency 8
+    python generate_classic_responses.py --force
+    python generate_classic_responses.py --force --overwrite-legacy
+
+A catalog is a JSON object mapping each answer to the lines spoken for it,
+e.g. {"Yes": ["Yes.", "Yessss... it is certain."]}.
+
+Lines still served from the legacy british_lady clips, which are tracked in
+git, are never rendered over unless --overwrite-legacy is given.
 """
 
+import argparse
+import asyncio
+import json
 import os
 import sys
 from pathlib import Path
@@ -13,210 +33,123 @@ from pathlib import Path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
-from services.tts_service import generate_audio_for_text, get_available_voices, is_voice_available
+from config.settings import settings
+from services.answer_bank import CLASSIC_ANSWERS, LEGACY_CLIPS, ClassicAnswerBank
+from services.clients import upstream_clients
+from services.prerender import MANIFEST_FILENAME, PrerenderManifest, catalog_jobs, prerender
+from services.tts_service import get_audio_cache_key, get_available_voices, is_voice_available
 
 
-def create_classic_responses():
-    """Generate the four classic conch responses with unique mystical variations"""
-    
-    print("🧛‍♂️ Generating Classic Conch Responses with Deep_Ah Vampire Voice")
+def load_catalog(path: str) -> dict:
+    """Read a phrase catalog mapping answers to their lines"""
+    with open(path, "r", encoding="utf-8") as f:
+        catalog = json.load(f)
+    return {answer: [lines] if isinstance(lines, str) else list(lines) for answer, lines in catalog.items()}
+
+
+async def create_classic_responses(catalog: dict, voices: list, concurrency: int, force: bool = False,
+                                   prune: bool = False, dry_run: bool = False,
+                                   overwrite_legacy: bool = False) -> bool:
+    """Pre-render every catalog line that changed since the last run"""
+
+    print("🧛‍♂️ Generating Classic Conch Responses")
     print("=" * 70)
-    
-    # Check if deep_ah voice is available
-    if not is_voice_available("deep_ah"):
-        print("❌ Error: deep_ah voice is not available!")
-        print("Available voices:", list(get_available_voices().keys()))
-        return False
-    
-    print("✅ Deep_ah voice is available!")
-    print("🎭 Voice: Deep Ah - Nosferatu Ancient Vampire Lord (Matthew Schmitz)")
-    print()
-    
-    # Define unique mystical variations for each classic response (short for <5 seconds)
-    responses = {
-        "yes": {
-            "text": "Yessss... it is certain.",
-            "filename": "yes.mp3",
-            "description": "Short mystical affirmative response"
-        },
-        "no": {
-            "text": "Noooo... forbidden.",
-            "filename": "No.mp3", 
-            "description": "Short dark rejection"
-        },
-        "maybe": {
-            "text": "Perhaps... unclear.",
-            "filename": "Maybe.mp3",
-            "description": "Short mystical uncertainty"
-        },
-        "definitely_not": {
-            "text": "Never... foolish mortal.",
-            "filename": "Definietly_not.mp3",  # Keep original filename spelling
-            "description": "Short strong rejection"
-        }
-    }
-    
-    # Create output directory for new responses
-    output_dir = Path("audio/classic/deep_ah_responses")
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    print(f"📁 Output directory: {output_dir}")
+
+    bank = ClassicAnswerBank(settings.CLASSIC_AUDIO_DIR, catalog)
+    manifest = PrerenderManifest(os.path.join(settings.CLASSIC_AUDIO_DIR, MANIFEST_FILENAME)).load()
+    jobs = catalog_jobs(catalog, voices, bank.variant_path)
+    # Legacy clips are tracked in git, so they stay as shipped unless asked for
+    legacy = {os.path.join(settings.CLASSIC_AUDIO_DIR, path) for clips in LEGACY_CLIPS.values() for path in clips.values()}
+    kept = [] if overwrite_legacy else [job for job in jobs if job.path in legacy]
+    renderable = [job for job in jobs if job not in kept]
+
+    print(f"📁 Output directory: {settings.CLASSIC_AUDIO_DIR}")
+    print(f"🎭 Voices: {', '.join(voices)}")
+    print(f"📋 {len(jobs)} lines in the catalog, up to {concurrency} rendered at a time")
     print()
-    
-    # Generate each response
-    success_count = 0
-    total_count = len(responses)
-    
-    for response_key, response_data in responses.items():
-        print(f"🎤 Generating '{response_key}'...")
-        print(f"   Text: \"{response_data['text']}\"")
-        print(f"   File: {response_data['filename']}")
-        print(f"   Description: {response_data['description']}")
-        
-        try:
-            # Generate the audio using the TTS service
-            audio_path = generate_audio_for_text(response_data['text'], "deep_ah")
-            
-            # The audio_path will be in the format: /audio/generated/filename_deep_ah.mp3
-            # We need to copy/move it to our desired location with the correct filename
-            
-            print(f"   ✅ Generated: {audio_path}")
-            print(f"   🏛️  Divine reverb effect applied for godly atmosphere")
-            success_count += 1
-            
-        except Exception as e:
-            print(f"   ❌ Error generating {response_key}: {e}")
-        
-        print()
-    
+
+    if prune and not dry_run:
+        for path in manifest.prune(jobs):
+            print(f"🧹 Dropped (no longer in the catalog): {path}")
+
+    for job in kept:
+        print(f"🔒 Kept (legacy clip): {job.path}")
+
+    if dry_run:
+        for job in renderable:
+            if force:
+                status = "🎤 render   "
+            elif manifest.is_current(job, get_audio_cache_key(job.text, job.voice)):
+                status = "✅ unchanged"
+            elif job.path not in manifest.entries and os.path.exists(job.path):
+                status = "📥 adopt    "
+            else:
+                status = "🎤 render   "
+            print(f"{status}  {job.path}  \"{job.text}\"")
+        return True
+
+    try:
+        result = await prerender(renderable, manifest, concurrency=concurrency, force=force)
+    finally:
+        await upstream_clients.shutdown()
+
     # Summary
+    print()
     print("=" * 70)
-    print(f"🎉 Classic Response Generation Complete!")
-    print(f"📊 Success Rate: {success_count}/{total_count} responses generated")
-    
-    if success_count == total_count:
-        print("✅ All responses generated successfully!")
-        print()
-        print("🔄 To replace the british_lady voice:")
-        print("1. The generated files are in audio/generated/ with deep_ah suffix")
-        print("2. Copy them to audio/classic/british_lady/ with the correct names:")
-        print("   - Copy the 'yes' response as 'yes.mp3'")
-        print("   - Copy the 'no' response as 'No.mp3'") 
-        print("   - Copy the 'maybe' response as 'Maybe.mp3'")
-        print("   - Copy the 'definitely_not' response as 'Definietly_not.mp3'")
-        print()
-        print("🎭 Each response now has unique mystical vampire characteristics!")
-        print("🧛‍♂️ Deep, eastern European accent with divine reverb effects")
-        print("🏛️  Cathedral-like atmosphere for otherworldly wisdom")
-        
-    else:
-        print("⚠️  Some responses failed to generate. Check the errors above.")
-    
-    return success_count == total_count
-
-
-def copy_responses_to_british_lady_folder():
-    """Copy the generated responses to replace the british_lady files"""
-    
-    print("\n🔄 Copying Generated Responses to British Lady Folder...")
-    print("=" * 60)
-    
-    import shutil
-    import glob
-    
-    # Source directory (generated files)
-    generated_dir = Path("audio/generated")
-    
-    # Target directory (british_lady folder)
-    british_lady_dir = Path("audio/classic/british_lady")
-    
-    # Make sure british_lady directory exists
-    british_lady_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Mapping of generated files to target names
-    # We'll look for files containing these keywords
-    file_mappings = {
-        "yessss": "yes.mp3",
-        "noooo": "No.mp3",  # "Noooo..." becomes "No.mp3"
-        "perhaps": "Maybe.mp3",  # "Perhaps..." becomes "Maybe.mp3" 
-        "never": "Definietly_not.mp3"  # "Never..." becomes "Definietly_not.mp3"
-    }
-    
-    copied_count = 0
-    
-    for search_term, target_filename in file_mappings.items():
-        try:
-            # Find the generated file containing the search term
-            pattern = f"*{search_term}*_deep_ah*.mp3"
-            matches = list(generated_dir.glob(pattern))
-            
-            if not matches:
-                # Try alternative patterns
-                if search_term == "yessss":
-                    matches = list(generated_dir.glob("*yessss*_deep_ah*.mp3"))
-                elif search_term == "noooo":
-                    matches = list(generated_dir.glob("*noooo*_deep_ah*.mp3"))
-                elif search_term == "perhaps":
-                    matches = list(generated_dir.glob("*perhaps*_deep_ah*.mp3"))
-                elif search_term == "never":
-                    matches = list(generated_dir.glob("*never*_deep_ah*.mp3"))
-            
-            if matches:
-                source_file = matches[0]  # Take the first match
-                target_file = british_lady_dir / target_filename
-                
-                # Copy the file
-                shutil.copy2(source_file, target_file)
-                print(f"✅ Copied: {source_file.name} → {target_filename}")
-                copied_count += 1
-                
-            else:
-                print(f"❌ No generated file found for '{search_term}' pattern: {pattern}")
-                
-        except Exception as e:
-            print(f"❌ Error copying {search_term}: {e}")
-    
-    print(f"\n📊 Copied {copied_count}/{len(file_mappings)} files successfully")
-    
-    if copied_count == len(file_mappings):
-        print("🎉 All classic responses have been replaced with deep_ah vampire voice!")
-        print("🧛‍♂️ The british_lady voice folder now contains mystical vampire responses")
-        print("🏛️  Each response has divine reverb for otherworldly atmosphere")
+    print(f"🎉 Classic Response Generation Complete in {result.seconds:.1f}s!")
+    print(f"📊 Rendered: {len(result.rendered)}, unchanged: {len(result.skipped)}, failed: {len(result.failed)}")
+    for path, error in result.failed.items():
+        print(f"   ❌ {path}: {error}")
+
+    if result.failed:
+        print("⚠️  Some responses failed to generate. Run the tool again to retry only those.")
     else:
-        print("⚠️  Some files could not be copied. You may need to copy them manually.")
-        print("\n📁 Check these directories:")
-        print(f"   Source: {generated_dir}")
-        print(f"   Target: {british_lady_dir}")
-    
-    return copied_count == len(file_mappings)
+        print("✅ The classic answer bank is up to date!")
+
+    return not result.failed
 
 
 def main():
-    """Main function to generate and replace classic responses"""
-    
-    print("🐚 The Conch Voice Replacement Tool")
-    print("Replacing british_lady with unique deep_ah vampire variations")
+    """Main function to pre-render the classic responses"""
+
+    parser = argparse.ArgumentParser(description="Pre-render the classic conch responses")
+    parser.add_argument("--catalog", help="JSON phrase catalog (default: the built-in classic answers)")
+    parser.add_argument("--voice", action="append", help="Voice to render (repeatable, default: every voice)")
+    parser.add_argument("--concurrency", type=int, default=settings.PRERENDER_CONCURRENCY,
+                        help="Clips rendered at the same time")
+    parser.add_argument("--force", action="store_true", help="Render every line, even unchanged ones")
+    parser.add_argument("--overwrite-legacy", action="store_true",
+                        help="Also render over the legacy british_lady clips tracked in git")
+    parser.add_argument("--prune", action="store_true", help="Delete clips no longer in the catalog")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be rendered")
+    args = parser.parse_args()
+
+    print("🐚 The Conch Classic Response Pre-render Tool")
     print()
-    
-    # Step 1: Generate the responses
-    generation_success = create_classic_responses()
-    
-    if generation_success:
-        # Step 2: Copy them to the british_lady folder
-        copy_success = copy_responses_to_british_lady_folder()
-        
-        if copy_success:
-            print("\n🎭 Voice Replacement Complete!")
-            print("🧛‍♂️ The Conch now speaks with the voice of an ancient vampire lord")
-            print("🏛️  Divine reverb effects add otherworldly, godly atmosphere")
-            print("\n🚀 Ready to test:")
-            print("   python test_tts.py")
-            print("   python test_vampire_voice.py")
-            print("   uvicorn main:app --reload")
-        else:
-            print("\n⚠️  Manual copying required - see instructions above")
+
+    voices = args.voice or list(get_available_voices())
+    unavailable = [voice for voice in voices if not is_voice_available(voice)]
+    if unavailable:
+        print(f"❌ Error: voice(s) not available: {', '.join(unavailable)}")
+        print("Available voices:", list(get_available_voices().keys()))
+        sys.exit(1)
+
+    if not settings.ELEVENLABS_API_KEY and not args.dry_run:
+        print("❌ Error: ELEVENLABS_API_KEY is not set")
+        sys.exit(1)
+
+    catalog = load_catalog(args.catalog) if args.catalog else CLASSIC_ANSWERS
+    success = asyncio.run(create_classic_responses(
+        catalog, voices, args.concurrency, force=args.force, prune=args.prune, dry_run=args.dry_run,
+        overwrite_legacy=args.overwrite_legacy
+    ))
+
+    if success:
+        print("\n🚀 Ready to test:")
+        print("   uvicorn main:app --reload")
     else:
         print("\n❌ Generation failed - check your ElevenLabs API key and connection")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Import Time Report
+Measures the cold import of a module in a fresh interpreter (python -X importtime)
+and lists the most expensive modules, so startup cost can be tracked over time
+
+Usage: python import_time_report.py [module] [--top N] [--budget MS]
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+backend_dir = Path(__file__).parent
+
+# Cumulative import time allowed for main.py, in milliseconds
+IMPORT_TIME_BUDGET_MS = 750
+
+# Modules that must only be imported once a request (or the app lifespan) needs them
+LAZY_MODULES = ("numpy", "soundfile", "librosa", "elevenlabs", "google.generativeai", "httpx")
+
+
+class ImportTiming(NamedTuple):
+    """Import cost of one module as reported by -X importtime"""
+    module: str
+    self_us: int        # Time spent in the module itself, in microseconds
+    cumulative_us: int  # Time including the modules it imported, in microseconds
+    depth: int          # Nesting level in the import tree (0 = imported directly)
+
+
+def measure_import(module: str = "main") -> list[ImportTiming]:
+    """
+    Import a module in a fresh interpreter and collect per-module import times
+
+    Args:
+        module: Module to import, relative to the backend directory
+
+    Returns:
+        Import timings in the order the imports finished
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir, capture_output=True, text=True, check=True
+    )
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us), depth))
+    return timings
+
+
+def total_import_ms(timings: list[ImportTiming], module: str = "main") -> float:
+    """
+    Get the cumulative import time of a module
+
+    Args:
+        timings: Timings from measure_import
+        module: Module that was imported
+
+    Returns:
+        Import time in milliseconds
+    """
+    return next(t.cumulative_us for t in timings if t.module == module and t.depth == 0) / 1000
+
+
+def loaded_lazy_modules(timings: list[ImportTiming]) -> list[str]:
+    """
+    Get the lazily loaded libraries that were imported anyway
+
+    Args:
+        timings: Timings from measure_import
+
+    Returns:
+        Names from LAZY_MODULES that appear in the import tree
+    """
+    imported = {t.module for t in timings}
+    return [name for name in LAZY_MODULES if name in imported]
+
+
+def print_report(timings: list[ImportTiming], module: str, top: int) -> None:
+    """Print the slowest modules and the cost per top-level package"""
+    print(f"⏱️  Import time of '{module}': {total_import_ms(timings, module):.0f} ms")
+    print()
+
+    print(f"Slowest {top} modules (self time):")
+    for t in sorted(timings, key=lambda t: t.self_us, reverse=True)[:top]:
+        print(f"  {t.self_us / 1000:8.1f} ms  {t.module}")
+    print()
+
+    packages: dict[str, int] = {}
+    for t in timings:
+        package = t.module.split(".")[0]
+        packages[package] = packages.get(package, 0) + t.self_us
+
+    print(f"Slowest {top} packages (sum of self time):")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report per-module import cost")
+    parser.add_argument("module", nargs="?", default="main", help="Module to import (default: main)")
+    parser.add_argument("--top", type=int, default=15, help="Number of modules to list")
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET_MS,
+                        help="Import time budget in milliseconds")
+    args = parser.parse_args()
+
+    timings = measure_import(args.module)
+    print_report(timings, args.module, args.top)
+    print()
+
+    ok = True
+    total = total_import_ms(timings, args.module)
+    if total > args.budget:
+        print(f"❌ Over budget: {total:.0f} ms > {args.budget:.0f} ms")
+        ok = False
+    else:
+        print(f"✅ Within budget: {total:.0f} ms <= {args.budget:.0f} ms")
+
+    eager = loaded_lazy_modules(timings)
+    if eager:
+        print(f"❌ Imported at startup but should be lazy: {', '.join(eager)}")
+        ok = False
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
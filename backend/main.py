@@ -1,23 +1,57 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 # Import configuration
 from config.settings import settings
 
 # Import route modules
-from routes import classic_router, food_router, open_ended_router, voices_router, voices_router
+from routes import classic_router, food_router, open_ended_router, voices_router, stats_router, metrics_router
+
+# Import shared resources managed by the app lifespan
+from services.answer_bank import classic_bank
+from services.answer_reservoir import annoyed_reservoir, cryptic_reservoir
+from services.audio_cache import audio_cache
+from services.audio_files import audio_files
+from services.clients import upstream_clients
+from services.deadline import DeadlineMiddleware
+from services.dsp_pool import dsp_pool
+from services.llm_cache import llm_cache
+from services.metrics import MetricsMiddleware, TimedJSONResponse, metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start shared resources when the app boots and release them on shutdown"""
+    await upstream_clients.startup()
+    dsp_pool.start()
+    await audio_cache.start()
+    await classic_bank.startup()
+    await cryptic_reservoir.start()
+    await annoyed_reservoir.start()
+    yield
+    await annoyed_reservoir.shutdown()
+    await cryptic_reservoir.shutdown()
+    await classic_bank.shutdown()
+    await audio_cache.shutdown()
+    dsp_pool.shutdown()
+    llm_cache.close()
+    await upstream_clients.shutdown()
+
 
 # Create FastAPI application
 app = FastAPI(
     title="TheConch API",
     description="The All-Knowing, All-Ignoring Magic Conch Backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # JSON encoding is timed as the "serialize" stage
+    default_response_class=TimedJSONResponse
 )
 
-# Mount the audio directory to serve static files
-app.mount("/audio", StaticFiles(directory=settings.AUDIO_DIR), name="audio")
+# Mount the audio directory (hot clips from memory, ETag, Range and immutable caching)
+app.mount("/audio", audio_files, name="audio")
 
 # Add CORS middleware for frontend access
 app.add_middleware(
@@ -28,11 +62,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Give every request a deadline budget shared by its upstream calls
+app.add_middleware(DeadlineMiddleware)
+
+# Count and time every request by route (outermost, so it sees the whole request)
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 # Include all route modules
 app.include_router(classic_router)
 app.include_router(food_router)
 app.include_router(open_ended_router)
 app.include_router(voices_router)
+app.include_router(stats_router)
+app.include_router(metrics_router)
 
 
 @app.api_route("/", methods=["GET", "HEAD"])
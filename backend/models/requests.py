@@ -5,6 +5,7 @@ from pydantic import BaseModel
 class OpenQuestion(BaseModel):
     question: str
     voice: str = "deep_ah"  # Default to mystical vampire voice for conch
+    audio_format: str | None = None  # "mp3", "opus" or "aac"; defaults to the Accept header, then MP3
 
 
 class FoodQuestion(BaseModel):
@@ -12,7 +13,9 @@ class FoodQuestion(BaseModel):
     latitude: float | None = None  # User's latitude
     longitude: float | None = None  # User's longitude
     voice: str = "deep_ah"  # Default to vampire voice for mystical food recommendations
+    audio_format: str | None = None  # "mp3", "opus" or "aac"; defaults to the Accept header, then MP3
 
 
 class VoiceChoice(BaseModel):
     voice: str = "deep_ah"  # Only deep_ah voice is available
+    audio_format: str | None = None  # "mp3", "opus" or "aac"; defaults to the Accept header, then MP3
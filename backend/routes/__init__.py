@@ -3,5 +3,8 @@ from .classic import router as classic_router
 from .food import router as food_router
 from .open_ended import router as open_ended_router
 from .voices import router as voices_router
+from .stats import router as stats_router
+from .metrics import router as metrics_router
 
-__all__ = ["classic_router", "food_router", "open_ended_router", "voices_router"]
+__all__ = ["classic_router", "food_router", "open_ended_router", "voices_router", "stats_router",
+           "metrics_router"]
@@ -1,22 +1,27 @@
 # routes/classic.py
 import random
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
 from models.requests import VoiceChoice
 from models.responses import ConchResponse
-from services.tts_service import generate_audio_for_text, is_voice_available
+from services.answer_bank import CLASSIC_ANSWERS, classic_bank
+from services.transcode import get_audio_url_for_format_async, negotiate_audio_format
+from services.tts_service import generate_audio_for_text_async, is_voice_available
 
 router = APIRouter(prefix="/api", tags=["classic"])
 
 
 @router.post("/classic", response_model=ConchResponse)
-async def get_classic_conch_answer(voice_choice: VoiceChoice):
+async def get_classic_conch_answer(voice_choice: VoiceChoice, accept: str | None = Header(default=None)):
     """
-    Provides a classic Yes/No style answer with deep_ah voice using ElevenLabs TTS.
+    Provides a classic Yes/No style answer with deep_ah voice.
+    Answers come from the pre-rendered answer bank; ElevenLabs TTS is only
+    used for answers the bank has no clip for yet.
     Only deep_ah voice is available.
+    The audio format is taken from the audio_format field or the Accept header.
     """
     try:
         # Classic conch answers
-        answer = random.choice(["Yes", "No", "Maybe", "Ask again later", "Definitely not"])
+        answer = random.choice(list(CLASSIC_ANSWERS))
         
         # Validate voice and use fallback if needed
         voice = voice_choice.voice
@@ -24,8 +29,15 @@ async def get_classic_conch_answer(voice_choice: VoiceChoice):
             print(f"Warning: Voice '{voice}' not available. Using 'deep_ah' as fallback.")
             voice = 'deep_ah'
         
-        # Generate audio using the improved TTS service
-        audio_path = generate_audio_for_text(answer, voice)
+        # Serve a pre-rendered variant, or generate one if the bank has none yet
+        clip = classic_bank.pick(answer, voice)
+        if clip:
+            audio_path = clip.url
+        else:
+            audio_path = await generate_audio_for_text_async(answer, voice)
+        
+        audio_format = negotiate_audio_format(voice_choice.audio_format, accept)
+        audio_path = await get_audio_url_for_format_async(audio_path, audio_format)
             
         return ConchResponse(
             message=answer,
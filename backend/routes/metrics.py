@@ -0,0 +1,24 @@
+# routes/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services.circuit_breaker import HALF_OPEN, OPEN
+from services.deadline import circuit_breaker_stats
+from services.metrics import metrics
+
+router = APIRouter(tags=["metrics"])
+
+# Prometheus text exposition format
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Get request counts and latencies, requests in flight and server errors per endpoint,
+    latency histograms per stage and upstream provider, cache hits per endpoint and
+    circuit breaker states, in the Prometheus text format.
+    """
+    for provider, breaker in circuit_breaker_stats().items():
+        state = breaker["state"]
+        metrics.breaker_state.set(1.0 if state == OPEN else 0.5 if state == HALF_OPEN else 0.0, provider)
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
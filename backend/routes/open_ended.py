@@ -1,24 +1,34 @@
 # routes/open_ended.py
-from fastapi import APIRouter, HTTPException
+import asyncio
+import itertools
+import os
+from urllib.parse import quote
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from config.settings import settings
 from models.requests import OpenQuestion
 from models.responses import ConchResponse
-from services.llm_service import get_llm_response, get_cryptic_answer_prompt
-from services.tts_service import generate_audio_for_text, is_voice_available
+from services.answer_reservoir import cryptic_reservoir, get_client_id
+from services.llm_service import get_llm_response
+from services.transcode import AUDIO_FORMATS, get_audio_url_for_format_async, negotiate_audio_format
+from services.speech_pipeline import speech_pipeline
+from services.tts_service import is_voice_available, is_streaming_available, stream_speech
 
 router = APIRouter(prefix="/api", tags=["open-ended"])
 
 
 @router.post("/ask-anything", response_model=ConchResponse)
-async def get_open_ended_answer(request: OpenQuestion):
+async def get_open_ended_answer(request: OpenQuestion, http_request: Request,
+                                accept: str | None = Header(default=None)):
     """
     Generates a cryptic, unhelpful answer to a user's question using ElevenLabs TTS.
     Supports voice selection with automatic fallback to default voice.
+    The audio format is taken from the audio_format field or the Accept header.
+    The conch ignores the question anyway, so a ready-made answer from the reservoir
+    is used when there is one; otherwise the answer is generated live, and its
+    sentences are synthesized while Gemini is still writing the rest.
     """
     try:
-        # Generate the cryptic response
-        system_prompt = get_cryptic_answer_prompt()
-        response = get_llm_response(request.question, system_prompt)
-        
         # Use voice from request or default to a mystical vampire voice
         voice = getattr(request, 'voice', 'deep_ah')  # Deep vampire voice for mystical ancient wisdom
         
@@ -27,8 +37,17 @@ async def get_open_ended_answer(request: OpenQuestion):
             print(f"Warning: Voice '{voice}' not available. Using 'deep_ah' as fallback.")
             voice = 'deep_ah'
         
-        # Generate audio with proper filename
-        audio_path = generate_audio_for_text(response, voice)
+        client_id = get_client_id(http_request)
+        pooled = await cryptic_reservoir.take(voice, client_id)
+        if pooled:
+            response, audio_path = pooled.message, pooled.audio_url
+        else:
+            # Generate the cryptic response, speaking each sentence while the rest is generated
+            response, audio_path = await speech_pipeline.speak(request.question, "cryptic", voice)
+            cryptic_reservoir.remember(client_id, response)
+        
+        audio_format = negotiate_audio_format(request.audio_format, accept)
+        audio_path = await get_audio_url_for_format_async(audio_path, audio_format)
         
         return ConchResponse(
             message=response,
@@ -36,3 +55,57 @@ async def get_open_ended_answer(request: OpenQuestion):
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/ask-anything/stream")
+async def stream_open_ended_answer(request: OpenQuestion, http_request: Request,
+                                   accept: str | None = Header(default=None)):
+    """
+    Streams the spoken cryptic answer as MP3 (or Ogg/Opus) while it is being synthesized.
+    The text of the answer is returned URL-encoded in the X-Conch-Message header.
+    A ready-made answer from the reservoir is sent as its finished file instead.
+    """
+    try:
+        voice = request.voice
+        if not is_voice_available(voice):
+            print(f"Warning: Voice '{voice}' not available. Using 'deep_ah' as fallback.")
+            voice = 'deep_ah'
+        
+        client_id = get_client_id(http_request)
+        pooled = await cryptic_reservoir.take(voice, client_id)
+        if pooled:
+            audio_format = negotiate_audio_format(request.audio_format, accept)
+            audio_path = await get_audio_url_for_format_async(pooled.audio_url, audio_format)
+            media_type = AUDIO_FORMATS["mp3" if audio_path == pooled.audio_url else audio_format].media_type
+            return FileResponse(audio_path.lstrip('/'), media_type=media_type,
+                                headers={"X-Conch-Message": quote(pooled.message)})
+        
+        response = await get_llm_response(request.question, persona="cryptic")
+        cryptic_reservoir.remember(client_id, response)
+        
+        headers = {"X-Conch-Message": quote(response)}
+        
+        placeholder = os.path.join(settings.AUDIO_DIR, "placeholder.mp3")
+        if not is_streaming_available():
+            print("Warning: Streaming TTS not available. Using placeholder audio.")
+            return FileResponse(placeholder, media_type="audio/mpeg", headers=headers)
+        
+        # AAC can't be encoded incrementally here, so it is streamed as MP3
+        audio_format = negotiate_audio_format(request.audio_format, accept)
+        if audio_format != "opus":
+            audio_format = "mp3"
+        
+        # The first chunk is pulled before the response starts, so a call that fails
+        # or runs out of its budget still gets the placeholder
+        chunks = stream_speech(response, voice, audio_format)
+        try:
+            first = await asyncio.to_thread(next, chunks, b"")
+        except Exception as e:
+            print(f"Error streaming speech: {e}. Using placeholder audio.")
+            return FileResponse(placeholder, media_type="audio/mpeg", headers=headers)
+        
+        # Starlette pulls the rest of the generator from its threadpool, one chunk at a time
+        return StreamingResponse(itertools.chain([first], chunks),
+                                 media_type=AUDIO_FORMATS[audio_format].media_type, headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,44 @@
+from fastapi import APIRouter
+from services.answer_bank import classic_bank
+from services.answer_reservoir import annoyed_reservoir, cryptic_reservoir
+from services.audio_cache import audio_cache
+from services.audio_files import audio_files
+from services.clients import upstream_clients
+from services.deadline import circuit_breaker_stats, deadline_stats
+from services.dsp_pool import dsp_pool
+from services.food_pipeline import food_pipeline
+from services.intent_classifier import food_intent_classifier
+from services.llm_cache import llm_cache
+from services.llm_service import llm_batcher
+from services.single_flight import single_flight_stats
+from services.speech_pipeline import speech_pipeline
+from services.tts_service import get_fixed_phrase_stats
+
+router = APIRouter(prefix="/api", tags=["stats"])
+
+
+@router.get("/stats")
+async def get_stats():
+    """
+    Get runtime statistics for the audio and LLM caches, LLM batching, audio file serving, the
+    classic answer bank, the answer reservoirs, fixed phrase splicing, the food-intent classifier,
+    the food and speech pipelines, worker pools, request coalescing, deadline budgets and hedging,
+    upstream circuit breakers and connection pools.
+    """
+    return {
+        "audio_cache": audio_cache.stats(),
+        "audio_files": audio_files.stats(),
+        "classic_bank": classic_bank.stats(),
+        "fixed_phrases": get_fixed_phrase_stats(),
+        "reservoirs": {"cryptic": cryptic_reservoir.stats(), "annoyed": annoyed_reservoir.stats()},
+        "llm_cache": llm_cache.stats(),
+        "llm_batching": llm_batcher.stats(),
+        "food_intent": food_intent_classifier.stats(),
+        "food_pipeline": food_pipeline.stats(),
+        "speech_pipeline": speech_pipeline.stats(),
+        "dsp_pool": dsp_pool.stats(),
+        "coalescing": single_flight_stats(),
+        "deadlines": deadline_stats(),
+        "circuit_breakers": circuit_breaker_stats(),
+        "upstream_pools": upstream_clients.stats()
+    }
@@ -1,9 +1,26 @@
-from .llm_service import get_llm_response, get_cryptic_answer_prompt
-from .tts_service import get_speech_from_text, generate_audio_for_text
+# Service modules are imported on first use, so importing one service
+# doesn't load the provider SDKs of all the others
+_EXPORTS = {
+    "get_llm_response": "llm_service",
+    "get_cryptic_answer_prompt": "llm_service",
+    "get_speech_from_text": "tts_service",
+    "get_speech_from_text_async": "tts_service",
+    "generate_audio_for_text": "tts_service",
+    "generate_audio_for_text_async": "tts_service",
+}
 
 __all__ = [
     "get_llm_response", 
     "get_cryptic_answer_prompt",
     "get_speech_from_text", 
-    "generate_audio_for_text"
-]
\ No newline at end of file
+    "get_speech_from_text_async",
+    "generate_audio_for_text",
+    "generate_audio_for_text_async"
+]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from config.settings import settings
+from services.tts_service import (
+    get_audio_cache_key,
+    get_available_voices,
+    render_speech_async,
+    write_audio_file,
+)
+
+# The classic answers and the lines the conch speaks for each of them
+CLASSIC_ANSWERS = {
+    "Yes": ["Yes.", "Yessss... it is certain."],
+    "No": ["No.", "Noooo... forbidden."],
+    "Maybe": ["Maybe.", "Perhaps... unclear."],
+    "Ask again later": ["Ask again later."],
+    "Definitely not": ["Definitely not.", "Never... foolish mortal."],
+}
+
+# Lines already rendered by earlier versions of generate_classic_responses.py
+LEGACY_CLIPS = {
+    "deep_ah": {
+        "Yessss... it is certain.": "british_lady/yes.mp3",
+        "Noooo... forbidden.": "british_lady/No.mp3",
+        "Perhaps... unclear.": "british_lady/Maybe.mp3",
+        "Never... foolish mortal.": "british_lady/Definietly_not.mp3",
+    },
+}
+
+
+class BankedClip(NamedTuple):
+    """A pre-rendered classic answer on disk"""
+    answer: str    # Answer shown to the user, e.g. "Yes"
+    text: str      # Line spoken in the clip
+    url: str       # URL path the clip is served from
+
+
+def _slug(answer: str) -> str:
+    return answer.lower().replace(" ", "_")
+
+
+class ClassicAnswerBank:
+    """
+    Pre-rendered audio for the classic conch answers.
+
+    The clips in audio/classic/<voice>/<answer>/ are indexed when the app
+    starts, so the route hands out a URL without touching disk. The bytes
+    are served by AudioFiles, whose hot cache keeps the played clips in
+    memory.
+    Lines that have no clip yet are rendered once in the background and
+    written next to the others, so later boots load them straight from disk.
+    Until then the route falls back to live synthesis for that answer.
+    Each answer can have several variants, which are handed out in turn.
+    """
+
+    def __init__(self, directory: str, answers: Dict[str, List[str]]):
+        self.directory = directory
+        self.answers = answers
+        self.rendered = 0
+        self.served = 0
+        self._clips: Dict[tuple, List[BankedClip]] = {}
+        self._next: Dict[tuple, int] = {}
+        self._render_task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    def variant_path(self, answer: str, text: str, voice: str) -> str:
+        """
+        Get the file path of one spoken variant of an answer
+
+        The file name is the clip's content hash, so changing the line or the
+        voice's rendering settings gives a new file instead of a stale clip.
+        Lines shipped in the legacy british_lady folder are read from there.
+
+        Args:
+            answer: Classic answer, e.g. "Yes"
+            text: Line spoken in the clip
+            voice: Voice the clip is rendered with
+
+        Returns:
+            Relative path of the clip
+        """
+        legacy = LEGACY_CLIPS.get(voice, {}).get(text)
+        if legacy and os.path.exists(os.path.join(self.directory, legacy)):
+            return os.path.join(self.directory, legacy)
+
+        filename = f"{get_audio_cache_key(text, voice)[:16]}.mp3"
+        return os.path.join(self.directory, voice, _slug(answer), filename)
+
+    def load(self) -> int:
+        """
+        Index every clip that is already on disk
+
+        Returns:
+            Number of clips found
+        """
+        clips: Dict[tuple, List[BankedClip]] = {}
+        for voice in get_available_voices():
+            for answer, lines in self.answers.items():
+                found = [self._find_clip(answer, text, self.variant_path(answer, text, voice))
+                         for text in lines]
+                clips[(answer, voice)] = [clip for clip in found if clip]
+
+        with self._lock:
+            self._clips = clips
+        return sum(len(found) for found in clips.values())
+
+    async def startup(self) -> None:
+        """Index the bank and start rendering any missing lines"""
+        count = await asyncio.to_thread(self.load)
+        print(f"Classic answer bank found {count} clips")
+        if settings.ELEVENLABS_API_KEY and self.missing():
+            self._render_task = asyncio.create_task(self.render_missing())
+
+    async def shutdown(self) -> None:
+        """Stop a render that is still running"""
+        task, self._render_task = self._render_task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def missing(self) -> List[tuple]:
+        """
+        Get the lines that have no clip on disk yet
+
+        Returns:
+            List of (answer, text, voice) tuples
+        """
+        return [
+            (answer, text, voice)
+            for voice in get_available_voices()
+            for answer, lines in self.answers.items()
+            for text in lines
+            if not os.path.exists(self.variant_path(answer, text, voice))
+        ]
+
+    async def render_missing(self) -> int:
+        """
+        Render every missing line once and add it to the bank
+
+        Returns:
+            Number of clips rendered
+        """
+        rendered = 0
+        for answer, text, voice in self.missing():
+            try:
+                data = await render_speech_async(text, voice)
+                path = self.variant_path(answer, text, voice)
+                await asyncio.to_thread(write_audio_file, path, data)
+            except Exception as e:
+                print(f"Error rendering classic answer '{text}': {e}")
+                continue
+
+            with self._lock:
+                self._clips.setdefault((answer, voice), []).append(
+                    BankedClip(answer, text, f"/{path}")
+                )
+                self.rendered += 1
+            rendered += 1
+        return rendered
+
+    def pick(self, answer: str, voice: str = "deep_ah") -> Optional[BankedClip]:
+        """
+        Get the next variant of an answer, rotating through the variants
+
+        Args:
+            answer: Classic answer, e.g. "Yes"
+            voice: Voice to use
+
+        Returns:
+            The clip, or None if the answer has no clip for this voice yet
+        """
+        key = (answer, voice.lower())
+        with self._lock:
+            clips = self._clips.get(key)
+            if not clips:
+                return None
+            index = self._next.get(key, 0)
+            self._next[key] = index + 1
+            self.served += 1
+            return clips[index % len(clips)]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get bank counters
+
+        Returns:
+            Dictionary with variant counts per answer and counters
+        """
+        with self._lock:
+            return {
+                "variants": {
+                    f"{voice}/{answer}": len(clips) for (answer, voice), clips in self._clips.items()
+                },
+                "served": self.served,
+                "rendered": self.rendered,
+                "rendering": self._render_task is not None and not self._render_task.done(),
+            }
+
+    @staticmethod
+    def _find_clip(answer: str, text: str, path: str) -> Optional[BankedClip]:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        return BankedClip(answer, text, f"/{path}") if size else None
+
+
+# Create a global instance (the app lifespan loads it)
+classic_bank = ClassicAnswerBank(settings.CLASSIC_AUDIO_DIR, CLASSIC_ANSWERS)
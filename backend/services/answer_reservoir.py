@@ -0,0 +1,341 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, NamedTuple, Optional
+
+from starlette.requests import Request
+
+from config.settings import deferred, settings
+from services.llm_service import (
+    LLM_ERROR_RESPONSE,
+    get_annoyed_response,
+    get_llm_response,
+)
+from services.metrics import metrics
+from services.tts_service import generate_audio_for_text_async, get_available_voices
+
+# Questions the reservoir asks itself. The cryptic persona ignores the
+# question anyway; the topic only gives each answer a different flavour.
+CRYPTIC_TOPICS = [
+    "love", "work", "money", "friendship", "the future", "a difficult decision",
+    "moving to a new city", "texting someone", "quitting a job", "luck", "family",
+    "a secret", "an old mistake", "the weather", "a new hobby", "sleep",
+]
+
+# Non-food questions that annoy the conch
+ANNOYED_TOPICS = [
+    "the meaning of life", "my homework", "whether I should buy a car", "the stock market",
+    "my ex", "the weather tomorrow", "a video game", "how to fix my laptop",
+    "learning to dance", "my horoscope", "politics", "a haircut",
+]
+
+# Candidates checked against a client's history before giving up, so taking
+# an answer stays constant-time
+MAX_REPEAT_SKIPS = 3
+
+# Clients whose recent answers are remembered
+MAX_TRACKED_CLIENTS = 10000
+
+# Pause after a failed refill, in seconds
+REFILL_ERROR_BACKOFF = 30
+
+
+class ReservoirItem(NamedTuple):
+    """A ready-made answer with its finished audio"""
+    message: str      # Text of the answer
+    audio_url: str    # URL path of the rendered MP3
+    created: float    # When the item was made
+
+
+class AnswerReservoir:
+    """
+    Pool of ready-made answers with finished audio for a persona.
+
+    Requests take an answer in constant time; only an empty pool falls back
+    to live generation. A background task tops each voice's pool up to the
+    target depth once requests have been quiet for a moment, so refills
+    don't compete with live traffic. Items older than the maximum age are
+    dropped, and a client isn't handed an answer it heard recently.
+    """
+
+    def __init__(self, name: str, make_answer: Callable[[], Awaitable[str]], depth: int,
+                 max_age: float, no_repeat: int, idle_delay: float):
+        self.name = name
+        self.make_answer = make_answer
+        self.depth = depth
+        self.max_age = max_age
+        self.no_repeat = no_repeat
+        self.idle_delay = idle_delay
+        self.served = 0
+        self.fallbacks = 0
+        self.refilled = 0
+        self.expired = 0
+        self.repeats_skipped = 0
+        self._pools: Dict[str, Deque[ReservoirItem]] = {}
+        self._history: "OrderedDict[str, Deque[str]]" = OrderedDict()
+        self._last_take = 0.0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    async def take(self, voice: str, client_id: Optional[str] = None) -> Optional[ReservoirItem]:
+        """
+        Take a ready-made answer from the pool
+
+        Args:
+            voice: Voice the answer is spoken in
+            client_id: Identity of the client, for the no-repeat rule
+
+        Returns:
+            The answer, or None if the pool has nothing usable
+        """
+        while True:
+            item = self._pop(voice, client_id)
+            # Checked outside the lock and off the event loop, as it touches the disk
+            if item is None or await asyncio.to_thread(os.path.exists, _clip_path(item.audio_url)):
+                break
+            # The audio store evicted the clip
+            with self._lock:
+                self.expired += 1
+
+        with self._lock:
+            if item is None:
+                self.fallbacks += 1
+            else:
+                self.served += 1
+                if client_id:
+                    self._remember(client_id, item.message)
+        metrics.cache_lookup("reservoir", item is not None)
+        self._notify()
+        return item
+
+    def _pop(self, voice: str, client_id: Optional[str]) -> Optional[ReservoirItem]:
+        # The next fresh answer the client hasn't heard recently, if there is one
+        now = time.time()
+        with self._lock:
+            self._last_take = now
+            pool = self._pools.get(voice.lower())
+            history = self._history.get(client_id) if client_id else None
+            skips = 0
+            while pool:
+                candidate = pool.popleft()
+                if self.max_age and now - candidate.created > self.max_age:
+                    self.expired += 1
+                    continue
+                if history and candidate.message in history and skips < MAX_REPEAT_SKIPS:
+                    # Keep it for someone else
+                    pool.append(candidate)
+                    skips += 1
+                    self.repeats_skipped += 1
+                    if skips >= len(pool):
+                        break
+                    continue
+                return candidate
+        return None
+
+    def remember(self, client_id: Optional[str], message: str) -> None:
+        """
+        Record an answer a client got from live generation
+
+        Args:
+            client_id: Identity of the client
+            message: Text of the answer
+        """
+        if client_id:
+            with self._lock:
+                self._remember(client_id, message)
+
+    def add(self, voice: str, item: ReservoirItem) -> None:
+        """
+        Add a ready-made answer to a voice's pool
+
+        Args:
+            voice: Voice the answer is spoken in
+            item: The answer
+        """
+        with self._lock:
+            self._pools.setdefault(voice.lower(), deque()).append(item)
+            self.refilled += 1
+
+    def available(self, voice: str) -> int:
+        """
+        Count the answers pooled for a voice, without taking one
+
+        Args:
+            voice: Voice the answers are spoken in
+
+        Returns:
+            Number of pooled items (some may turn out stale when taken)
+        """
+        with self._lock:
+            return len(self._pools.get(voice.lower(), ()))
+
+    def needs_refill(self) -> Optional[str]:
+        """
+        Get a voice whose pool is below the target depth
+
+        Returns:
+            The voice, or None if every pool is full
+        """
+        now = time.time()
+        with self._lock:
+            for voice in get_available_voices():
+                pool = self._pools.setdefault(voice, deque())
+                # Drop stale items from the front (the oldest end)
+                while pool and self.max_age and now - pool[0].created > self.max_age:
+                    pool.popleft()
+                    self.expired += 1
+                if len(pool) < self.depth:
+                    return voice
+        return None
+
+    async def refill_one(self, voice: str) -> bool:
+        """
+        Make one answer with its audio and add it to the pool
+
+        Args:
+            voice: Voice to render the answer with
+
+        Returns:
+            True if an item was added
+        """
+        message = await self.make_answer()
+        if not message or message == LLM_ERROR_RESPONSE:
+            return False
+        audio_url = await generate_audio_for_text_async(message, voice)
+        # Placeholder audio means synthesis failed
+        if not audio_url.startswith(f"/{settings.GENERATED_AUDIO_DIR}/"):
+            return False
+        self.add(voice, ReservoirItem(message, audio_url, time.time()))
+        return True
+
+    async def start(self) -> None:
+        """Start the background refill task if both upstream services are configured"""
+        if self.depth <= 0 or not (settings.GEMINI_API_KEY and settings.ELEVENLABS_API_KEY):
+            return
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._refill_loop())
+
+    async def shutdown(self) -> None:
+        """Stop the background refill task"""
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get reservoir counters
+
+        Returns:
+            Dictionary with pool depths and served/fallback counters
+        """
+        with self._lock:
+            requests = self.served + self.fallbacks
+            return {
+                "depth": {voice: len(pool) for voice, pool in self._pools.items()},
+                "target_depth": self.depth,
+                "served": self.served,
+                "fallbacks": self.fallbacks,
+                "hit_rate": self.served / requests if requests else 0.0,
+                "refilled": self.refilled,
+                "expired": self.expired,
+                "repeats_skipped": self.repeats_skipped,
+                "refilling": self._task is not None and not self._task.done(),
+            }
+
+    def _remember(self, client_id: str, message: str) -> None:
+        history = self._history.get(client_id)
+        if history is None:
+            history = self._history[client_id] = deque(maxlen=self.no_repeat)
+            while len(self._history) > MAX_TRACKED_CLIENTS:
+                self._history.popitem(last=False)
+        else:
+            self._history.move_to_end(client_id)
+        history.append(message)
+
+    def _notify(self) -> None:
+        if self._wake is not None:
+            try:
+                asyncio.get_running_loop().call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass
+
+    async def _refill_loop(self) -> None:
+        while True:
+            voice = self.needs_refill()
+            if voice is None:
+                # Full: sleep until an item is taken (or stale items need replacing)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.max_age or None)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Only refill once requests have been quiet for a moment
+            quiet_for = time.time() - self._last_take
+            if quiet_for < self.idle_delay:
+                await asyncio.sleep(self.idle_delay - quiet_for)
+                continue
+
+            try:
+                added = await self.refill_one(voice)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error refilling {self.name} reservoir: {e}")
+                added = False
+            if not added:
+                await asyncio.sleep(REFILL_ERROR_BACKOFF)
+
+
+def get_client_id(request: Request) -> Optional[str]:
+    """
+    Identify the client of a request for the no-repeat rule
+
+    Args:
+        request: The incoming request
+
+    Returns:
+        The X-Client-Id header if the client sent one, else its address
+    """
+    return request.headers.get("x-client-id") or (request.client.host if request.client else None)
+
+
+async def _make_cryptic_answer() -> str:
+    question = f"What does the conch say about {random.choice(CRYPTIC_TOPICS)}?"
+    # A persona of its own, so the pool never takes the cached answer to a live question
+    return await get_llm_response(question, persona="cryptic_reservoir")
+
+
+async def _make_annoyed_answer() -> str:
+    return await get_annoyed_response(random.choice(ANNOYED_TOPICS), persona="annoyed_reservoir")
+
+
+def _clip_path(audio_url: str) -> str:
+    # Pooled answers are always spoken into the generated audio store
+    return os.path.join(settings.GENERATED_AUDIO_DIR, audio_url.removeprefix(f"/{settings.GENERATED_AUDIO_DIR}/"))
+
+
+def _reservoir(name: str, make_answer: Callable[[], Awaitable[str]]) -> AnswerReservoir:
+    return AnswerReservoir(
+        name,
+        make_answer,
+        depth=settings.RESERVOIR_DEPTH,
+        max_age=settings.RESERVOIR_MAX_AGE,
+        no_repeat=settings.RESERVOIR_NO_REPEAT,
+        idle_delay=settings.RESERVOIR_IDLE_DELAY,
+    )
+
+
+# Create the global reservoirs (the app lifespan starts their refill tasks)
+cryptic_reservoir = deferred(lambda: _reservoir("cryptic", _make_cryptic_answer))
+annoyed_reservoir = deferred(lambda: _reservoir("annoyed", _make_annoyed_answer))
@@ -0,0 +1,452 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+
+from config.settings import deferred, settings
+
+# Ways the store can pick which clips to evict when it is over quota
+EVICTION_POLICIES = ("lru", "age", "access_count")
+
+# Clips used this recently are never evicted, so a URL that was just handed
+# out is still there when the client fetches it
+EVICTION_GRACE_SECONDS = 60
+
+# Window over which the eviction rate is reported
+EVICTION_RATE_WINDOW = 300
+
+# Leftover temporary files from interrupted writes are removed after this long
+STALE_TMP_SECONDS = 3600
+
+# Names of the files the store writes: a clip's content hash, as the master
+# render or one of its transcodes
+CLIP_NAME = re.compile(r"^[0-9a-f]{64}$")
+
+
+def make_audio_cache_key(text: str, voice: str, voice_settings: Dict[str, Any],
+                         model: str, reverb: Optional[Dict[str, float]]) -> str:
+    """
+    Build a content hash for a rendered clip
+
+    Every input that changes the sound of the clip is part of the key, so two
+    different answers can never share (or overwrite) the same file.
+
+    Args:
+        text: The text being spoken
+        voice: Voice name
+        voice_settings: ElevenLabs voice settings used for generation
+        model: ElevenLabs model id
+        reverb: Reverb parameters, or None when no reverb is applied
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    payload = json.dumps({
+        "text": text,
+        "voice": voice.lower(),
+        "voice_settings": voice_settings,
+        "model": model,
+        "reverb": reverb,
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """
+    Persistent, content-addressed store of rendered audio clips.
+
+    Maps a content hash to the URL of the finished clip. Clips live in
+    subdirectories named after the first characters of their hash, so no
+    directory grows past a few hundred files.
+
+    The store has a byte quota and an entry limit. A background sweeper
+    enforces them: it reconciles the index with the clips on disk (transcodes
+    count towards their clip's size, and clips missing from the index are
+    adopted), drops
+    clips past the maximum age, and evicts by the configured policy until the
+    store is back under quota. The index is written by the sweeper as well,
+    so looking up and recording clips never waits on disk housekeeping.
+    """
+
+    INDEX_FILENAME = "cache_index.json"
+
+    def __init__(self, directory: str, max_bytes: int, max_entries: int, policy: str = "lru",
+                 max_age: float = 0, sweep_interval: float = 60):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}', expected one of {EVICTION_POLICIES}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.policy = policy
+        self.max_age = max_age
+        self.sweep_interval = sweep_interval
+        self.index_path = os.path.join(directory, self.INDEX_FILENAME)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.last_sweep: Dict[str, Any] = {}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_bytes = 0
+        self._eviction_times: deque = deque(maxlen=10000)
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def relative_path(self, key: str, extension: str = "mp3") -> str:
+        """
+        Get the sharded location of a clip inside the store
+
+        Args:
+            key: Content hash from make_audio_cache_key
+            extension: File extension of the clip
+
+        Returns:
+            Path relative to the store directory, e.g. "ab/abcdef....mp3"
+        """
+        return os.path.join(key[:2], f"{key}.{extension}")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a rendered clip
+
+        Args:
+            key: Content hash from make_audio_cache_key
+
+        Returns:
+            URL path of the cached clip, or None on a miss
+        """
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(key)
+            if entry is None:
+                # Clips written since the index was last saved are still on disk
+                entry = self._adopt(key, os.path.join(self.directory, self.relative_path(key)))
+            elif not os.path.exists(_local_path(entry["url"])):
+                # The file vanished from under us - forget about it
+                self._drop(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            entry["last_access"] = time.time()
+            entry["hits"] = entry.get("hits", 0) + 1
+            self._dirty = True
+            self.hits += 1
+            return entry["url"]
+
+    def put(self, key: str, url: str) -> None:
+        """
+        Record a freshly rendered clip
+
+        Eviction is left to the background sweeper, which is woken early when
+        the store goes over quota. Without a running sweeper (e.g. in scripts)
+        the store is swept right away.
+
+        Args:
+            key: Content hash from make_audio_cache_key
+            url: URL path of the rendered clip
+        """
+        local_path = _local_path(url)
+        if not os.path.exists(local_path):
+            return
+
+        now = time.time()
+        with self._lock:
+            self._ensure_loaded()
+            if key in self._entries:
+                self._drop(key)
+
+            size = os.path.getsize(local_path)
+            self._entries[key] = {"url": url, "size": size, "created": now, "last_access": now, "hits": 0}
+            self._total_bytes += size
+            self._dirty = True
+            over_quota = self._over_quota()
+
+        if over_quota:
+            if self._sweeper is not None and not self._sweeper.done():
+                self._request_sweep()
+            else:
+                self.sweep()
+
+    def sweep(self) -> Dict[str, Any]:
+        """
+        Reconcile the store with the disk and evict clips until it is within quota
+
+        Blocks on disk I/O, so call it from a worker thread.
+
+        Returns:
+            Summary of the sweep
+        """
+        with self._sweep_lock:
+            start = time.perf_counter()
+            now = time.time()
+            groups = self._scan(now)
+
+            with self._lock:
+                self._ensure_loaded()
+                self._reconcile(groups, now)
+                victims = self._select_victims(now)
+                for key in victims:
+                    self._drop(key)
+                entries = len(self._entries)
+                total_bytes = self._total_bytes
+
+            evicted_bytes = 0
+            for key in victims:
+                for path, size in groups.get(key, {}).get("files", []):
+                    try:
+                        os.remove(path)
+                        evicted_bytes += size
+                    except OSError:
+                        pass
+
+            with self._lock:
+                self.evictions += len(victims)
+                self.evicted_bytes += evicted_bytes
+                self._eviction_times.extend([now] * len(victims))
+                self._save_index()
+                self.last_sweep = {
+                    "at": now,
+                    "duration_ms": (time.perf_counter() - start) * 1000,
+                    "evicted": len(victims),
+                    "evicted_bytes": evicted_bytes,
+                    "entries": entries,
+                    "bytes": total_bytes,
+                }
+                return dict(self.last_sweep)
+
+    async def start(self) -> None:
+        """Start the background sweeper"""
+        if self._sweeper is not None and not self._sweeper.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def shutdown(self) -> None:
+        """Stop the background sweeper and save the index"""
+        sweeper, self._sweeper = self._sweeper, None
+        if sweeper is not None:
+            sweeper.cancel()
+            try:
+                await sweeper
+            except asyncio.CancelledError:
+                pass
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store counters
+
+        Returns:
+            Dictionary with size, quota, hit/miss and eviction counters
+        """
+        with self._lock:
+            self._ensure_loaded()
+            lookups = self.hits + self.misses
+            recent = time.time() - EVICTION_RATE_WINDOW
+            recent_evictions = sum(1 for t in self._eviction_times if t >= recent)
+            return {
+                "entries": len(self._entries),
+                "files": sum(entry.get("files", 1) for entry in self._entries.values()),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "utilization": self._total_bytes / self.max_bytes if self.max_bytes else 0.0,
+                "policy": self.policy,
+                "max_age": self.max_age,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+                "evictions_per_minute": recent_evictions * 60 / EVICTION_RATE_WINDOW,
+                "sweeper_running": self._sweeper is not None and not self._sweeper.done(),
+                "last_sweep": dict(self.last_sweep),
+            }
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.sweep_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                print(f"Error sweeping audio store: {e}")
+
+    def _request_sweep(self) -> None:
+        # put() usually runs in a worker thread, so wake the sweeper through its loop
+        if self._loop is not None and self._wake is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass
+
+    def _over_quota(self) -> bool:
+        return len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+
+    def _scan(self, now: float) -> Dict[str, Dict[str, Any]]:
+        # Group the store's files by clip: a master and its transcodes share a stem.
+        # Only <shard>/<hash>.<ext> files are the store's; anything else is left alone.
+        groups: Dict[str, Dict[str, Any]] = {}
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                if filename.endswith(".tmp"):
+                    if now - stat.st_mtime > STALE_TMP_SECONDS:
+                        try:
+                            os.remove(path)
+                        except OSError:
+                            pass
+                    continue
+                if path == self.index_path:
+                    continue
+
+                stem, extension = os.path.splitext(filename)
+                if not CLIP_NAME.match(stem) or os.path.relpath(root, self.directory) != stem[:2]:
+                    continue
+                group = groups.setdefault(stem, {"files": [], "size": 0, "mtime": 0.0, "master": None})
+                group["files"].append((path, stat.st_size))
+                group["size"] += stat.st_size
+                group["mtime"] = max(group["mtime"], stat.st_mtime)
+                if extension == ".mp3" or group["master"] is None:
+                    group["master"] = path
+        return groups
+
+    def _reconcile(self, groups: Dict[str, Dict[str, Any]], scanned_at: float) -> None:
+        # The scan runs outside the lock. Clips put or looked up since it started
+        # may be missing from it, so only entries untouched since then are dropped.
+        for key in [key for key, entry in self._entries.items()
+                    if key not in groups and entry.get("last_access", 0) < scanned_at]:
+            self._drop(key)
+
+        for key, group in groups.items():
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"url": f"/{group['master']}", "created": group["mtime"],
+                         "last_access": group["mtime"], "hits": 0, "size": 0}
+                self._entries[key] = entry
+                # Adopted clips have never been used here, so they go to the front of the LRU order
+                self._entries.move_to_end(key, last=False)
+            self._total_bytes += group["size"] - entry["size"]
+            entry["size"] = group["size"]
+            entry["files"] = len(group["files"])
+        self._dirty = True
+
+    def _select_victims(self, now: float) -> List[str]:
+        victims = []
+        if self.max_age > 0:
+            victims = [key for key, entry in self._entries.items()
+                       if now - entry.get("created", now) > self.max_age
+                       and now - entry.get("last_access", 0) >= EVICTION_GRACE_SECONDS]
+
+        remaining = len(self._entries) - len(victims)
+        remaining_bytes = self._total_bytes - sum(self._entries[key]["size"] for key in victims)
+        if remaining <= self.max_entries and remaining_bytes <= self.max_bytes:
+            return victims
+
+        expired = set(victims)
+        candidates = [key for key, entry in self._entries.items()
+                      if key not in expired and now - entry.get("last_access", 0) >= EVICTION_GRACE_SECONDS]
+        if self.policy == "age":
+            candidates.sort(key=lambda key: self._entries[key].get("created", 0))
+        elif self.policy == "access_count":
+            candidates.sort(key=lambda key: (self._entries[key].get("hits", 0),
+                                             self._entries[key].get("last_access", 0)))
+        # "lru" keeps the OrderedDict order, least recently used first
+
+        for key in candidates:
+            if remaining <= self.max_entries and remaining_bytes <= self.max_bytes:
+                break
+            victims.append(key)
+            remaining -= 1
+            remaining_bytes -= self._entries[key]["size"]
+        return victims
+
+    def _adopt(self, key: str, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        entry = {"url": f"/{path}", "size": stat.st_size, "created": stat.st_mtime,
+                 "last_access": stat.st_mtime, "hits": 0}
+        self._entries[key] = entry
+        self._total_bytes += stat.st_size
+        self._dirty = True
+        return entry
+
+    def _drop(self, key: str) -> Dict[str, Any]:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry["size"]
+        self._dirty = True
+        return entry
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        # Restore in LRU order, skipping clips that were removed while we were down
+        for key, entry in sorted(stored.items(), key=lambda item: item[1].get("last_access", 0)):
+            if os.path.exists(_local_path(entry.get("url", ""))):
+                entry.setdefault("size", 0)
+                entry.setdefault("created", entry.get("last_access", 0))
+                entry.setdefault("hits", 0)
+                self._entries[key] = entry
+                self._total_bytes += entry["size"]
+
+    def _save_index(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Error saving audio cache index: {e}")
+
+
+def _local_path(url: str) -> str:
+    # Audio URLs are served relative to the backend root, e.g. /audio/generated/ab/x.mp3
+    return url.lstrip('/')
+
+
+# Create a global store instance (the app lifespan runs its sweeper)
+audio_cache = deferred(lambda: AudioCache(
+    directory=settings.GENERATED_AUDIO_DIR,
+    max_bytes=settings.AUDIO_CACHE_MAX_BYTES,
+    max_entries=settings.AUDIO_CACHE_MAX_ENTRIES,
+    policy=settings.AUDIO_CACHE_EVICTION_POLICY,
+    max_age=settings.AUDIO_CACHE_MAX_AGE,
+    sweep_interval=settings.AUDIO_CACHE_SWEEP_INTERVAL,
+))
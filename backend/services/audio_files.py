@@ -0,0 +1,360 @@
+import asyncio
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from config.settings import deferred, settings
+from services.transcode import AUDIO_FORMATS
+
+# File names that are content hashes (rendered clips, classic variants, fixed
+# phrases and their transcodes). Such a file never changes under its name.
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{16,64}$")
+
+# Content-addressed clips may be cached forever; anything else is revalidated
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# Media types by file extension
+MEDIA_TYPES = {audio_format.extension: audio_format.media_type for audio_format in AUDIO_FORMATS.values()}
+
+# Cold files are streamed in chunks of this size when the server can't send them zero-copy
+CHUNK_SIZE = 64 * 1024
+
+
+class HotFile(NamedTuple):
+    """A clip held in memory"""
+    data: bytes
+    etag: str
+    mtime_ns: int    # Modification time of the file the data was read from
+    size: int
+
+
+class RangeNotSatisfiable(Exception):
+    """The requested byte range lies outside the file"""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header
+
+    Args:
+        header: Value of the Range header
+        size: Size of the file in bytes
+
+    Returns:
+        Inclusive (start, end) byte positions, or None to serve the whole file
+        (no header, a malformed one, or several ranges)
+
+    Raises:
+        RangeNotSatisfiable: If the range starts past the end of the file
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[len("bytes="):].strip().partition("-")
+    try:
+        if not start:
+            # Suffix range: the last N bytes
+            length = int(end)
+            if length <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(size - length, 0), size - 1
+        first = int(start)
+        last = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if first >= size:
+        raise RangeNotSatisfiable(header)
+    if first > last:
+        return None
+    return first, min(last, size - 1)
+
+
+class HotFileCache:
+    """
+    In-memory LRU of the most recently played clips, bounded in bytes.
+
+    Entries are checked against the file's size and modification time on
+    every lookup, so a clip rewritten on disk is never served stale.
+    """
+
+    def __init__(self, max_bytes: int, max_file_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, HotFile]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def admits(self, size: int) -> bool:
+        """
+        Check if a file of this size is kept in memory
+
+        Args:
+            size: File size in bytes
+
+        Returns:
+            True if the file fits the cache
+        """
+        return 0 < size <= min(self.max_file_bytes, self.max_bytes)
+
+    def get(self, path: str, stat_result: os.stat_result) -> Optional[HotFile]:
+        """
+        Get a clip if it is cached and unchanged on disk
+
+        Args:
+            path: Full path of the file
+            stat_result: Current stat of the file
+
+        Returns:
+            The cached clip, or None
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.mtime_ns != stat_result.st_mtime_ns or entry.size != stat_result.st_size:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry
+
+    def put(self, path: str, stat_result: os.stat_result, data: bytes, etag: str) -> HotFile:
+        """
+        Cache a clip, evicting the least recently played ones if needed
+
+        Args:
+            path: Full path of the file
+            stat_result: Stat of the file the data was read from
+            data: File contents
+            etag: ETag the clip is served with
+
+        Returns:
+            The cached clip
+        """
+        entry = HotFile(data, etag, stat_result.st_mtime_ns, len(data))
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[path] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with size, quota and hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class FileRangeResponse(Response):
+    """
+    Streams part of a file from disk
+
+    Uses the ASGI zero-copy send extension (sendfile) when the server offers
+    it, and otherwise reads the file in chunks.
+    """
+
+    def __init__(self, path: str, start: int, count: int, status_code: int, headers: Dict[str, str]):
+        self.path = path
+        self.start = start
+        self.count = count
+        self.status_code = status_code
+        self.background = None
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if scope["method"] == "HEAD" or not self.count:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopysend", "file": f.fileno(),
+                            "offset": self.start, "count": self.count, "more_body": False})
+        else:
+            with open(self.path, "rb") as f:
+                await asyncio.to_thread(f.seek, self.start)
+                remaining = self.count
+                while remaining:
+                    chunk = await asyncio.to_thread(f.read, min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining:
+                    # The file shrank while it was being sent
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class AudioFiles(StaticFiles):
+    """
+    Serves the audio directory with strong caching.
+
+    Recently played clips are answered from an in-memory LRU; larger or cold
+    files are streamed from disk. Content-addressed clips get their hash as
+    ETag and are marked immutable, so clients and proxies keep them for good;
+    other files are revalidated with a content-hash ETag. Range requests are
+    answered with 206 Partial Content so players can seek.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_file_bytes: int):
+        super().__init__(directory=directory)
+        self.hot = HotFileCache(max_bytes, max_file_bytes)
+        self.not_modified = 0
+        self.partial = 0
+        self.cold = 0
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """
+        Get the response for an audio file
+
+        Args:
+            path: Path of the file below the audio directory
+            scope: ASGI scope of the request
+
+        Returns:
+            The response to send
+        """
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+
+        try:
+            full_path, stat_result = await asyncio.to_thread(self.lookup_path, path)
+        except PermissionError:
+            raise HTTPException(status_code=401)
+        if stat_result is None or not os.path.isfile(full_path):
+            raise HTTPException(status_code=404)
+        return await self.audio_response(full_path, stat_result, Headers(scope=scope),
+                                         head=scope["method"] == "HEAD")
+
+    async def audio_response(self, full_path: str, stat_result: os.stat_result, request_headers: Headers,
+                             head: bool = False) -> Response:
+        """
+        Build the response for a file that exists
+
+        Args:
+            full_path: Full path of the file
+            stat_result: Stat of the file
+            request_headers: Headers of the request
+            head: Whether this is a HEAD request, answered with headers only
+
+        Returns:
+            A full, partial, not-modified or range-not-satisfiable response
+        """
+        stem, extension = os.path.splitext(os.path.basename(full_path))
+        extension = extension.lstrip(".").lower()
+        immutable = CONTENT_ADDRESSED_NAME.match(stem) is not None
+
+        hot = self.hot.get(full_path, stat_result)
+        if hot is None and self.hot.admits(stat_result.st_size):
+            try:
+                data = await asyncio.to_thread(_read_file, full_path)
+            except OSError:
+                raise HTTPException(status_code=404)
+            etag = f'"{stem}-{extension}"' if immutable else f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+            hot = self.hot.put(full_path, stat_result, data, etag)
+
+        if hot is not None:
+            etag, size = hot.etag, hot.size
+        elif immutable:
+            etag, size = f'"{stem}-{extension}"', stat_result.st_size
+        else:
+            # Too large to hash on every play, so a validator built from the file's stat
+            etag = f'W/"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+            size = stat_result.st_size
+
+        headers = {
+            "etag": etag,
+            "cache-control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "accept-ranges": "bytes",
+            "content-type": MEDIA_TYPES.get(extension, "application/octet-stream"),
+        }
+
+        # If-None-Match uses the weak comparison, so W/ prefixes are ignored on both sides
+        if_none_match = request_headers.get("if-none-match")
+        client_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")} if if_none_match else set()
+        if "*" in client_tags or etag.removeprefix("W/") in client_tags:
+            self.not_modified += 1
+            return NotModifiedResponse(Headers(headers))
+
+        # If-Range only honours the range while the client's copy is current
+        if_range = request_headers.get("if-range")
+        byte_range = None
+        if if_range is None or if_range.strip() == etag:
+            try:
+                byte_range = parse_range(request_headers.get("range"), size)
+            except RangeNotSatisfiable:
+                return Response(status_code=416, headers={"content-range": f"bytes */{size}"})
+
+        status_code = 200
+        start, end = 0, size - 1
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            self.partial += 1
+
+        if hot is not None:
+            if head:
+                headers["content-length"] = str(end - start + 1)
+                return Response(b"", status_code=status_code, headers=headers)
+            body = hot.data if status_code == 200 else hot.data[start:end + 1]
+            return Response(body, status_code=status_code, headers=headers)
+
+        self.cold += 1
+        headers["content-length"] = str(end - start + 1)
+        return FileRangeResponse(full_path, start, end - start + 1, status_code, headers)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get serving counters
+
+        Returns:
+            Dictionary with the hot cache counters and response counts by kind
+        """
+        return {
+            "hot_cache": self.hot.stats(),
+            "not_modified": self.not_modified,
+            "partial": self.partial,
+            "cold": self.cold,
+        }
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# Create a global instance (mounted at /audio by main.py)
+audio_files = deferred(lambda: AudioFiles(
+    directory=settings.AUDIO_DIR,
+    max_bytes=settings.AUDIO_HOT_CACHE_MAX_BYTES,
+    max_file_bytes=settings.AUDIO_HOT_CACHE_MAX_FILE_BYTES,
+))
@@ -0,0 +1,77 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Level below which samples count as silence, relative to the clip's peak (about -50 dB)
+SILENCE_THRESHOLD = 0.003
+
+# Silence kept around speech when trimming, in seconds
+SILENCE_PADDING = 0.01
+
+# Pause between two joined phrases, in seconds (the "..." before a fixed ending)
+PHRASE_GAP = 0.25
+
+# Length of the crossfade at a join, in seconds
+CROSSFADE = 0.03
+
+
+def trim_silence(audio: "np.ndarray", sample_rate: int, start: bool = True, end: bool = True) -> "np.ndarray":
+    """
+    Remove leading and/or trailing silence from a clip
+
+    Args:
+        audio: Mono float samples
+        sample_rate: Sample rate of the audio in Hz
+        start: Trim silence at the start
+        end: Trim silence at the end
+
+    Returns:
+        The trimmed samples (a view of the input)
+    """
+    import numpy as np
+
+    if not len(audio):
+        return audio
+    loud = np.flatnonzero(np.abs(audio) > np.max(np.abs(audio)) * SILENCE_THRESHOLD)
+    if not len(loud):
+        return audio[:0]
+
+    padding = int(SILENCE_PADDING * sample_rate)
+    first = max(int(loud[0]) - padding, 0) if start else 0
+    last = min(int(loud[-1]) + 1 + padding, len(audio)) if end else len(audio)
+    return audio[first:last]
+
+
+def join_phrases(first: "np.ndarray", second: "np.ndarray", sample_rate: int,
+                 gap: float = PHRASE_GAP, crossfade: float = CROSSFADE) -> "np.ndarray":
+    """
+    Join two spoken phrases with a short pause and a crossfade
+
+    Silence at the join is trimmed so the pause is the same however much
+    silence the synthesizer left around each phrase.
+
+    Args:
+        first: Mono float samples of the first phrase
+        second: Mono float samples of the second phrase (same sample rate)
+        sample_rate: Sample rate of both clips in Hz
+        gap: Pause between the phrases in seconds
+        crossfade: Crossfade length in seconds
+
+    Returns:
+        float32 samples of the joined clip
+    """
+    import numpy as np
+
+    head = np.concatenate((trim_silence(first, sample_rate, start=False),
+                           np.zeros(int(gap * sample_rate), dtype=np.float32))).astype(np.float32)
+    tail = trim_silence(second, sample_rate, end=False).astype(np.float32)
+
+    overlap = min(int(crossfade * sample_rate), len(head), len(tail))
+    if not overlap:
+        return np.concatenate((head, tail))
+
+    # Equal-power fades keep the loudness steady through the overlap
+    ramp = np.linspace(0.0, np.pi / 2, overlap, dtype=np.float32)
+    mixed = head[-overlap:] * np.cos(ramp) + tail[:overlap] * np.sin(ramp)
+    return np.concatenate((head[:-overlap], mixed, tail[overlap:]))
@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one upstream provider.
+
+    While closed, the outcome of every call is kept over a window of recent
+    calls; a call that fails or succeeds slower than slow_call counts as a
+    failure. Once the window holds min_calls outcomes and the failure rate
+    reaches failure_rate, the breaker opens: calls are refused at once with
+    CircuitOpenError, so callers go straight to their fallbacks instead of
+    waiting for the provider to fail. After open_for seconds the breaker is
+    half-open and lets up to `probes` calls through. A probe that succeeds
+    closes the breaker; one that fails opens it again.
+
+    Thread-safe, as the blocking ElevenLabs calls run in worker threads.
+    """
+
+    def __init__(self, name: str, failure_rate: float, slow_call: float, window: int,
+                 min_calls: int, open_for: float, probes: int):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.min_calls = min_calls
+        self.open_for = open_for
+        self.probes = max(probes, 1)
+        self.opened = 0
+        self.rejected = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._outcomes: Deque[bool] = deque(maxlen=max(window, 1))
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open"""
+        with self._lock:
+            return self._current_state()
+
+    def check(self) -> bool:
+        """
+        Let a call through, or refuse it while the breaker is open
+
+        Returns:
+            True if the call is a half-open probe
+
+        Raises:
+            CircuitOpenError: If the call must not be made
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and self._probes_in_flight < self.probes:
+                self._probes_in_flight += 1
+                return True
+            self.rejected += 1
+        raise CircuitOpenError(f"{self.name} circuit breaker is open")
+
+    def record(self, ok: bool, latency: float, probe: bool = False) -> None:
+        """
+        Record the outcome of a call that check let through
+
+        Args:
+            ok: Whether the call succeeded
+            latency: Seconds the call took
+            probe: Whether the call was a half-open probe
+        """
+        slow = ok and self.slow_call > 0 and latency > self.slow_call
+        with self._lock:
+            if slow:
+                self.slow_calls += 1
+            if not ok:
+                self.failures += 1
+            success = ok and not slow
+
+            if probe:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+                if success:
+                    print(f"{self.name} circuit breaker closed: the provider has recovered")
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+
+            # Calls that were let through before the breaker opened don't count
+            if self._state != CLOSED:
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                print(f"{self.name} circuit breaker opened: {failures} of the last {len(self._outcomes)} calls failed")
+                self._open()
+
+    def release(self, probe: bool) -> None:
+        """
+        Give back a call that ended without an outcome, e.g. because its caller went away
+
+        Args:
+            probe: Whether the call was a half-open probe
+        """
+        if probe:
+            with self._lock:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Make the call inside the block through the breaker
+
+        Raises:
+            CircuitOpenError: If the breaker is open (the block doesn't run)
+        """
+        probe = self.check()
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(False, time.perf_counter() - started, probe)
+            raise
+        except BaseException:
+            self.release(probe)
+            raise
+        self.record(True, time.perf_counter() - started, probe)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the breaker's state and counters
+
+        Returns:
+            Dictionary with the state, the recent failure rate and counters
+        """
+        with self._lock:
+            state = self._current_state()
+            outcomes = len(self._outcomes)
+            return {
+                "state": state,
+                "failure_rate": self._outcomes.count(False) / outcomes if outcomes else 0.0,
+                "recent_calls": outcomes,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "retry_in": max(self._opened_at + self.open_for - time.monotonic(), 0.0) if state == OPEN else 0.0,
+            }
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_for:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+
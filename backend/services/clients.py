@@ -0,0 +1,199 @@
+import importlib.util
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Union
+
+from config.settings import settings
+
+if TYPE_CHECKING:
+    import httpx
+
+
+def _http2_enabled() -> bool:
+    # HTTP/2 needs the optional h2 package
+    return settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def _transport_options() -> Dict[str, Any]:
+    import httpx
+
+    if settings.HTTP2_ENABLED and not _http2_enabled():
+        print("Warning: HTTP2_ENABLED is set but the 'h2' package is not installed. Using HTTP/1.1.")
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "http2": _http2_enabled(),
+    }
+
+
+def _timeout() -> "httpx.Timeout":
+    import httpx
+
+    return httpx.Timeout(settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+
+
+def _pool_stats(client: Union["httpx.AsyncClient", "httpx.Client"]) -> Dict[str, Any]:
+    # httpx keeps its connection pool on the default transport
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    active = sum(1 for connection in connections if not connection.is_idle())
+    return {
+        "connections": len(connections),
+        "active": active,
+        "idle": len(connections) - active,
+        "max_connections": settings.HTTP_MAX_CONNECTIONS,
+        "utilization": active / settings.HTTP_MAX_CONNECTIONS if settings.HTTP_MAX_CONNECTIONS else 0.0,
+        "closed": client.is_closed,
+    }
+
+
+class UpstreamClients:
+    """
+    Long-lived, connection-pooled clients for the upstream providers.
+
+    The FastAPI lifespan creates them at startup and closes them at shutdown,
+    so requests reuse warm keep-alive connections instead of paying a TCP and
+    TLS handshake each time. Clients are also created on first use, which
+    keeps the command-line scripts working without the app. The HTTP and SDK
+    libraries are only imported when a client is first created.
+    """
+
+    def __init__(self):
+        self._http: Dict[str, "httpx.AsyncClient"] = {}
+        self._sync_http: Dict[str, "httpx.Client"] = {}
+        self._elevenlabs = None
+        self._elevenlabs_http = None
+        self._elevenlabs_sync = None
+        self._elevenlabs_sync_http = None
+        self._gemini = None
+        self._lock = threading.Lock()
+
+    def http(self, name: str) -> "httpx.AsyncClient":
+        """
+        Get the shared async HTTP client for a provider
+
+        Args:
+            name: Provider name, e.g. "serpapi"
+
+        Returns:
+            Pooled httpx.AsyncClient
+        """
+        import httpx
+
+        with self._lock:
+            client = self._http.get(name)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    transport=httpx.AsyncHTTPTransport(**_transport_options()),
+                    timeout=_timeout()
+                )
+                self._http[name] = client
+            return client
+
+    def sync_http(self, name: str) -> "httpx.Client":
+        """
+        Get the shared blocking HTTP client for a provider (for worker threads)
+
+        Args:
+            name: Provider name, e.g. "elevenlabs"
+
+        Returns:
+            Pooled httpx.Client
+        """
+        import httpx
+
+        with self._lock:
+            client = self._sync_http.get(name)
+            if client is None or client.is_closed:
+                client = httpx.Client(
+                    transport=httpx.HTTPTransport(**_transport_options()),
+                    timeout=_timeout()
+                )
+                self._sync_http[name] = client
+            return client
+
+    def elevenlabs(self):
+        """
+        Get the shared async ElevenLabs client
+
+        Returns:
+            AsyncElevenLabs client on the pooled "elevenlabs" connection pool
+        """
+        http_client = self.http("elevenlabs")
+        if self._elevenlabs is None or self._elevenlabs_http is not http_client:
+            from elevenlabs.client import AsyncElevenLabs
+            self._elevenlabs = AsyncElevenLabs(api_key=settings.ELEVENLABS_API_KEY, httpx_client=http_client)
+            self._elevenlabs_http = http_client
+        return self._elevenlabs
+
+    def elevenlabs_sync(self):
+        """
+        Get the shared blocking ElevenLabs client
+
+        Returns:
+            ElevenLabs client on the pooled blocking "elevenlabs" connection pool
+        """
+        http_client = self.sync_http("elevenlabs")
+        if self._elevenlabs_sync is None or self._elevenlabs_sync_http is not http_client:
+            from elevenlabs.client import ElevenLabs
+            self._elevenlabs_sync = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY, httpx_client=http_client)
+            self._elevenlabs_sync_http = http_client
+        return self._elevenlabs_sync
+
+    def gemini(self):
+        """
+        Get the Gemini SDK, configured once per process
+
+        The SDK keeps a single gRPC channel per process, which all models share.
+
+        Returns:
+            The configured google.generativeai module
+        """
+        with self._lock:
+            if self._gemini is None:
+                import google.generativeai as genai  # type: ignore
+                genai.configure(api_key=settings.GEMINI_API_KEY)  # type: ignore
+                self._gemini = genai
+            return self._gemini
+
+    async def startup(self) -> None:
+        """Create every client ahead of the first request"""
+        self.http("serpapi")
+        self.elevenlabs()
+        self.elevenlabs_sync()
+        self.gemini()
+
+    async def shutdown(self) -> None:
+        """Close every pooled connection"""
+        with self._lock:
+            http_clients = list(self._http.values())
+            sync_clients = list(self._sync_http.values())
+            self._http.clear()
+            self._sync_http.clear()
+            self._elevenlabs = None
+            self._elevenlabs_sync = None
+
+        for client in http_clients:
+            await client.aclose()
+        for client in sync_clients:
+            client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool utilization for every client
+
+        Returns:
+            Dictionary of pool statistics keyed by provider
+        """
+        with self._lock:
+            return {
+                "http2": _http2_enabled(),
+                "async": {name: _pool_stats(client) for name, client in self._http.items()},
+                "sync": {name: _pool_stats(client) for name, client in self._sync_http.items()},
+            }
+
+
+# Create a global instance (the app lifespan starts and stops it)
+upstream_clients = UpstreamClients()
@@ -0,0 +1,337 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Set, TypeVar
+
+from config.settings import deferred, settings
+from services.circuit_breaker import CircuitBreaker
+from services.metrics import metrics
+
+T = TypeVar("T")
+
+# Latencies kept per upstream for its hedging percentile
+LATENCY_WINDOW = 256
+
+# Monotonic time by which the current request (or stage) must be done, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+def parse_budgets(value: str) -> Dict[str, float]:
+    """
+    Parse per-stage budgets from a setting
+
+    Args:
+        value: Comma-separated stage=milliseconds pairs, e.g. "intent=3000,tts=10000"
+
+    Returns:
+        Dictionary of budgets in seconds by stage (malformed pairs are skipped)
+    """
+    budgets = {}
+    for item in value.split(","):
+        stage, _, milliseconds = item.partition("=")
+        stage = stage.strip()
+        if not stage:
+            continue
+        try:
+            budgets[stage] = float(milliseconds) / 1000
+        except ValueError:
+            print(f"Warning: Malformed stage budget '{item.strip()}' ignored")
+    return budgets
+
+
+# Sub-budget of each stage, capped by whatever is left of the request's budget
+stage_budgets = deferred(lambda: parse_budgets(settings.STAGE_BUDGETS_MS))
+
+
+def remaining() -> Optional[float]:
+    """
+    Get the time left before the current deadline
+
+    Returns:
+        Seconds left (negative once it has passed), or None without a deadline
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def stage_timeout(stage: str) -> Optional[float]:
+    """
+    Get how long a stage may take: its sub-budget or the time left, whichever is less
+
+    Args:
+        stage: Stage name, e.g. "llm"
+
+    Returns:
+        Seconds, or None if neither the stage nor the request has a budget
+    """
+    budgets = [budget for budget in (stage_budgets.get(stage), remaining()) if budget is not None]
+    return min(budgets) if budgets else None
+
+
+@contextmanager
+def deadline_scope(budget: Optional[float]) -> Iterator[None]:
+    """
+    Give the work inside the block a deadline budget
+
+    Budgets nest: an inner scope can shorten the deadline but never extend it.
+    Tasks started inside the block inherit the deadline.
+
+    Args:
+        budget: Seconds the block may take; None or 0 leaves the deadline as is
+    """
+    if not budget or budget <= 0:
+        yield
+        return
+    deadline = time.monotonic() + budget
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def stage_scope(stage: str) -> Iterator[None]:
+    """
+    Run the work inside the block under a stage's sub-budget
+
+    Args:
+        stage: Stage name, e.g. "intent"
+    """
+    with deadline_scope(stage_budgets.get(stage)):
+        yield
+
+
+class DeadlineMiddleware:
+    """
+    Gives every HTTP request the deadline budget its upstream calls share.
+
+    Plain ASGI middleware, so the deadline is set in the task that runs the
+    endpoint and every task the endpoint starts inherits it.
+    """
+
+    def __init__(self, app, budget: Optional[float] = None):
+        self.app = app
+        # Built with the middleware stack on the first request, so settings are read then
+        self.budget = settings.REQUEST_BUDGET_MS / 1000 if budget is None else budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with deadline_scope(self.budget):
+            await self.app(scope, receive, send)
+
+
+class HedgedUpstream:
+    """
+    Bounded, hedged calls to one upstream provider.
+
+    Every call is cut off when its stage's sub-budget or the request's
+    deadline runs out, whichever comes first, and fails with TimeoutError so
+    the caller falls back as it would for any upstream error. A call that
+    starts with no time left fails at once. Once enough latencies have been
+    seen, a call still running when it passes their hedging percentile gets a
+    second, identical attempt; whichever answers first wins and the other is
+    cancelled. An attempt that fails leaves the other to finish.
+
+    Calls go through the provider's circuit breaker, which refuses them at
+    once with CircuitOpenError while the provider is failing.
+    """
+
+    def __init__(self, name: str, stage: str, hedge: bool, percentile: float, min_samples: int,
+                 breaker: CircuitBreaker):
+        self.name = name
+        self.stage = stage
+        self.breaker = breaker
+        self.hedge = hedge
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self.exhausted = 0
+        self.errors = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def latency(self, percentile: float) -> Optional[float]:
+        """
+        Get a percentile of recent successful call latencies
+
+        Args:
+            percentile: Percentile between 0 and 100
+
+        Returns:
+            Seconds, or None before any call has succeeded
+        """
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(int(len(ordered) * percentile / 100), len(ordered) - 1)]
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Get how long a call runs before it is hedged
+
+        Returns:
+            Seconds, or None if calls aren't hedged (yet)
+        """
+        if not self.hedge or len(self._latencies) < self.min_samples:
+            return None
+        return self.latency(self.percentile)
+
+    async def call(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """
+        Make an upstream call within the stage's budget, hedged when it runs long
+
+        Args:
+            attempt: Coroutine function making one attempt at the call
+
+        Returns:
+            The result of the first attempt to succeed
+
+        Raises:
+            TimeoutError: If the budget ran out first
+            CircuitOpenError: If the provider's circuit breaker is open
+            Whatever the attempts raised, if they all failed
+        """
+        timeout = stage_timeout(self.stage)
+        if timeout is not None and timeout <= 0:
+            self.exhausted += 1
+            raise TimeoutError(f"No budget left for {self.name}")
+
+        with self.breaker.guard():
+            self.calls += 1
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(self._race(attempt), timeout)
+            except TimeoutError:
+                self.timeouts += 1
+                metrics.observe_upstream(self.name, "timeout", time.perf_counter() - started)
+                print(f"{self.name} call ran out of its budget")
+                raise
+            except Exception:
+                self.errors += 1
+                metrics.observe_upstream(self.name, "error", time.perf_counter() - started)
+                raise
+            metrics.observe_upstream(self.name, "ok", time.perf_counter() - started)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get call counters and latencies
+
+        Returns:
+            Dictionary with calls, hedges, timeouts, errors and latency percentiles
+        """
+        p50, p95 = self.latency(50), self.latency(95)
+        delay = self.hedge_delay()
+        return {
+            "stage": self.stage,
+            "budget_ms": stage_budgets[self.stage] * 1000 if self.stage in stage_budgets else None,
+            "calls": self.calls,
+            "hedged": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+            "out_of_budget": self.exhausted,
+            "errors": self.errors,
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p95_ms": p95 * 1000 if p95 is not None else None,
+            "hedge_after_ms": delay * 1000 if delay is not None else None,
+        }
+
+    async def _race(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        started = time.perf_counter()
+        attempts: List[asyncio.Future] = [asyncio.ensure_future(attempt())]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done:
+                    self.hedges += 1
+                    attempts.append(asyncio.ensure_future(attempt()))
+
+            pending: Set[asyncio.Future] = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in attempts:
+                    if task in done and task.exception() is None:
+                        # A hedge win records how long the first attempt had run, a lower bound of its latency
+                        self._latencies.append(time.perf_counter() - started)
+                        if task is not attempts[0]:
+                            self.hedge_wins += 1
+                        return task.result()
+            raise attempts[0].exception()
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+
+
+# Every bounded upstream, by name, for /api/stats
+_upstreams: Dict[str, HedgedUpstream] = {}
+
+
+def hedged_upstream(name: str, stage: str) -> HedgedUpstream:
+    """
+    Get the bounded, hedged caller of an upstream provider, creating it on first use
+
+    Args:
+        name: Provider name, e.g. "gemini"
+        stage: Stage whose sub-budget bounds its calls, e.g. "llm"
+
+    Returns:
+        The shared HedgedUpstream instance
+    """
+    upstream = _upstreams.get(name)
+    if upstream is None:
+        upstream = _upstreams.setdefault(name, deferred(lambda: _build_upstream(name, stage)))
+    return upstream
+
+
+def _build_upstream(name: str, stage: str) -> HedgedUpstream:
+    hedged = {item.strip() for item in settings.HEDGE_UPSTREAMS.split(",") if item.strip()}
+    return HedgedUpstream(
+        name, stage,
+        hedge=name in hedged,
+        percentile=settings.HEDGE_PERCENTILE,
+        min_samples=settings.HEDGE_MIN_SAMPLES,
+        breaker=CircuitBreaker(
+            name,
+            failure_rate=settings.BREAKER_FAILURE_RATE,
+            slow_call=settings.BREAKER_SLOW_CALL_MS / 1000,
+            window=settings.BREAKER_WINDOW,
+            min_calls=settings.BREAKER_MIN_CALLS,
+            open_for=settings.BREAKER_OPEN_SECONDS,
+            probes=settings.BREAKER_HALF_OPEN_PROBES,
+        ),
+    )
+    return upstream
+
+
+def deadline_stats() -> Dict[str, Any]:
+    """
+    Get the budgets and every upstream's call counters
+
+    Returns:
+        Dictionary with the request and stage budgets and counters keyed by provider
+    """
+    return {
+        "request_budget_ms": settings.REQUEST_BUDGET_MS,
+        "stage_budgets_ms": {stage: budget * 1000 for stage, budget in stage_budgets.items()},
+        "upstreams": {name: upstream.stats() for name, upstream in _upstreams.items()},
+    }
+
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get every provider's circuit breaker state
+
+    Returns:
+        Dictionary of breaker states and counters keyed by provider
+    """
+    return {name: upstream.breaker.stats() for name, upstream in _upstreams.items()}
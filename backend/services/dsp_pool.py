@@ -0,0 +1,180 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from config.settings import deferred, settings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class DSPQueueFull(Exception):
+    """Raised when a DSP job can't be queued before the timeout"""
+
+
+def _reverb_job(input_name: str, input_length: int, output_name: str, output_length: int,
+                sample_rate: int, reverb_decay: float, room_size: float) -> None:
+    # Runs in a worker process: attach to the caller's buffers and render in place
+    import numpy as np
+    from services.reverb import apply_godly_reverb
+
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    try:
+        audio = np.ndarray((input_length,), dtype=np.float32, buffer=input_shm.buf)
+        output = np.ndarray((output_length,), dtype=np.float32, buffer=output_shm.buf)
+        apply_godly_reverb(audio, sample_rate, reverb_decay, room_size, out=output)
+        del audio, output
+    finally:
+        input_shm.close()
+        output_shm.close()
+
+
+def _warm_up() -> None:
+    # Import the DSP modules in a fresh worker ahead of its first job
+    import services.reverb  # noqa: F401
+
+
+class DSPPool:
+    """
+    Process pool for CPU-bound audio DSP.
+
+    PCM buffers are handed to the workers through shared memory, so only the
+    buffer names and a few parameters are pickled. The number of jobs that
+    are running or waiting is bounded; callers block (up to a timeout) while
+    the queue is full.
+    """
+
+    def __init__(self, workers: int, max_queue: int, queue_timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.completed = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(workers + max_queue) if workers > 0 else None
+        self._in_flight = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the worker processes ahead of the first job"""
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_warm_up)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def reverb(self, audio: "np.ndarray", sample_rate: int, reverb_decay: float,
+               room_size: float) -> "np.ndarray":
+        """
+        Apply the godly reverb in a worker process
+
+        Blocks the calling thread until the job is done, so call it from a
+        worker thread rather than the event loop.
+
+        Args:
+            audio: Mono audio samples
+            sample_rate: Sample rate of the audio in Hz
+            reverb_decay: Reverb decay factor (0.0-1.0)
+            room_size: Simulated room size (0.0-1.0)
+
+        Returns:
+            float32 samples with reverb tail
+
+        Raises:
+            DSPQueueFull: If no queue slot frees up within the queue timeout
+        """
+        if self._slots is None:
+            from services.reverb import apply_godly_reverb
+            return apply_godly_reverb(audio, sample_rate, reverb_decay, room_size)
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise DSPQueueFull(f"DSP queue is full ({self.workers + self.max_queue} jobs)")
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._run_reverb(audio, sample_rate, reverb_decay, room_size)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool counters
+
+        Returns:
+            Dictionary with pool size, queue bound and job counters
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "running": self._executor is not None,
+            }
+
+    def _run_reverb(self, audio: "np.ndarray", sample_rate: int, reverb_decay: float,
+                    room_size: float) -> "np.ndarray":
+        import numpy as np
+        from services.reverb import get_output_length
+
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        output_length = get_output_length(len(audio), sample_rate, room_size)
+
+        input_shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+        try:
+            output_shm = shared_memory.SharedMemory(create=True, size=max(output_length * 4, 1))
+        except BaseException:
+            input_shm.close()
+            input_shm.unlink()
+            raise
+
+        try:
+            np.ndarray(audio.shape, dtype=np.float32, buffer=input_shm.buf)[:] = audio
+            future: Future = self._get_executor().submit(
+                _reverb_job, input_shm.name, len(audio), output_shm.name, output_length,
+                sample_rate, reverb_decay, room_size
+            )
+            future.result()
+
+            output = np.ndarray((output_length,), dtype=np.float32, buffer=output_shm.buf).copy()
+            with self._lock:
+                self.completed += 1
+            return output
+        finally:
+            for shm in (input_shm, output_shm):
+                shm.close()
+                shm.unlink()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn keeps the workers clear of the server's threads and sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+
+# Create a global pool instance (worker processes start on first use or at app startup)
+dsp_pool = deferred(lambda: DSPPool(
+    workers=settings.DSP_POOL_WORKERS,
+    max_queue=settings.DSP_POOL_MAX_QUEUE,
+    queue_timeout=settings.DSP_QUEUE_TIMEOUT,
+))
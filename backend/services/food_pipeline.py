@@ -0,0 +1,252 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Dict, List, NamedTuple, Optional, TypeVar
+
+from services.answer_reservoir import annoyed_reservoir
+from services.deadline import stage_scope
+from services.metrics import metrics
+from services.intent_classifier import food_intent_classifier
+from services.llm_service import get_annoyed_response, get_restaurant_description_prompt
+from services.scraping_service import (
+    RestaurantData,
+    analyze_food_intent,
+    find_restaurants_near,
+    select_random_restaurant,
+)
+from services.speech_pipeline import speech_pipeline
+
+T = TypeVar("T")
+
+# The vampire voice sounds perfectly annoyed
+ANNOYED_VOICE = "deep_ah"
+
+NO_RESTAURANT_RESPONSE = "The winds whisper of distant places where sustenance awaits beyond the veil of knowing... The shell has spoken."
+NO_LOCATION_RESPONSE = "The cosmic currents flow toward unknown destinations where nourishment calls to those who seek... The shell has spoken."
+
+
+class FoodPlan(NamedTuple):
+    """What the conch answers to a food question, before its audio is rendered"""
+    message: str
+    audio_url: Optional[str]                # Finished audio (pooled or spoken with the description), else None
+    voice: str
+    restaurant: Optional[RestaurantData]
+    timings: Dict[str, float]               # Seconds spent in each stage that was used
+    elapsed: float                          # Wall-clock seconds of the whole plan
+    saved: float                            # Seconds saved against running the stages one after another
+
+
+async def _timed(stage: str, timings: Dict[str, float], work: Awaitable[T]) -> T:
+    started = time.perf_counter()
+    # Upstream calls made by the stage are held to its sub-budget
+    with stage_scope(stage):
+        result = await work
+    timings[stage] = time.perf_counter() - started
+    metrics.observe_stage(stage, timings[stage])
+    return result
+
+
+async def _cancel(task: Optional[asyncio.Task]) -> bool:
+    # Returns True if the task was still running, i.e. its work was thrown away
+    if task is None or task.done():
+        return False
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        print(f"Error in cancelled pipeline stage: {e}")
+    return True
+
+
+def _same_query(first: str, second: str) -> bool:
+    return first.strip().lower() == second.strip().lower()
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    """
+    Format stage timings as a Server-Timing header
+
+    Args:
+        timings: Seconds by stage name
+
+    Returns:
+        Header value with each stage's duration in milliseconds
+    """
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
+class FoodPipeline:
+    """
+    Concurrent pipeline behind /api/what-to-eat.
+
+    The stages used to run one after another: intent analysis, restaurant
+    search, restaurant description (spoken while it is written). Now the restaurant search starts at once,
+    with the local intent classifier's search phrase, while the intent is
+    still being settled; when the question looks off-topic the annoyed
+    answer is prepared alongside instead. Once the intent is known the
+    losing work is cancelled, and a search made with the wrong phrase is
+    replaced by one with the right phrase.
+
+    Each plan records how long its stages took and how much sooner it
+    finished than the same stages would have run in sequence.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.searches_started = 0
+        self.searches_used = 0
+        self.searches_cancelled = 0
+        self.searches_redone = 0
+        self.annoyed_started = 0
+        self.annoyed_used = 0
+        self.annoyed_cancelled = 0
+        self.elapsed = 0.0
+        self.saved = 0.0
+        self._lock = threading.Lock()
+
+    async def plan(self, question: str, latitude: Optional[float], longitude: Optional[float],
+                   voice: str, client_id: Optional[str] = None) -> FoodPlan:
+        """
+        Work out the answer to a food question
+
+        Args:
+            question: The user's question
+            latitude: User's latitude, if known
+            longitude: User's longitude, if known
+            voice: Voice requested for food answers (already validated)
+            client_id: Identity of the client, for the annoyed reservoir's no-repeat rule
+
+        Returns:
+            The answer text, pooled audio if any, the voice, the chosen restaurant and timings
+        """
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        has_location = latitude is not None and longitude is not None
+
+        # The local classifier's guess decides what to start speculatively
+        guess = food_intent_classifier.classify(question)
+        sure = guess.confidence >= food_intent_classifier.threshold
+
+        intent_task = asyncio.create_task(_timed("intent", timings, analyze_food_intent(question)))
+        search_task = annoyed_task = None
+        if has_location and (guess.is_food_related or not sure):
+            search_task = asyncio.create_task(
+                _timed("search", timings, find_restaurants_near(latitude, longitude, guess.search_query))
+            )
+            self._count("searches_started")
+        if not guess.is_food_related and not annoyed_reservoir.available(ANNOYED_VOICE):
+            # Nothing pooled, so the annoyed answer will have to be generated
+            annoyed_task = asyncio.create_task(_timed("annoyed", timings, get_annoyed_response(question)))
+            self._count("annoyed_started")
+
+        restaurant = None
+        audio_url = None
+        try:
+            intent = await intent_task
+
+            if not intent["is_food_related"]:
+                if await _cancel(search_task):
+                    self._count("searches_cancelled")
+                timings.pop("search", None)
+                voice = ANNOYED_VOICE
+                pooled = await annoyed_reservoir.take(voice, client_id)
+                if pooled:
+                    print("Question is not food-related. Using a ready-made annoyed response.")
+                    message, audio_url = pooled.message, pooled.audio_url
+                    if await _cancel(annoyed_task):
+                        self._count("annoyed_cancelled")
+                    timings.pop("annoyed", None)
+                else:
+                    print("Question is not food-related. Generating annoyed response.")
+                    if annoyed_task is not None:
+                        message = await annoyed_task
+                        self._count("annoyed_used")
+                    else:
+                        message = await _timed("annoyed", timings, get_annoyed_response(question))
+                    annoyed_reservoir.remember(client_id, message)
+            else:
+                print(f"Food-related question detected. Intent: {intent['intent']}")
+                if await _cancel(annoyed_task):
+                    self._count("annoyed_cancelled")
+                timings.pop("annoyed", None)
+
+                if has_location:
+                    restaurants = await self._search(intent.get("search_query") or "restaurants",
+                                                     guess.search_query, search_task, latitude, longitude, timings)
+                    restaurant = select_random_restaurant(restaurants)
+                    if restaurant:
+                        # The description is spoken sentence by sentence as Gemini writes it. The
+                        # budget covers its audio too, but only the writing is timed as the stage
+                        description_prompt = get_restaurant_description_prompt(
+                            restaurant.name, restaurant.type, restaurant.rating
+                        )
+                        with stage_scope("description"):
+                            message, audio_url = await speech_pipeline.speak(
+                                description_prompt, "food", voice, stage="description", timings=timings
+                            )
+                    else:
+                        print("No restaurants found, using mystical fallback")
+                        message = NO_RESTAURANT_RESPONSE
+                else:
+                    print("No location provided, using mystical fallback")
+                    message = NO_LOCATION_RESPONSE
+        finally:
+            # Nothing speculative outlives the request, even when it fails or is cancelled
+            for task in (intent_task, search_task, annoyed_task):
+                await _cancel(task)
+
+        elapsed = time.perf_counter() - started
+        saved = max(sum(timings.values()) - elapsed, 0.0)
+        with self._lock:
+            self.requests += 1
+            self.elapsed += elapsed
+            self.saved += saved
+        return FoodPlan(message, audio_url, voice, restaurant, timings, elapsed, saved)
+
+    async def _search(self, query: str, speculative_query: str, search_task: Optional[asyncio.Task],
+                      latitude: float, longitude: float, timings: Dict[str, float]) -> List[RestaurantData]:
+        if search_task is not None and _same_query(query, speculative_query):
+            self._count("searches_used")
+            return await search_task
+        if search_task is not None:
+            # Searched for the wrong thing: start over with the settled phrase
+            await _cancel(search_task)
+            self._count("searches_redone")
+        print(f"Searching for restaurants near {latitude}, {longitude}")
+        return await _timed("search", timings, find_restaurants_near(latitude, longitude, query))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pipeline counters
+
+        Returns:
+            Dictionary with speculation outcomes and the mean latency and time saved per request
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "searches": {
+                    "started": self.searches_started,
+                    "used": self.searches_used,
+                    "cancelled": self.searches_cancelled,
+                    "redone": self.searches_redone,
+                },
+                "annoyed": {
+                    "started": self.annoyed_started,
+                    "used": self.annoyed_used,
+                    "cancelled": self.annoyed_cancelled,
+                },
+                "mean_latency_ms": self.elapsed / self.requests * 1000 if self.requests else 0.0,
+                "mean_saved_ms": self.saved / self.requests * 1000 if self.requests else 0.0,
+                "saved_seconds": self.saved,
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+# Create a global pipeline instance
+food_pipeline = FoodPipeline()
@@ -0,0 +1,171 @@
+import math
+import re
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from config.settings import deferred, settings
+
+# Lexicon of (weight, kind). Positive weights point to a food question,
+# negative ones away from it. Dishes, cuisines and modifiers also end up in
+# the restaurant search phrase.
+FOOD_LEXICON: Dict[str, Tuple[float, str]] = {
+    # Eating and meals
+    "eat": (3.0, ""), "eating": (3.0, ""), "ate": (2.0, ""), "hungry": (3.5, ""), "starving": (3.0, ""),
+    "food": (3.0, ""), "foods": (3.0, ""), "restaurant": (3.0, ""), "restaurants": (3.0, ""),
+    "lunch": (3.0, ""), "dinner": (3.0, ""), "breakfast": (3.0, ""), "brunch": (3.0, ""),
+    "supper": (3.0, ""), "meal": (3.0, ""), "meals": (3.0, ""), "snack": (2.5, ""), "snacks": (2.5, ""),
+    "dessert": (2.5, "dish"), "cuisine": (2.5, ""), "dish": (2.0, ""), "takeout": (3.0, ""),
+    "takeaway": (3.0, ""), "craving": (2.5, ""), "crave": (2.5, ""), "cravings": (2.5, ""),
+    "cook": (1.5, ""), "delicious": (2.0, ""), "tasty": (2.0, ""), "yummy": (2.0, ""),
+    "drink": (1.0, ""), "hangry": (3.0, ""), "feast": (2.0, ""), "cafe": (2.5, "dish"),
+    "coffee": (2.0, "dish"), "bakery": (2.5, "dish"), "buffet": (2.5, "dish"), "mamak": (3.0, "dish"),
+    "hawker": (2.5, "dish"), "street food": (3.0, "dish"), "fast food": (3.0, "dish"),
+    # Dishes
+    "pizza": (3.0, "dish"), "burger": (3.0, "dish"), "burgers": (3.0, "dish"), "sushi": (3.0, "dish"),
+    "ramen": (3.0, "dish"), "noodles": (2.5, "dish"), "noodle": (2.5, "dish"), "pasta": (3.0, "dish"),
+    "taco": (3.0, "dish"), "tacos": (3.0, "dish"), "curry": (3.0, "dish"), "steak": (3.0, "dish"),
+    "bbq": (3.0, "dish"), "barbecue": (3.0, "dish"), "seafood": (3.0, "dish"), "fish": (1.5, "dish"),
+    "chicken": (2.0, "dish"), "salad": (2.5, "dish"), "sandwich": (2.5, "dish"), "dumplings": (3.0, "dish"),
+    "pho": (3.0, "dish"), "kebab": (3.0, "dish"), "shawarma": (3.0, "dish"), "falafel": (3.0, "dish"),
+    "nasi lemak": (3.5, "dish"), "nasi": (2.5, "dish"), "roti": (3.0, "dish"), "satay": (3.0, "dish"),
+    "laksa": (3.0, "dish"), "dim sum": (3.0, "dish"), "fried rice": (3.0, "dish"), "rice": (1.5, "dish"),
+    "cake": (2.0, "dish"), "ice cream": (3.0, "dish"), "donut": (2.5, "dish"), "donuts": (2.5, "dish"),
+    "bubble tea": (3.0, "dish"), "boba": (3.0, "dish"), "fries": (2.5, "dish"), "hotpot": (3.0, "dish"),
+    "hot pot": (3.0, "dish"), "soup": (2.0, "dish"), "dumpling": (3.0, "dish"), "bread": (1.5, "dish"),
+    "burrito": (3.0, "dish"), "brownies": (2.5, "dish"), "pancakes": (3.0, "dish"), "waffles": (3.0, "dish"),
+    "tea": (1.0, "dish"),
+    # Cuisines
+    "korean": (1.5, "cuisine"), "japanese": (1.5, "cuisine"), "chinese": (1.5, "cuisine"),
+    "thai": (1.5, "cuisine"), "indian": (1.5, "cuisine"), "italian": (1.5, "cuisine"),
+    "mexican": (1.5, "cuisine"), "malay": (1.5, "cuisine"), "vietnamese": (1.5, "cuisine"),
+    "western": (1.0, "cuisine"), "french": (1.0, "cuisine"), "middle eastern": (1.5, "cuisine"),
+    # Modifiers
+    "vegetarian": (2.0, "modifier"), "vegan": (2.0, "modifier"), "halal": (2.0, "modifier"),
+    "spicy": (1.5, "modifier"), "healthy": (1.0, "modifier"), "cheap": (0.5, "modifier"),
+    "gluten free": (2.0, "modifier"),
+    # Other matters, which annoy the conch
+    "job": (-2.5, ""), "work": (-2.0, ""), "career": (-2.5, ""), "boss": (-2.5, ""), "quit": (-1.5, ""),
+    "love": (-2.0, ""), "relationship": (-2.5, ""), "girlfriend": (-2.5, ""), "boyfriend": (-2.5, ""),
+    "crush": (-2.5, ""), "text": (-2.0, ""), "marry": (-2.5, ""), "ex": (-2.0, ""), "date": (-1.0, ""),
+    "homework": (-2.5, ""), "exam": (-2.5, ""), "study": (-2.0, ""), "school": (-2.0, ""),
+    "money": (-2.0, ""), "invest": (-2.5, ""), "stock": (-2.0, ""), "stocks": (-2.0, ""), "crypto": (-2.5, ""),
+    "car": (-2.0, ""), "buy": (-0.5, ""), "weather": (-2.5, ""), "rain": (-2.0, ""), "life": (-2.0, ""),
+    "meaning": (-2.0, ""), "sleep": (-2.0, ""), "movie": (-2.5, ""), "game": (-2.0, ""), "song": (-2.5, ""),
+    "music": (-2.5, ""), "code": (-2.5, ""), "laptop": (-2.5, ""), "phone": (-2.0, ""), "haircut": (-2.5, ""),
+    "politics": (-2.5, ""), "horoscope": (-2.5, ""), "friend": (-1.5, ""), "friends": (-1.5, ""),
+    "happy": (-1.0, ""), "future": (-1.5, ""), "travel": (-1.0, ""), "dance": (-2.0, ""),
+}
+
+# Phrasings that clearly ask what to eat
+FOOD_PHRASES = [
+    (re.compile(r"\b(what|where)\b.*\b(to|should i|shall i|can i|do i)\s+(eat|grab|order|have for)\b"), 4.0),
+    (re.compile(r"\bfeel(ing)? like (having|eating)\b"), 3.0),
+    (re.compile(r"\bi'?m (so )?(hungry|starving|famished)\b"), 3.0),
+]
+
+# Score of a question without any food or non-food words: unsure, leaning "not food"
+PRIOR = -1.0
+
+
+class IntentPrediction(NamedTuple):
+    """Outcome of the local food-intent classifier"""
+    is_food_related: bool
+    search_query: str
+    intent: str
+    confidence: float    # Probability of the predicted class, 0.5-1.0
+
+
+def _tokens(question: str) -> List[str]:
+    words = re.findall(r"[a-z]+(?:'[a-z]+)?", question.lower())
+    # Single words and two-word terms such as "dim sum"
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class FoodIntentClassifier:
+    """
+    Local, weighted-lexicon classifier for food questions.
+
+    Adds up the weights of the food and non-food terms in a question and
+    turns the score into a probability with a logistic function. Questions it
+    is sure about are answered in microseconds; the rest are left to the LLM.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.local = 0
+        self.deferred = 0
+
+    def classify(self, question: str) -> IntentPrediction:
+        """
+        Classify a question
+
+        Args:
+            question: The user's question
+
+        Returns:
+            Food or not, the restaurant search phrase, the intent and the confidence
+        """
+        score = PRIOR
+        terms = {"dish": [], "cuisine": [], "modifier": []}
+        for token in _tokens(question):
+            weight, kind = FOOD_LEXICON.get(token, (0.0, ""))
+            score += weight
+            if kind and token not in terms[kind]:
+                terms[kind].append(token)
+        lowered = question.lower()
+        for pattern, weight in FOOD_PHRASES:
+            if pattern.search(lowered):
+                score += weight
+
+        probability = 1 / (1 + math.exp(-score))
+        is_food_related = probability >= 0.5
+        confidence = probability if is_food_related else 1 - probability
+        if not is_food_related:
+            return IntentPrediction(False, "restaurants", "asking about something other than food", confidence)
+
+        # Drop single words that are part of a matched two-word term ("nasi" in "nasi lemak")
+        dishes = [d for d in terms["dish"] if not any(d != other and d in other.split() for other in terms["dish"])]
+        if dishes:
+            food = " ".join(terms["cuisine"] + dishes)
+        elif terms["cuisine"]:
+            food = f"{' '.join(terms['cuisine'])} restaurants"
+        else:
+            food = "restaurants"
+        search_query = " ".join(terms["modifier"] + [food])
+        intent = "seeking food guidance" if search_query == "restaurants" else f"craving {search_query}"
+        return IntentPrediction(True, search_query, intent, confidence)
+
+    def is_confident(self, prediction: IntentPrediction) -> bool:
+        """
+        Check if a prediction can be used without asking the LLM, and count the outcome
+
+        Args:
+            prediction: Result of classify
+
+        Returns:
+            True if the confidence reaches the threshold
+        """
+        confident = prediction.confidence >= self.threshold
+        if confident:
+            self.local += 1
+        else:
+            self.deferred += 1
+        return confident
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get classifier counters
+
+        Returns:
+            Dictionary with local decisions, LLM deferrals and the share of LLM calls avoided
+        """
+        total = self.local + self.deferred
+        return {
+            "threshold": self.threshold,
+            "local": self.local,
+            "deferred_to_llm": self.deferred,
+            "llm_calls_avoided": self.local / total if total else 0.0,
+        }
+
+
+# Create a global classifier instance
+food_intent_classifier = deferred(lambda: FoodIntentClassifier(settings.INTENT_CONFIDENCE_THRESHOLD))
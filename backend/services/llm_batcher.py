@@ -0,0 +1,262 @@
+import asyncio
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+
+def parse_personas(value: str) -> Set[str]:
+    """
+    Parse a comma-separated list of persona names from a setting
+
+    Args:
+        value: e.g. "cryptic,annoyed"
+
+    Returns:
+        Set of persona names
+    """
+    return {persona.strip() for persona in value.split(",") if persona.strip()}
+
+
+def build_batch_prompt(system_prompt: str, prompts: List[str]) -> str:
+    """
+    Build one prompt that asks a persona several questions at once
+
+    The system prompt is sent once for the whole batch; the questions go in
+    as a JSON array so quotes and line breaks in them can't blur their order.
+
+    Args:
+        system_prompt: System prompt sent with the questions, if any
+        prompts: The questions, in order
+
+    Returns:
+        Prompt asking for a JSON array with one answer per question
+    """
+    instructions = (
+        f"You are answering {len(prompts)} different people at once. Answer each question on its own, "
+        f"exactly as you would if it were the only one.\n"
+        f"Respond with only a JSON array of {len(prompts)} strings: the answer to the first question first, "
+        f"then the answer to the second, and so on.\n\n"
+        f"Questions: {json.dumps(prompts, ensure_ascii=False)}"
+    )
+    return f"{system_prompt}\n\n{instructions}" if system_prompt else instructions
+
+
+def parse_batch_reply(reply: str, count: int) -> Optional[List[Optional[str]]]:
+    """
+    Split the reply to a batch prompt into its answers
+
+    Args:
+        reply: Text the model returned
+        count: Number of questions in the batch
+
+    Returns:
+        One answer per question (None for an item that isn't a usable answer),
+        or None if the reply isn't a JSON array of the right length, in which
+        case no answer can be matched to its question
+    """
+    text = reply.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+    if text.endswith("```"):
+        text = text[:-3]
+    try:
+        items = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(items, list) or len(items) != count:
+        return None
+
+    answers: List[Optional[str]] = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get("answer")
+        answers.append(item.strip() if isinstance(item, str) and item.strip() else None)
+    return answers
+
+
+class _Batch:
+    """Questions for one persona waiting to be sent together"""
+
+    def __init__(self, persona: str, system_prompt: str):
+        self.persona = persona
+        self.system_prompt = system_prompt
+        self.items: List[Tuple[str, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class LLMBatcher:
+    """
+    Micro-batches concurrent LLM calls of the same persona.
+
+    While a persona has calls in flight, new questions for it are collected
+    for a short window (or until the batch is full) and sent as one prompt
+    that carries the system prompt once and asks for a JSON array with one
+    answer per question. The answers are handed back to the waiting callers.
+    An answer missing from the reply is asked for on its own, and so is
+    every question of a reply that isn't a JSON array of the right length.
+    A call that arrives while its persona is idle is sent straight away, so
+    batching adds no latency without load.
+    """
+
+    def __init__(self, personas: Set[str], window: float, max_items: int,
+                 generate_one: Callable[[str, str, str], Awaitable[str]],
+                 generate_batch: Callable[[str, str, int], Awaitable[str]]):
+        self.personas = personas
+        self.window = window
+        self.max_items = max_items
+        self.generate_one = generate_one
+        self.generate_batch = generate_batch
+        self.singles = 0
+        self.batches_sent = 0
+        self.batched_items = 0
+        self.parse_failures = 0
+        self.fallbacks = 0
+        self._active: Dict[str, int] = {}
+        self._open: Dict[Tuple[str, str], _Batch] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+    def batches(self, persona: str) -> bool:
+        """
+        Check if a persona's calls are batched
+
+        Args:
+            persona: Persona name
+
+        Returns:
+            True if the persona is listed and batches may hold more than one call
+        """
+        return self.max_items > 1 and persona in self.personas
+
+    def active(self, persona: str) -> int:
+        """
+        Count a persona's LLM calls in flight, streamed ones included
+
+        Args:
+            persona: Persona name
+
+        Returns:
+            Number of calls started and not yet answered
+        """
+        return self._active.get(persona, 0)
+
+    @contextmanager
+    def tracking(self, persona: str) -> Iterator[None]:
+        """
+        Count an LLM call as in flight for the length of the block
+
+        Args:
+            persona: Persona making the call
+        """
+        with self._lock:
+            self._active[persona] = self._active.get(persona, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active[persona] -= 1
+
+    async def submit(self, persona: str, prompt: str, system_prompt: str) -> str:
+        """
+        Get a persona's answer, batched with concurrent calls when there are any
+
+        Args:
+            persona: Persona answering
+            prompt: The user's question or prompt
+            system_prompt: Extra system prompt sent with the question
+
+        Returns:
+            Generated text response
+
+        Raises:
+            Whatever the model call for this question raised
+        """
+        key = (persona, system_prompt)
+        with self.tracking(persona):
+            if not self.batches(persona) or (self.active(persona) == 1 and key not in self._open):
+                self.singles += 1
+                return await self.generate_one(persona, prompt, system_prompt)
+
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            batch = self._open.get(key)
+            if batch is None:
+                batch = self._open[key] = _Batch(persona, system_prompt)
+                batch.timer = loop.call_later(self.window, self._flush, key, batch)
+            batch.items.append((prompt, future))
+            if len(batch.items) >= self.max_items:
+                self._flush(key, batch)
+            return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching counters
+
+        Returns:
+            Dictionary with calls sent alone, batches sent, mean batch size and fallbacks
+        """
+        return {
+            "personas": sorted(self.personas),
+            "window_ms": self.window * 1000,
+            "max_items": self.max_items,
+            "singles": self.singles,
+            "batches": self.batches_sent,
+            "batched_items": self.batched_items,
+            "mean_batch_size": self.batched_items / self.batches_sent if self.batches_sent else 0.0,
+            "parse_failures": self.parse_failures,
+            "fallbacks": self.fallbacks,
+        }
+
+    def _flush(self, key: Tuple[str, str], batch: _Batch) -> None:
+        if self._open.get(key) is not batch:
+            return
+        del self._open[key]
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        # Callers that went away are left out
+        items = [(prompt, future) for prompt, future in batch.items if not future.done()]
+        if len(items) <= 1:
+            for prompt, future in items:
+                self.singles += 1
+                await self._answer_alone(batch, prompt, future)
+            return
+
+        self.batches_sent += 1
+        self.batched_items += len(items)
+        try:
+            batch_prompt = build_batch_prompt(batch.system_prompt, [prompt for prompt, _ in items])
+            reply = await self.generate_batch(batch.persona, batch_prompt, len(items))
+            answers = parse_batch_reply(reply, len(items))
+        except Exception as e:
+            print(f"Error in batched LLM call for {batch.persona}: {e}")
+            answers = None
+        if answers is None:
+            self.parse_failures += 1
+            answers = [None] * len(items)
+
+        missing = []
+        for (prompt, future), answer in zip(items, answers):
+            if answer is None:
+                missing.append((prompt, future))
+            elif not future.done():
+                future.set_result(answer)
+        if missing:
+            print(f"Asking {len(missing)} of {len(items)} batched {batch.persona} questions on their own")
+            self.fallbacks += len(missing)
+            await asyncio.gather(*(self._answer_alone(batch, prompt, future) for prompt, future in missing))
+
+    async def _answer_alone(self, batch: _Batch, prompt: str, future: asyncio.Future) -> None:
+        try:
+            answer = await self.generate_one(batch.persona, prompt, batch.system_prompt)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(answer)
@@ -0,0 +1,265 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import deferred, settings
+
+# What a persona does with a cached response
+CACHE_POLICIES = ("reuse", "fresh")
+
+# Rows beyond the disk quota are trimmed after this many writes
+L2_TRIM_INTERVAL = 100
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt for cache lookups
+
+    Case, punctuation and spacing are dropped, so "Should I text them?" and
+    "should i text them" share one entry.
+
+    Args:
+        prompt: Prompt text
+
+    Returns:
+        Normalized prompt
+    """
+    return " ".join(re.sub(r"[^\w\s']", " ", prompt.casefold()).split())
+
+
+def make_llm_cache_key(persona: str, prompt: str, system_prompt: str, model: str,
+                       generation_config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the cache key of an LLM response
+
+    Args:
+        persona: Persona answering, e.g. "cryptic"
+        prompt: The user's question or prompt
+        system_prompt: System prompt the persona is given
+        model: Gemini model id
+        generation_config: Generation settings sent with the request
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    payload = json.dumps({
+        "persona": persona,
+        "prompt": normalize_prompt(prompt),
+        "system_prompt": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+        "model": model,
+        "generation_config": generation_config or {},
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def parse_cache_policies(value: str) -> Dict[str, str]:
+    """
+    Parse per-persona cache policies from a setting
+
+    Args:
+        value: Comma-separated persona=policy pairs, e.g. "cryptic=reuse,food=fresh"
+
+    Returns:
+        Dictionary of policies by persona (unknown policies are skipped)
+    """
+    policies = {}
+    for item in value.split(","):
+        persona, _, policy = item.partition("=")
+        persona, policy = persona.strip(), policy.strip().lower()
+        if persona and policy in CACHE_POLICIES:
+            policies[persona] = policy
+        elif persona:
+            print(f"Warning: Unknown LLM cache policy '{item.strip()}' ignored")
+    return policies
+
+
+class LLMCache:
+    """
+    Two-tier cache of LLM responses.
+
+    L1 is an in-process LRU; L2 is a SQLite database on local disk, so
+    answers survive restarts and are shared by every worker process. Entries
+    expire after the TTL. Each persona either reuses cached answers or always
+    asks the model afresh; fresh personas bypass both tiers.
+    """
+
+    def __init__(self, path: str, max_entries: int, max_disk_entries: int, ttl: float,
+                 policies: Dict[str, str], default_policy: str = "fresh"):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.policies = policies
+        self.default_policy = default_policy
+        self._l1: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._db = None
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+
+    def policy(self, persona: str) -> str:
+        """
+        Get a persona's cache policy
+
+        Args:
+            persona: Persona name
+
+        Returns:
+            "reuse" or "fresh"
+        """
+        return self.policies.get(persona, self.default_policy)
+
+    async def get(self, persona: str, key: str) -> Optional[str]:
+        """
+        Look up a response in L1, then L2
+
+        Args:
+            persona: Persona name, for the hit counters
+            key: Key from make_llm_cache_key
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is not None and entry[1] > now:
+                self._l1.move_to_end(key)
+                self._count(persona, "l1_hits")
+                return entry[0]
+            if entry is not None:
+                del self._l1[key]
+
+        try:
+            row = await asyncio.to_thread(self._l2_get, key, now)
+        except Exception as e:
+            print(f"Error reading LLM cache: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self._count(persona, "misses")
+                return None
+            self._l1_put(key, row[0], row[1])
+            self._count(persona, "l2_hits")
+        return row[0]
+
+    async def put(self, persona: str, key: str, response: str) -> None:
+        """
+        Store a response in both tiers
+
+        Args:
+            persona: Persona name
+            key: Key from make_llm_cache_key
+            response: Response text
+        """
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._l1_put(key, response, expires)
+        try:
+            await asyncio.to_thread(self._l2_put, key, persona, response, expires)
+        except Exception as e:
+            print(f"Error writing LLM cache: {e}")
+
+    def close(self) -> None:
+        """Close the L2 database"""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with L1 size and hit rates per persona
+        """
+        with self._lock:
+            personas = {}
+            for persona, counters in self._counters.items():
+                lookups = counters["l1_hits"] + counters["l2_hits"] + counters["misses"]
+                personas[persona] = dict(
+                    counters,
+                    policy=self.policy(persona),
+                    hit_rate=(counters["l1_hits"] + counters["l2_hits"]) / lookups if lookups else 0.0,
+                )
+            return {
+                "l1_entries": len(self._l1),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "personas": personas,
+            }
+
+    def count_bypass(self, persona: str) -> None:
+        """Count a call that skipped the cache because its persona is always fresh"""
+        with self._lock:
+            self._count(persona, "bypassed")
+
+    def _count(self, persona: str, counter: str) -> None:
+        counters = self._counters.setdefault(persona, {"l1_hits": 0, "l2_hits": 0, "misses": 0, "bypassed": 0})
+        counters[counter] += 1
+
+    def _l1_put(self, key: str, response: str, expires: float) -> None:
+        self._l1[key] = (response, expires)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.max_entries:
+            self._l1.popitem(last=False)
+
+    def _connection(self):
+        # The database is opened on first use, so processes that never call the LLM don't create it
+        if self._db is None:
+            import sqlite3
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, persona TEXT, response TEXT, created REAL, expires REAL)"
+            )
+            db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _l2_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        with self._db_lock:
+            return self._connection().execute(
+                "SELECT response, expires FROM responses WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+
+    def _l2_put(self, key: str, persona: str, response: str, expires: float) -> None:
+        with self._db_lock:
+            db = self._connection()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, persona, response, created, expires) VALUES (?, ?, ?, ?, ?)",
+                (key, persona, response, time.time(), expires)
+            )
+            self._writes += 1
+            if self._writes % L2_TRIM_INTERVAL == 0:
+                # Drop expired rows, then the oldest ones beyond the disk quota
+                db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+                db.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,)
+                )
+            db.commit()
+
+
+# Create a global cache instance
+llm_cache = deferred(lambda: LLMCache(
+    path=settings.LLM_CACHE_PATH,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    max_disk_entries=settings.LLM_CACHE_MAX_DISK_ENTRIES,
+    ttl=settings.LLM_CACHE_TTL,
+    policies=parse_cache_policies(settings.LLM_CACHE_POLICIES),
+))
@@ -1,34 +1,304 @@
 # services/llm_service.py
-import google.generativeai as genai  # type: ignore
-from config.settings import settings
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, NamedTuple, Optional
+from config.settings import deferred, settings
+from services.clients import upstream_clients
+from services.deadline import hedged_upstream, stage_timeout
+from services.llm_batcher import LLMBatcher, parse_personas
+from services.llm_cache import llm_cache, make_llm_cache_key
+from services.metrics import metrics
+from services.single_flight import single_flight
 
-# Configure Gemini AI with API key
-genai.configure(api_key=settings.GEMINI_API_KEY)  # type: ignore
+# Gemini model used for every persona
+GEMINI_MODEL = 'gemini-2.5-flash-preview-05-20'
 
-# Create a model instance globally
-model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')  # type: ignore
+# Gemini calls are bounded by the "llm" stage budget, hedged when slow and
+# skipped while Gemini's circuit breaker is open
+_gemini_calls = hedged_upstream("gemini", stage="llm")
 
+# GenerativeModel per persona, created on first use
+_models: Dict[str, Any] = {}
 
-def get_llm_response(prompt: str, system_prompt: str = "") -> str:
+# Identical prompts in flight at the same time share one Gemini call
+_llm_calls = single_flight("llm")
+
+# Returned instead of an answer when Gemini can't be reached
+LLM_ERROR_RESPONSE = "The magic conch is experiencing technical difficulties..."
+
+
+class LLMStreamTruncated(Exception):
+    """Raised when a streamed answer breaks off after part of it has been given out"""
+
+
+class PersonaModel(NamedTuple):
+    """How a persona's requests are sent to Gemini"""
+    instruction: Callable[[], str]                      # Fixed prompt, sent as the native system instruction
+    max_output_tokens: int                              # Cap on the reply, thinking tokens included
+    response_schema: Optional[Dict[str, Any]] = None    # JSON schema of a structured reply
+
+
+def get_model(persona: str = "default"):
+    """
+    Get the shared Gemini model of a persona, creating it on first use
+    
+    Registered personas get a model carrying their system instruction and
+    generation settings, so requests only send the question; other personas
+    share a plain model.
+    
+    Args:
+        persona: Persona answering
+        
+    Returns:
+        GenerativeModel on the process-wide Gemini client
+    """
+    name = _persona_name(persona)
+    model = _models.get(name)
+    if model is None:
+        genai = upstream_clients.gemini()
+        config = PERSONA_MODELS.get(name)
+        if config is None:
+            model = genai.GenerativeModel(GEMINI_MODEL)  # type: ignore
+        else:
+            model = genai.GenerativeModel(  # type: ignore
+                GEMINI_MODEL,
+                system_instruction=config.instruction(),
+                generation_config=get_generation_config(persona),
+            )
+        _models[name] = model
+    return model
+
+
+def get_generation_config(persona: str) -> Dict[str, Any]:
+    """
+    Get the generation settings a persona's requests are sent with
+    
+    Args:
+        persona: Persona answering
+        
+    Returns:
+        Gemini generation config (empty for personas without a registered model)
+    """
+    config = PERSONA_MODELS.get(_persona_name(persona))
+    if config is None:
+        return {}
+    generation_config: Dict[str, Any] = {"max_output_tokens": config.max_output_tokens}
+    if config.response_schema is not None:
+        generation_config["response_mime_type"] = "application/json"
+        generation_config["response_schema"] = config.response_schema
+    return generation_config
+
+
+def get_llm_cache_key(persona: str, prompt: str, system_prompt: str = "") -> str:
+    """
+    Build the LLM cache key of a persona's answer to a prompt
+    
+    The key covers the persona's system instruction and generation settings,
+    so editing either retires the answers cached under the old ones.
+    
+    Args:
+        persona: Persona answering
+        prompt: The user's question or prompt
+        system_prompt: Extra system prompt sent with the request
+        
+    Returns:
+        Key for the LLM cache
+    """
+    config = PERSONA_MODELS.get(_persona_name(persona))
+    instruction = "\n\n".join(part for part in (config.instruction() if config else "", system_prompt) if part)
+    return make_llm_cache_key(persona, prompt, instruction, GEMINI_MODEL, get_generation_config(persona))
+
+
+async def get_llm_response(prompt: str, system_prompt: str = "", persona: str = "default") -> str:
     """
     Get response from Google Gemini LLM
     
+    Uses Gemini's async API, so other requests keep being served while this
+    one waits for the model. Concurrent calls with the same prompt share one
+    Gemini request, and concurrent calls of batching personas share a
+    batched one. Personas whose cache policy is "reuse" answer repeated
+    questions from the LLM cache without calling Gemini.
+    
     Args:
         prompt: The user's question or prompt
-        system_prompt: Optional system prompt to set context
+        system_prompt: Optional system prompt to set context, on top of the
+            system instruction of a registered persona
+        persona: Persona answering, which selects the model and the cache policy
         
     Returns:
         Generated text response
     """
     print(f"Sending to LLM: {prompt}")
+    cached = await get_cached_llm_response(prompt, system_prompt, persona)
+    if cached is not None:
+        return cached
+    return await get_uncached_llm_response(prompt, system_prompt, persona)
+
+
+async def get_uncached_llm_response(prompt: str, system_prompt: str = "", persona: str = "default") -> str:
+    """
+    Get a response from Google Gemini without looking in the LLM cache
+    
+    Concurrent calls with the same prompt share one Gemini request, and
+    concurrent calls of personas listed in LLM_BATCH_PERSONAS are sent
+    together as one batched request. The answer is still cached for
+    personas that reuse answers.
+    
+    Args:
+        prompt: The user's question or prompt
+        system_prompt: Optional system prompt to set context
+        persona: Persona answering, which selects the cache policy
+        
+    Returns:
+        Generated text response
+    """
     try:
-        # Combine system prompt with user prompt if provided
-        full_prompt = f"{system_prompt}\n\nUser question: {prompt}" if system_prompt else prompt
-        response = model.generate_content(full_prompt)
-        return response.text
+        contents = _contents(prompt, system_prompt)
+        response = await _llm_calls.do(
+            (_persona_name(persona), contents), lambda: llm_batcher.submit(persona, prompt, system_prompt)
+        )
+        await _cache_response(prompt, system_prompt, persona, response)
+        return response
     except Exception as e:
         print(f"Error in LLM response: {str(e)}")
-        return "The magic conch is experiencing technical difficulties..."
+        return LLM_ERROR_RESPONSE
+
+
+async def get_cached_llm_response(prompt: str, system_prompt: str = "", persona: str = "default") -> Optional[str]:
+    """
+    Look up a persona's answer in the LLM cache
+    
+    Args:
+        prompt: The user's question or prompt
+        system_prompt: System prompt the persona is given
+        persona: Persona answering, which selects the cache policy
+        
+    Returns:
+        The cached answer, or None on a miss or if the persona always asks afresh
+    """
+    if llm_cache.policy(persona) != "reuse":
+        llm_cache.count_bypass(persona)
+        return None
+    cached = await llm_cache.get(persona, get_llm_cache_key(persona, prompt, system_prompt))
+    metrics.cache_lookup("llm", cached is not None)
+    return cached
+
+
+async def stream_llm_response(prompt: str, system_prompt: str = "", persona: str = "default") -> AsyncIterator[str]:
+    """
+    Stream a response from Google Gemini as it is generated
+    
+    Unlike get_llm_response, the cache isn't consulted (callers check
+    get_cached_llm_response first), and identical prompts aren't coalesced or
+    hedged here, as a stream can't be shared; callers coalesce what they make
+    of it instead. The finished answer is cached for personas that reuse
+    answers.
+    
+    Args:
+        prompt: The user's question or prompt
+        system_prompt: Optional system prompt to set context
+        persona: Persona answering, which selects the cache policy
+        
+    Yields:
+        Pieces of the response text, in order (LLM_ERROR_RESPONSE alone if
+        Gemini fails before the first piece)
+        
+    Raises:
+        LLMStreamTruncated: If Gemini fails or the budget runs out after some
+            pieces were given out, so the caller doesn't take them for the answer
+    """
+    print(f"Streaming from LLM: {prompt}")
+    pieces = []
+    # A stream can't be hedged, but it is held to the "llm" stage budget and
+    # goes through Gemini's circuit breaker
+    timeout = stage_timeout("llm")
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        # Counted as in flight, so concurrent calls of the persona are batched
+        with llm_batcher.tracking(persona), _gemini_calls.breaker.guard():
+            response = await asyncio.wait_for(
+                get_model(persona).generate_content_async(_contents(prompt, system_prompt), stream=True),
+                _time_left(deadline)
+            )
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), _time_left(deadline))
+                except StopAsyncIteration:
+                    break
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # A chunk without text, e.g. the final one carrying only the finish reason
+                    continue
+                if text:
+                    pieces.append(text)
+                    yield text
+    except Exception as e:
+        print(f"Error in LLM stream: {str(e)}")
+        if pieces:
+            # A partial answer is never cached, nor taken for the whole one
+            raise LLMStreamTruncated(f"Answer broke off after {len(pieces)} pieces: {e}") from e
+        yield LLM_ERROR_RESPONSE
+        return
+    
+    try:
+        await _cache_response(prompt, system_prompt, persona, "".join(pieces))
+    except Exception as e:
+        print(f"Error caching streamed LLM response: {str(e)}")
+
+
+def _time_left(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+
+def _persona_name(persona: str) -> str:
+    # Personas of their own for cache purposes share the model of the persona they alias
+    return PERSONA_ALIASES.get(persona, persona)
+
+
+def _contents(prompt: str, system_prompt: str) -> str:
+    # A registered persona's system instruction travels with its model, not in the request
+    return f"{system_prompt}\n\nUser question: {prompt}" if system_prompt else prompt
+
+
+async def _cache_response(prompt: str, system_prompt: str, persona: str, response: str) -> None:
+    if llm_cache.policy(persona) == "reuse" and response:
+        await llm_cache.put(persona, get_llm_cache_key(persona, prompt, system_prompt), response)
+
+
+async def _generate(contents: str, persona: str = "default") -> str:
+    async def attempt() -> str:
+        response = await get_model(persona).generate_content_async(contents)
+        return response.text
+    return await _gemini_calls.call(attempt)
+
+
+async def _generate_one(persona: str, prompt: str, system_prompt: str) -> str:
+    return await _generate(_contents(prompt, system_prompt), persona)
+
+
+async def _generate_batch(persona: str, batch_prompt: str, count: int) -> str:
+    # A JSON array of strings, with room for every answer
+    generation_config = dict(get_generation_config(persona), response_mime_type="application/json",
+                             response_schema={"type": "array", "items": {"type": "string"}})
+    if "max_output_tokens" in generation_config:
+        generation_config["max_output_tokens"] *= count
+    
+    async def attempt() -> str:
+        response = await get_model(persona).generate_content_async(batch_prompt, generation_config=generation_config)
+        return response.text
+    return await _gemini_calls.call(attempt)
+
+
+# Concurrent calls of the same persona are sent as one batched request under load
+llm_batcher = deferred(lambda: LLMBatcher(
+    personas=parse_personas(settings.LLM_BATCH_PERSONAS),
+    window=settings.LLM_BATCH_WINDOW_MS / 1000,
+    max_items=settings.LLM_BATCH_MAX_ITEMS,
+    generate_one=_generate_one,
+    generate_batch=_generate_batch,
+))
 
 
 def get_cryptic_answer_prompt() -> str:
@@ -112,7 +382,46 @@ def get_annoyed_prompt() -> str:
     Express your cosmic annoyance at being asked about non-food matters."""
 
 
-def get_food_suggestion_with_context(user_question: str, restaurant_context: str, user_intent: str) -> str:
+def get_food_intent_prompt() -> str:
+    """
+    Returns the system prompt for analyzing whether a question is about food
+    """
+    return """Analyze the user's question and determine:
+    1. Is it food-related?
+    2. If yes, what should be searched for to find restaurants or food? (search terms for restaurants)
+    3. What is the user's intent? (a brief description of what they want)
+    
+    Reply with a JSON object with the fields is_food_related, search_query and intent."""
+
+
+# Structured reply of the food-intent persona
+FOOD_INTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "is_food_related": {"type": "boolean"},
+        "search_query": {"type": "string"},
+        "intent": {"type": "string"},
+    },
+    "required": ["is_food_related", "search_query", "intent"],
+}
+
+# Model settings of each persona. The caps count the model's thinking tokens
+# as well, so they leave room above the one or two sentences asked for.
+PERSONA_MODELS = {
+    "cryptic": PersonaModel(get_cryptic_answer_prompt, max_output_tokens=384),
+    "food": PersonaModel(get_food_prompt, max_output_tokens=512),
+    "annoyed": PersonaModel(get_annoyed_prompt, max_output_tokens=384),
+    "food_intent": PersonaModel(get_food_intent_prompt, max_output_tokens=256, response_schema=FOOD_INTENT_SCHEMA),
+}
+
+# Personas that answer like another one but keep their own cache entries
+PERSONA_ALIASES = {
+    "cryptic_reservoir": "cryptic",
+    "annoyed_reservoir": "annoyed",
+}
+
+
+async def get_food_suggestion_with_context(user_question: str, restaurant_context: str, user_intent: str) -> str:
     """
     Generate a mystical food suggestion using the restaurant context
     
@@ -134,12 +443,12 @@ def get_food_suggestion_with_context(user_question: str, restaurant_context: str
     Provide mystical food guidance that acknowledges their location without being helpful.
     """
     
-    return get_llm_response(context_prompt, get_food_prompt())
+    return await get_llm_response(context_prompt, persona="food")
 
 
-def get_mystical_restaurant_description(restaurant_name: str, restaurant_type: str, rating: float) -> str:
+def get_restaurant_description_prompt(restaurant_name: str, restaurant_type: str, rating: float) -> str:
     """
-    Generate a mystical description of a specific chosen restaurant
+    Build the prompt asking for a mystical description of a chosen restaurant
     
     Args:
         restaurant_name: Name of the chosen restaurant
@@ -147,25 +456,40 @@ def get_mystical_restaurant_description(restaurant_name: str, restaurant_type: s
         rating: Restaurant rating
         
     Returns:
-        Mystical description of the chosen place
+        Prompt for the food persona
     """
-    description_prompt = f"""
+    return f"""
     The cosmic forces have chosen a place for the mortal: "{restaurant_name}"
     It is a {restaurant_type} with a rating of {rating} stars.
     
     Describe this chosen place in mystical terms that sound profound but don't reveal 
     the actual name or practical details. Make it sound like destiny has chosen this place.
     """
+
+
+async def get_mystical_restaurant_description(restaurant_name: str, restaurant_type: str, rating: float) -> str:
+    """
+    Generate a mystical description of a specific chosen restaurant
     
-    return get_llm_response(description_prompt, get_food_prompt())
+    Args:
+        restaurant_name: Name of the chosen restaurant
+        restaurant_type: Type of restaurant
+        rating: Restaurant rating
+        
+    Returns:
+        Mystical description of the chosen place
+    """
+    description_prompt = get_restaurant_description_prompt(restaurant_name, restaurant_type, rating)
+    return await get_llm_response(description_prompt, persona="food")
 
 
-def get_annoyed_response(question: str) -> str:
+async def get_annoyed_response(question: str, persona: str = "annoyed") -> str:
     """
     Generate an annoyed response for non-food questions
     
     Args:
         question: The non-food question that annoyed the conch
+        persona: Persona name, which selects the cache policy
         
     Returns:
         Annoyed mystical response
@@ -176,4 +500,4 @@ def get_annoyed_response(question: str) -> str:
     This is not a matter of sustenance or nourishment. Express your cosmic displeasure.
     """
     
-    return get_llm_response(annoyed_prompt, get_annoyed_prompt())
+    return await get_llm_response(annoyed_prompt, persona=persona)
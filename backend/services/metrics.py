@@ -0,0 +1,315 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+
+from config.settings import deferred, settings
+
+# Latency buckets in seconds, from a cache hit to a stalled upstream call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Route of the request being served, so cache lookups deep in the services
+# are counted against the endpoint that made them
+_endpoint: ContextVar[str] = ContextVar("endpoint", default="background")
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """A named family of series, one per combination of label values"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _Value(_Metric):
+    """A family of series holding one number each"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """
+        Add to the series with the given label values
+
+        Args:
+            labels: One value per label name, in order
+            amount: How much to add
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in self._values.items()]
+
+
+class Counter(_Value):
+    """A value that only goes up, e.g. requests served"""
+
+    kind = "counter"
+
+
+class Gauge(_Value):
+    """A value that goes up and down, e.g. requests in flight"""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        """
+        Subtract from the series with the given label values
+
+        Args:
+            labels: One value per label name, in order
+            amount: How much to subtract
+        """
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        """
+        Set the series with the given label values
+
+        Args:
+            value: New value
+            labels: One value per label name, in order
+        """
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values, e.g. latencies, counted into cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: count in each bucket (not cumulative; the last is +Inf), sum
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record one value in the series with the given label values
+
+        Args:
+            value: Observed value, e.g. seconds
+            labels: One value per label name, in order
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames + ("le",), labels + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            series_labels = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{series_labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{series_labels} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """
+    Process-wide instrumentation, exposed on /metrics in the Prometheus text format.
+
+    Recording is a dictionary update under a short lock, so it can be done on
+    the hot path, from the event loop and from worker threads alike. Nothing
+    is aggregated until the endpoint is scraped.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.requests = Counter("conch_requests_total", "HTTP requests served",
+                                ("endpoint", "method", "status"))
+        self.request_errors = Counter("conch_request_errors_total",
+                                      "HTTP requests that failed with a server error", ("endpoint",))
+        self.request_duration = Histogram("conch_request_duration_seconds",
+                                          "Time to serve an HTTP request", ("endpoint",))
+        self.in_flight = Gauge("conch_requests_in_flight", "HTTP requests being served", ("endpoint",))
+        self.stage_duration = Histogram("conch_stage_duration_seconds",
+                                        "Time spent in each stage of a request", ("stage",))
+        self.upstream_duration = Histogram("conch_upstream_duration_seconds",
+                                           "Time of calls to the upstream providers", ("provider", "outcome"))
+        self.cache_lookups = Counter("conch_cache_lookups_total", "Cache lookups by the endpoint that made them",
+                                     ("endpoint", "cache", "result"))
+        self.breaker_state = Gauge("conch_circuit_breaker_open",
+                                   "Circuit breaker state: 0 closed, 0.5 half-open, 1 open", ("provider",))
+        self._metrics: List[_Metric] = [
+            self.requests, self.request_errors, self.request_duration, self.in_flight,
+            self.stage_duration, self.upstream_duration, self.cache_lookups, self.breaker_state,
+        ]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time the block as a stage of the current request
+
+        Args:
+            name: Stage name, e.g. "reverb"
+        """
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_duration.observe(time.perf_counter() - started, name)
+
+    def observe_stage(self, name: str, seconds: float) -> None:
+        """
+        Record the duration of a stage timed elsewhere
+
+        Args:
+            name: Stage name, e.g. "intent"
+            seconds: How long the stage took
+        """
+        if self.enabled:
+            self.stage_duration.observe(seconds, name)
+
+    def observe_upstream(self, provider: str, outcome: str, seconds: float) -> None:
+        """
+        Record the duration of an upstream call
+
+        Args:
+            provider: Provider name, e.g. "gemini"
+            outcome: "ok", "error" or "timeout"
+            seconds: How long the call took
+        """
+        if self.enabled:
+            self.upstream_duration.observe(seconds, provider, outcome)
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        """
+        Count a cache lookup against the endpoint being served
+
+        Args:
+            cache: Cache name, e.g. "audio"
+            hit: Whether the lookup found an entry
+        """
+        if self.enabled:
+            self.cache_lookups.inc(_endpoint.get(), cache, "hit" if hit else "miss")
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format
+
+        Returns:
+            The /metrics response body
+        """
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _route_label(scope) -> str:
+    # The route template keeps path parameters out of the labels
+    from starlette.routing import Match
+
+    app = scope.get("app")
+    partial = "unmatched"
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+        if match == Match.PARTIAL and partial == "unmatched":
+            # The path matched but the method didn't
+            partial = getattr(route, "path", "unmatched")
+    return partial
+
+
+class MetricsMiddleware:
+    """
+    Counts and times every HTTP request by route, tracks the requests in
+    flight, and makes the route known to the cache lookups it makes.
+    """
+
+    def __init__(self, app, metrics: "Metrics"):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = _route_label(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _endpoint.set(endpoint)
+        self.metrics.in_flight.inc(endpoint)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_flight.dec(endpoint)
+            self.metrics.request_duration.observe(time.perf_counter() - started, endpoint)
+            self.metrics.requests.inc(endpoint, scope["method"], str(status))
+            if status >= 500:
+                self.metrics.request_errors.inc(endpoint)
+            _endpoint.reset(token)
+
+
+# Create a global metrics instance
+metrics = deferred(lambda: Metrics(enabled=settings.METRICS_ENABLED))
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSON response whose encoding is timed as the "serialize" stage"""
+
+    def render(self, content) -> bytes:
+        with metrics.stage("serialize"):
+            return super().render(content)
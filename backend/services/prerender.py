@@ -0,0 +1,218 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from services.tts_service import (
+    ELEVENLABS_MODEL,
+    VOICE_REVERB,
+    VOICE_SETTINGS,
+    get_audio_cache_key,
+    render_speech_async,
+    write_audio_file,
+)
+
+# Bumped when the manifest layout changes; older manifests are ignored
+MANIFEST_VERSION = 1
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+class PrerenderJob(NamedTuple):
+    """One line to render to a fixed path"""
+    text: str     # Line spoken in the clip
+    voice: str    # Voice the clip is rendered with
+    path: str     # Final path of the clip
+
+
+class PrerenderResult(NamedTuple):
+    """Outcome of a batch pre-render"""
+    rendered: List[str]       # Paths rendered in this run
+    skipped: List[str]        # Paths whose inputs were unchanged
+    failed: Dict[str, str]    # Paths that could not be rendered, with the error
+    seconds: float            # Wall-clock time of the run
+
+
+class PrerenderManifest:
+    """
+    Content hashes and rendering parameters of every pre-rendered clip.
+
+    Each entry records the clip's cache key, which covers the text, voice,
+    voice settings, model and reverb. A clip whose key is unchanged and whose
+    file is still on disk doesn't need rendering again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> "PrerenderManifest":
+        """
+        Read the manifest from disk, starting empty if it is missing or outdated
+
+        Returns:
+            The manifest itself
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("version") == MANIFEST_VERSION:
+            self.entries = data.get("clips", {})
+        return self
+
+    def save(self) -> None:
+        """Atomically write the manifest"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "clips": self.entries}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving pre-render manifest: {e}")
+
+    def is_current(self, job: PrerenderJob, key: str) -> bool:
+        """
+        Check if a clip was rendered from the same inputs and is still on disk
+
+        Args:
+            job: The line to render
+            key: Its current cache key
+
+        Returns:
+            True if the clip can be kept
+        """
+        entry = self.entries.get(job.path)
+        return bool(entry) and entry.get("key") == key and os.path.exists(job.path)
+
+    def record(self, job: PrerenderJob, key: str, size: int, adopted: bool = False) -> None:
+        """
+        Record the inputs a clip was rendered from
+
+        Args:
+            job: The rendered line
+            key: Its cache key
+            size: Size of the clip in bytes
+            adopted: The clip was already on disk and wasn't rendered by this tool
+        """
+        self.entries[job.path] = {
+            "key": key,
+            "text": job.text,
+            "voice": job.voice,
+            "model": ELEVENLABS_MODEL,
+            "voice_settings": VOICE_SETTINGS,
+            "reverb": VOICE_REVERB.get(job.voice.lower()),
+            "bytes": size,
+            "adopted": adopted,
+            "rendered_at": time.time(),
+        }
+
+    def prune(self, jobs: Iterable[PrerenderJob]) -> List[str]:
+        """
+        Drop clips that are no longer in the catalog
+
+        Files the tool rendered itself are deleted; adopted files are only
+        forgotten.
+
+        Args:
+            jobs: Every line in the current catalog
+
+        Returns:
+            Paths of the dropped entries
+        """
+        keep = {job.path for job in jobs}
+        removed = [path for path in self.entries if path not in keep]
+        for path in removed:
+            entry = self.entries.pop(path)
+            if not entry.get("adopted"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return removed
+
+
+def catalog_jobs(catalog: Dict[str, List[str]], voices: Iterable[str],
+                 path_for: Callable[[str, str, str], str]) -> List[PrerenderJob]:
+    """
+    List the clips to render for a phrase catalog
+
+    Args:
+        catalog: Lines to render, grouped by answer
+        voices: Voices to render every line with
+        path_for: Function mapping (answer, text, voice) to the clip's final path
+
+    Returns:
+        One job per line and voice
+    """
+    return [
+        PrerenderJob(text, voice, path_for(answer, text, voice))
+        for voice in voices
+        for answer, lines in catalog.items()
+        for text in lines
+    ]
+
+
+async def prerender(jobs: Iterable[PrerenderJob], manifest: PrerenderManifest, concurrency: int = 4,
+                    force: bool = False,
+                    render: Optional[Callable[[str, str], Awaitable[bytes]]] = None) -> PrerenderResult:
+    """
+    Render every clip whose inputs changed, a few at a time
+
+    Clips are written atomically to their final paths and recorded in the
+    manifest, which is saved even if the run is interrupted. Clips already
+    on disk without a manifest entry (e.g. rendered by the app at startup)
+    are adopted instead of rendered again.
+
+    Args:
+        jobs: Lines to render
+        manifest: Manifest of earlier runs
+        concurrency: Maximum number of clips rendered at the same time
+        force: Render every clip, even unchanged ones
+        render: Coroutine function rendering (text, voice) to encoded audio
+
+    Returns:
+        Rendered, skipped and failed paths
+    """
+    render = render or render_speech_async
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    rendered: List[str] = []
+    skipped: List[str] = []
+    failed: Dict[str, str] = {}
+
+    pending = {}
+    for job in jobs:
+        if job.path in pending:
+            continue
+        key = get_audio_cache_key(job.text, job.voice)
+        if not force and manifest.is_current(job, key):
+            skipped.append(job.path)
+        elif not force and job.path not in manifest.entries and os.path.exists(job.path):
+            manifest.record(job, key, os.path.getsize(job.path), adopted=True)
+            skipped.append(job.path)
+        else:
+            pending[job.path] = (job, key)
+
+    async def run(job: PrerenderJob, key: str) -> None:
+        async with semaphore:
+            try:
+                data = await render(job.text, job.voice)
+                await asyncio.to_thread(write_audio_file, job.path, data)
+            except Exception as e:
+                print(f"Error pre-rendering '{job.text}' ({job.voice}): {e}")
+                failed[job.path] = str(e)
+                return
+        manifest.record(job, key, len(data))
+        rendered.append(job.path)
+        print(f"Pre-rendered: {job.path}")
+
+    try:
+        await asyncio.gather(*(run(job, key) for job, key in pending.values()))
+    finally:
+        manifest.save()
+
+    return PrerenderResult(rendered, skipped, failed, time.perf_counter() - started)
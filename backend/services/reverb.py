@@ -0,0 +1,222 @@
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+# Early reflections for rich, godly sound (prime-ish delays in seconds for natural sound)
+REFLECTION_DELAYS = (0.03, 0.07, 0.13, 0.19, 0.29, 0.41, 0.53)
+REFLECTION_GAINS = (0.6, 0.5, 0.4, 0.35, 0.3, 0.25, 0.2)  # Decreasing gains
+
+# Layers of diffused reverb tail for heavenly atmosphere
+DIFFUSION_LAYERS = 3
+
+# Moving average length used to simulate air absorption (high-frequency rolloff)
+AIR_ABSORPTION_TAPS = 3
+
+# Output is rendered in blocks small enough to stay in CPU cache
+BLOCK_SIZE = 32768
+
+# Peak level the output is normalized to when it would otherwise clip
+PEAK_LIMIT = 0.95
+
+
+class ImpulseResponse(NamedTuple):
+    """Sparse impulse response of the godly reverb for one sample rate and parameter set"""
+    delays: tuple[int, ...]    # Tap positions in samples, including the dry signal at 0
+    gains: tuple[float, ...]   # Gain of each tap
+    tail_length: int           # Samples of reverb tail appended after the dry signal
+
+
+@lru_cache(maxsize=32)
+def get_impulse_response(sample_rate: int, reverb_decay: float, room_size: float) -> ImpulseResponse:
+    """
+    Build the combined impulse response for the godly reverb
+
+    The reflections and diffusion layers are merged into a single set of taps
+    once per sample rate and parameter set; later calls are served from cache.
+
+    Args:
+        sample_rate: Sample rate of the audio in Hz
+        reverb_decay: Reverb decay factor (0.0-1.0)
+        room_size: Simulated room size (0.0-1.0)
+
+    Returns:
+        ImpulseResponse with merged tap delays and gains
+    """
+    tail_length = int(sample_rate * 2.0 * room_size)  # 2 seconds max reverb tail
+    taps: dict[int, float] = {0: 1.0}
+
+    def add_tap(delay_samples: int, gain: float) -> None:
+        # Reflections that would run past the reverb tail are dropped
+        if delay_samples <= tail_length:
+            taps[delay_samples] = taps.get(delay_samples, 0.0) + gain
+
+    for delay, gain in zip(REFLECTION_DELAYS, REFLECTION_GAINS):
+        add_tap(int(delay * sample_rate), gain * reverb_decay)
+
+    for i in range(DIFFUSION_LAYERS):
+        add_tap(int(sample_rate * (0.1 + i * 0.15)), reverb_decay * (0.3 - i * 0.08))
+
+    delays = tuple(sorted(taps))
+    return ImpulseResponse(delays, tuple(taps[d] for d in delays), tail_length)
+
+
+def get_output_length(input_length: int, sample_rate: int, room_size: float) -> int:
+    """
+    Get the number of samples apply_godly_reverb produces for an input
+
+    Args:
+        input_length: Number of dry input samples
+        sample_rate: Sample rate of the audio in Hz
+        room_size: Simulated room size (0.0-1.0)
+
+    Returns:
+        Length of the dry signal plus the reverb tail
+    """
+    return input_length + int(sample_rate * 2.0 * room_size)
+
+
+def apply_godly_reverb(audio: np.ndarray, sample_rate: int,
+                       reverb_decay: float = 0.8, room_size: float = 0.9,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Apply the godly reverb to a mono signal in memory
+
+    Args:
+        audio: Mono audio samples
+        sample_rate: Sample rate of the audio in Hz
+        reverb_decay: Reverb decay factor (0.0-1.0, default 0.8 for rich reverb)
+        room_size: Simulated room size (0.0-1.0, default 0.9 for cathedral-like space)
+        out: Optional float32 buffer of get_output_length() samples to render into
+
+    Returns:
+        float32 samples with reverb tail, normalized to prevent clipping
+    """
+    response = get_impulse_response(sample_rate, reverb_decay, room_size)
+    audio = np.asarray(audio, dtype=np.float32)
+    output_length = get_output_length(len(audio), sample_rate, room_size)
+
+    # Air absorption is linear, so it is applied once to the dry signal rather than
+    # to the much longer wet mix. The full convolution is offset by one sample,
+    # which lines it up with the centred moving average of the original effect.
+    kernel = np.full(AIR_ABSORPTION_TAPS, 1.0 / AIR_ABSORPTION_TAPS, dtype=np.float32)
+    smoothed = np.convolve(audio, kernel)
+    offset = AIR_ABSORPTION_TAPS // 2
+
+    # Zero-pad so every tap can read a full block without bounds checks
+    lead = response.delays[-1] + offset
+    padded = np.zeros(lead + output_length + AIR_ABSORPTION_TAPS, dtype=np.float32)
+    padded[lead:lead + len(smoothed)] = smoothed
+
+    if out is None:
+        output = np.empty(output_length, dtype=np.float32)
+    elif out.shape != (output_length,) or out.dtype != np.float32:
+        raise ValueError(f"Output buffer must be {output_length} float32 samples")
+    else:
+        output = out
+    scratch = np.empty(BLOCK_SIZE, dtype=np.float32)
+    gains = [np.float32(gain) for gain in response.gains]
+
+    for start in range(0, output_length, BLOCK_SIZE):
+        end = min(start + BLOCK_SIZE, output_length)
+        block = output[start:end]
+        tmp = scratch[:end - start]
+        block.fill(0.0)
+        for delay, gain in zip(response.delays, gains):
+            source = lead + start - delay + offset
+            np.multiply(padded[source:source + end - start], gain, out=tmp)
+            block += tmp
+
+    # Normalize to prevent clipping while preserving dynamics
+    max_val = float(np.max(np.abs(output))) if output_length else 0.0
+    if max_val > PEAK_LIMIT:
+        output *= np.float32(PEAK_LIMIT / max_val)
+
+    return output
+
+
+class StreamingReverb:
+    """
+    Block-wise godly reverb for audio that arrives in pieces.
+
+    Keeps just enough input history between blocks to render every tap, so
+    memory stays bounded by the length of the impulse response no matter how
+    long the stream runs. The output matches apply_godly_reverb, except that
+    clipping is prevented with a running peak limiter instead of normalizing
+    against the peak of the whole clip.
+    """
+
+    def __init__(self, sample_rate: int, reverb_decay: float = 0.8, room_size: float = 0.9):
+        self.sample_rate = sample_rate
+        self.response = get_impulse_response(sample_rate, reverb_decay, room_size)
+        self._gains = [np.float32(gain) for gain in self.response.gains]
+        self._history_length = self.response.delays[-1]
+        # Air-absorbed input seen so far, newest last
+        self._history = np.zeros(self._history_length, dtype=np.float32)
+        # Last raw samples, needed to smooth the start of the next block
+        self._previous = np.zeros(AIR_ABSORPTION_TAPS - 1, dtype=np.float32)
+        # The moving average is centred, so output lags input by one sample
+        self._pending_skip = AIR_ABSORPTION_TAPS // 2
+        self._gain = np.float32(1.0)
+        self._finished = False
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Render the wet signal for the next block of dry input
+
+        Args:
+            block: Next mono samples of the dry signal
+
+        Returns:
+            float32 output samples (the same count as the input, minus the
+            one-sample lag on the very first block)
+        """
+        if self._finished:
+            raise RuntimeError("StreamingReverb has already been flushed")
+
+        block = np.asarray(block, dtype=np.float32)
+        if not len(block):
+            return block
+
+        # Moving average over the raw input, continuing from the previous block
+        extended = np.concatenate((self._previous, block))
+        smoothed = np.convolve(extended, np.full(AIR_ABSORPTION_TAPS, 1.0 / AIR_ABSORPTION_TAPS,
+                                                 dtype=np.float32), mode='valid')
+        self._previous = extended[-(AIR_ABSORPTION_TAPS - 1):]
+
+        buffer = np.concatenate((self._history, smoothed))
+        output = np.zeros(len(block), dtype=np.float32)
+        scratch = np.empty(len(block), dtype=np.float32)
+        for delay, gain in zip(self.response.delays, self._gains):
+            start = self._history_length - delay
+            np.multiply(buffer[start:start + len(block)], gain, out=scratch)
+            output += scratch
+        self._history = buffer[len(buffer) - self._history_length:]
+
+        if self._pending_skip:
+            skip = min(self._pending_skip, len(output))
+            output = output[skip:]
+            self._pending_skip -= skip
+
+        return self._limit(output)
+
+    def flush(self) -> np.ndarray:
+        """
+        Render the remaining reverb tail once the dry input has ended
+
+        Returns:
+            float32 samples of the reverb tail
+        """
+        tail = self.process(np.zeros(self.response.tail_length + AIR_ABSORPTION_TAPS // 2,
+                                     dtype=np.float32))
+        self._finished = True
+        return tail
+
+    def _limit(self, output: np.ndarray) -> np.ndarray:
+        # The gain only ever goes down, so the stream never clips and never pumps
+        peak = float(np.max(np.abs(output))) if len(output) else 0.0
+        if peak * self._gain > PEAK_LIMIT:
+            self._gain = np.float32(PEAK_LIMIT / peak)
+        if self._gain != 1.0:
+            output *= self._gain
+        return output
@@ -1,6 +1,9 @@
 # services/scraping_service.py
-import httpx
 from config.settings import settings
+from services.clients import upstream_clients
+from services.deadline import hedged_upstream
+from services.intent_classifier import food_intent_classifier
+from services.single_flight import single_flight
 from typing import List, Dict, Any, Optional
 import json
 import random
@@ -19,9 +22,22 @@ class RestaurantData:
         self.price_level = price_level
 
 
+# Searches are made at this many decimal places (about 11 m), so users
+# standing in the same spot share one search
+SEARCH_COORDINATE_PRECISION = 4
+
+# Identical searches in flight at the same time share one SerpAPI call
+_restaurant_searches = single_flight("serpapi")
+
+# SerpAPI calls are bounded by the "search" stage budget, hedged when slow and
+# skipped while SerpAPI's circuit breaker is open
+_serpapi_calls = hedged_upstream("serpapi", stage="search")
+
+
 async def find_restaurants_near(latitude: float, longitude: float, query: str = "restaurants") -> List[RestaurantData]:
     """
     Find restaurants near the given coordinates using SerpAPI Google Local search.
+    Concurrent searches for the same spot and query share one SerpAPI call.
     
     Args:
         latitude: User's latitude
@@ -36,70 +52,89 @@ async def find_restaurants_near(latitude: float, longitude: float, query: str =
             print("Warning: SERPAPI_API_KEY not configured. Using fallback.")
             return []
         
-        # Construct the search parameters
-        params = {
-            "engine": "google_maps",
-            "q": query,
-            "ll": f"@{latitude},{longitude},15z",
-            "type": "search",
-            "api_key": settings.SERPAPI_API_KEY
-        }
-        
-        print(f"Searching for restaurants near {latitude}, {longitude} with query: '{query}'")
+        latitude = round(latitude, SEARCH_COORDINATE_PRECISION)
+        longitude = round(longitude, SEARCH_COORDINATE_PRECISION)
+        key = (latitude, longitude, query.strip().lower())
+        restaurants = await _restaurant_searches.do(
+            key, lambda: _search_restaurants(latitude, longitude, query)
+        )
+        # Each caller gets its own list
+        return list(restaurants)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get("https://serpapi.com/search", params=params)
-            
-            if response.status_code != 200:
-                print(f"SerpAPI request failed with status {response.status_code}")
-                return []
-            
-            data = response.json()
-            
-            # Extract local results
-            local_results = data.get("local_results", [])
+    except Exception as e:
+        print(f"Error in restaurant search: {str(e)}")
+        return []
+
+
+async def _search_restaurants(latitude: float, longitude: float, query: str) -> List[RestaurantData]:
+    # Construct the search parameters
+    params = {
+        "engine": "google_maps",
+        "q": query,
+        "ll": f"@{latitude},{longitude},15z",
+        "type": "search",
+        "api_key": settings.SERPAPI_API_KEY
+    }
+    
+    print(f"Searching for restaurants near {latitude}, {longitude} with query: '{query}'")
+    
+    # Shared keep-alive client owned by the app lifespan
+    client = upstream_clients.http("serpapi")
+    async def fetch():
+        response = await client.get("https://serpapi.com/search", params=params)
+        if response.status_code >= 500:
+            # Server errors count against SerpAPI's circuit breaker
+            response.raise_for_status()
+        return response
+    
+    response = await _serpapi_calls.call(fetch)
+    
+    if response.status_code != 200:
+        print(f"SerpAPI request failed with status {response.status_code}")
+        return []
+    
+    data = response.json()
+    
+    # Extract local results
+    local_results = data.get("local_results", [])
+    
+    if not local_results:
+        print("No local results found")
+        return []
+    
+    # Parse the results into RestaurantData objects
+    restaurants = []
+    for result in local_results:
+        try:
+            name = result.get("title", "Unknown establishment")
+            address = result.get("address", "Unknown location")
+            rating = float(result.get("rating", 0.0))
+            restaurant_type = result.get("type", "restaurant")
+            price_level = result.get("price", None)
             
-            if not local_results:
-                print("No local results found")
-                return []
+            # Extract coordinates from the GPS coordinates if available
+            gps = result.get("gps_coordinates", {})
+            rest_lat = gps.get("latitude", latitude)  # Fallback to search center
+            rest_lng = gps.get("longitude", longitude)
             
-            # Parse the results into RestaurantData objects
-            restaurants = []
-            for result in local_results:
-                try:
-                    name = result.get("title", "Unknown establishment")
-                    address = result.get("address", "Unknown location")
-                    rating = float(result.get("rating", 0.0))
-                    restaurant_type = result.get("type", "restaurant")
-                    price_level = result.get("price", None)
-                    
-                    # Extract coordinates from the GPS coordinates if available
-                    gps = result.get("gps_coordinates", {})
-                    rest_lat = gps.get("latitude", latitude)  # Fallback to search center
-                    rest_lng = gps.get("longitude", longitude)
-                    
-                    restaurant = RestaurantData(
-                        name=name,
-                        address=address,
-                        latitude=float(rest_lat),
-                        longitude=float(rest_lng),
-                        rating=rating,
-                        restaurant_type=restaurant_type,
-                        price_level=price_level
-                    )
-                    
-                    restaurants.append(restaurant)
-                    
-                except (ValueError, TypeError) as e:
-                    print(f"Error parsing restaurant data: {e}")
-                    continue
+            restaurant = RestaurantData(
+                name=name,
+                address=address,
+                latitude=float(rest_lat),
+                longitude=float(rest_lng),
+                rating=rating,
+                restaurant_type=restaurant_type,
+                price_level=price_level
+            )
             
-            print(f"Found {len(restaurants)} restaurants")
-            return restaurants
+            restaurants.append(restaurant)
             
-    except Exception as e:
-        print(f"Error in restaurant search: {str(e)}")
-        return []
+        except (ValueError, TypeError) as e:
+            print(f"Error parsing restaurant data: {e}")
+            continue
+    
+    print(f"Found {len(restaurants)} restaurants")
+    return restaurants
 
 
 def generate_google_maps_url(restaurant: RestaurantData) -> str:
@@ -173,43 +208,33 @@ async def analyze_food_intent(question: str) -> Dict[str, Any]:
     """
     Analyze the user's question to determine if it's food-related and extract search intent.
     
+    The local intent classifier answers the questions it is confident about;
+    only the others are sent to the LLM.
+    
     Args:
         question: The user's question
         
     Returns:
         Dict with 'is_food_related', 'search_query', and 'intent' keys
     """
+    prediction = food_intent_classifier.classify(question)
+    local_analysis = {
+        "is_food_related": prediction.is_food_related,
+        "search_query": prediction.search_query,
+        "intent": prediction.intent
+    }
+    if food_intent_classifier.is_confident(prediction):
+        return local_analysis
+    
     try:
         from services.llm_service import get_llm_response
         
-        analysis_prompt = f"""
-        Analyze this question and determine:
-        1. Is it food-related? (yes/no)
-        2. If yes, what should I search for? (extract search terms for finding restaurants/food)
-        3. What's the user's intent? (summarize what they want)
-        
-        Question: "{question}"
-        
-        Respond in this exact JSON format:
-        {{
-            "is_food_related": true/false,
-            "search_query": "search terms for restaurants",
-            "intent": "brief description of what user wants"
-        }}
-        """
-        
-        response = get_llm_response(analysis_prompt)
+        # The food-intent persona's model carries the instructions and replies
+        # with JSON matching its response schema
+        response = await get_llm_response(question, persona="food_intent")
         
-        # Try to parse the JSON response
         try:
-            # Clean up the response to extract JSON
-            response_clean = response.strip()
-            if response_clean.startswith("```json"):
-                response_clean = response_clean[7:]
-            if response_clean.endswith("```"):
-                response_clean = response_clean[:-3]
-            
-            analysis = json.loads(response_clean)
+            analysis = json.loads(response)
             
             return {
                 "is_food_related": analysis.get("is_food_related", False),
@@ -219,15 +244,8 @@ async def analyze_food_intent(question: str) -> Dict[str, Any]:
             
         except json.JSONDecodeError:
             print(f"Failed to parse LLM analysis as JSON: {response}")
-            # Fallback: assume it's food-related if it contains food keywords
-            food_keywords = ["food", "eat", "restaurant", "hungry", "meal", "lunch", "dinner", "breakfast", "cuisine"]
-            is_food_related = any(keyword in question.lower() for keyword in food_keywords)
-            
-            return {
-                "is_food_related": is_food_related,
-                "search_query": "restaurants",
-                "intent": "seeking food guidance"
-            }
+            # Fallback: the local classifier's best guess
+            return local_analysis
             
     except Exception as e:
         print(f"Error in food intent analysis: {str(e)}")
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """One shared upstream call and the callers waiting for it"""
+
+    def __init__(self, task: "asyncio.Future"):
+        self.task = task
+        self.waiters = 0
+        self.abandoned = False
+
+
+class _SyncFlight:
+    """One shared blocking call and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical upstream calls that are in flight at the same time.
+
+    The first caller for a key starts the work; callers arriving with the
+    same key while it runs wait for that call and share its result or its
+    exception. The work runs in its own task, so a caller that is cancelled
+    (e.g. because its client disconnected) doesn't cancel it for the others.
+    Only when every caller has gone is the upstream call cancelled too.
+    Results are not kept once the call completes; caching is left to the
+    caches in front of the upstream services.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.cancelled = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._sync_flights: Dict[Hashable, _SyncFlight] = {}
+        self._lock = threading.Lock()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key: Identity of the upstream call
+            fn: Coroutine function doing the upstream call
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            Whatever the shared call raised
+        """
+        flight = self._flights.get(key)
+        if flight is None or flight.abandoned or flight.task.done():
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._finish(key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller went away, so stop the upstream call
+                flight.abandoned = True
+                flight.task.cancel()
+                self.cancelled += 1
+
+    def do_sync(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Blocking version of do for calls made from worker threads
+
+        Args:
+            key: Identity of the upstream call
+            fn: Function doing the upstream call
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            Whatever the shared call raised
+        """
+        with self._lock:
+            flight = self._sync_flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _SyncFlight()
+                self._sync_flights[key] = flight
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._sync_flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters
+
+        Returns:
+            Dictionary with upstream calls made, calls coalesced and calls in flight
+        """
+        requests = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "coalesced_rate": self.coalesced / requests if requests else 0.0,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "in_flight": len(self._flights) + len(self._sync_flights),
+        }
+
+    def _finish(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            self.errors += 1
+
+
+# Every coalescing group, by name, for /api/stats
+_groups: Dict[str, SingleFlight] = {}
+
+
+def single_flight(name: str) -> SingleFlight:
+    """
+    Get the coalescing group for an upstream call site, creating it on first use
+
+    Args:
+        name: Name of the call site, e.g. "llm"
+
+    Returns:
+        The shared SingleFlight instance
+    """
+    group = _groups.get(name)
+    if group is None:
+        group = _groups.setdefault(name, SingleFlight(name))
+    return group
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get coalescing counters for every group
+
+    Returns:
+        Dictionary of counters keyed by group name
+    """
+    return {name: group.stats() for name, group in _groups.items()}
@@ -0,0 +1,265 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from config.settings import deferred, settings
+from services.audio_cache import audio_cache
+from services.llm_service import (
+    LLM_ERROR_RESPONSE,
+    LLMStreamTruncated,
+    get_cached_llm_response,
+    get_uncached_llm_response,
+    llm_batcher,
+    stream_llm_response,
+)
+from services.metrics import metrics
+from services.single_flight import single_flight
+from services.tts_service import (
+    generate_audio_for_text_async,
+    get_audio_cache_key,
+    is_streaming_available,
+    is_voice_available,
+    render_sentence_async,
+    stitch_sentences,
+    write_audio_file,
+)
+
+# End of a sentence: terminal punctuation (including "..."), closing quotes
+# or brackets, then whitespace
+SENTENCE_END = re.compile(r"[.!?…]+[\"'”’)\]]*\s+")
+
+# Identical answers spoken at the same time share one Gemini stream and one clip
+_speeches = single_flight("speech")
+
+
+async def split_sentences(chunks: AsyncIterator[str], min_chars: int = 0) -> AsyncIterator[str]:
+    """
+    Cut a stream of text into sentences as soon as each one is complete
+
+    A sentence is only known to be complete once the whitespace after it has
+    arrived, so the last one is given out when the stream ends. Sentences
+    shorter than min_chars are joined to the next one.
+
+    Args:
+        chunks: Pieces of text in order, of any size
+        min_chars: Shortest sentence given out on its own
+
+    Yields:
+        Sentences with surrounding whitespace removed
+    """
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        cut = 0
+        for match in SENTENCE_END.finditer(buffer):
+            sentence = buffer[cut:match.end()].strip()
+            if len(sentence) >= min_chars:
+                yield sentence
+                cut = match.end()
+        buffer = buffer[cut:]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+class SpeechPipeline:
+    """
+    Speaks an LLM answer while it is still being written.
+
+    Gemini's answer is streamed and cut at sentence boundaries. Each finished
+    sentence goes to ElevenLabs while the rest is still being generated, so
+    the LLM and TTS latencies overlap instead of adding up. The dry sentence
+    clips are stitched into one clip that gets the voice's effects once, and
+    the clip is stored in the audio cache under the full answer, just like a
+    clip rendered in one piece. Concurrent requests for the same answer share
+    one stream and its clip. While other calls of the persona are in flight,
+    the answer joins a batched Gemini call instead and is rendered whole.
+    """
+
+    def __init__(self, enabled: bool, concurrency: int, min_sentence_chars: int):
+        self.enabled = enabled
+        self.concurrency = max(concurrency, 1)
+        self.min_sentence_chars = min_sentence_chars
+        self.pipelined = 0
+        self.cached = 0
+        self.batched = 0
+        self.unpipelined = 0
+        self.failed = 0
+        self.truncated = 0
+        self.sentences = 0
+        self._first_sentence = 0.0
+        self._first_audio = 0.0
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    async def speak(self, prompt: str, persona: str, voice: str = "deep_ah", system_prompt: str = "",
+                    stage: str = "llm", timings: Optional[Dict[str, float]] = None) -> Tuple[str, str]:
+        """
+        Get a persona's answer and its audio
+
+        Only the time taken to get the answer text is recorded as the stage;
+        synthesis, effects and writing the clip are timed as stages of their own.
+
+        Args:
+            prompt: The user's question or prompt
+            persona: Persona answering, which selects the model and the cache policy
+            voice: Voice to speak the answer in
+            system_prompt: Extra system prompt sent with the question
+            stage: Stage the answer text is timed as, e.g. "description"
+            timings: Seconds by stage, to record the stage in as well
+
+        Returns:
+            Tuple of the answer text and the URL path of its audio
+        """
+        if not is_voice_available(voice):
+            print(f"Warning: Voice '{voice}' not available. Using 'deep_ah' as fallback.")
+            voice = "deep_ah"
+
+        started = time.perf_counter()
+        cached = await get_cached_llm_response(prompt, system_prompt, persona)
+        if cached is not None:
+            self._count("cached")
+            self._observe(stage, time.perf_counter() - started, timings)
+            return cached, await generate_audio_for_text_async(cached, voice)
+
+        if llm_batcher.batches(persona) and llm_batcher.active(persona):
+            # Under load a batched Gemini call beats one stream per request on throughput
+            self._count("batched")
+        elif self.enabled and is_streaming_available():
+            # A stream can't be shared, so identical requests share the whole spoken answer
+            looked_up = time.perf_counter() - started
+            text, audio_url, streamed = await _speeches.do(
+                (persona, prompt, system_prompt, voice),
+                lambda: self._speak_pipelined(prompt, system_prompt, persona, voice)
+            )
+            self._observe(stage, looked_up + streamed, timings)
+            return text, audio_url
+        else:
+            self._count("unpipelined")
+
+        # Coalesced with identical prompts and hedged, like any other Gemini call
+        text = await get_uncached_llm_response(prompt, system_prompt, persona)
+        self._observe(stage, time.perf_counter() - started, timings)
+        return text, await generate_audio_for_text_async(text, voice)
+
+    async def _speak_pipelined(self, prompt: str, system_prompt: str, persona: str,
+                               voice: str) -> Tuple[str, str, float]:
+        # Returns the answer, its audio and how long the answer took to stream
+        started = time.perf_counter()
+        marks: Dict[str, float] = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pieces: List[str] = []
+        tasks: List[asyncio.Task] = []
+
+        async def text_chunks() -> AsyncIterator[str]:
+            async for piece in stream_llm_response(prompt, system_prompt, persona):
+                pieces.append(piece)
+                yield piece
+
+        async def render(index: int, sentence: str):
+            async with semaphore:
+                segment = await render_sentence_async(sentence, voice)
+            if index == 0:
+                # The moment the answer could start playing if it were streamed in order
+                marks["first_audio"] = time.perf_counter() - started
+            return segment
+
+        try:
+            try:
+                async for sentence in split_sentences(text_chunks(), self.min_sentence_chars):
+                    marks.setdefault("first_sentence", time.perf_counter() - started)
+                    tasks.append(asyncio.create_task(render(len(tasks), sentence)))
+            except LLMStreamTruncated as e:
+                # Half an answer must not be spoken, let alone cached under its text
+                print(f"Answer broke off, speaking the error response instead: {e}")
+                self._cancel(tasks)
+                self._count("truncated")
+                streamed = time.perf_counter() - started
+                return LLM_ERROR_RESPONSE, await generate_audio_for_text_async(LLM_ERROR_RESPONSE, voice), streamed
+            streamed = time.perf_counter() - started
+            text = "".join(pieces).strip()
+
+            cache_key = get_audio_cache_key(text, voice)
+            if (text == LLM_ERROR_RESPONSE or not tasks
+                    or await asyncio.to_thread(audio_cache.get, cache_key)):
+                # Nothing worth stitching: the error clip, or a clip that was already made
+                self._cancel(tasks)
+                self._count("unpipelined")
+                return text, await generate_audio_for_text_async(text, voice), streamed
+
+            try:
+                segments = await asyncio.gather(*tasks, return_exceptions=True)
+                errors = [segment for segment in segments if isinstance(segment, BaseException)]
+                if errors:
+                    raise errors[0]
+                data = await asyncio.to_thread(stitch_sentences, segments, voice)
+                output_path = os.path.join(settings.GENERATED_AUDIO_DIR, audio_cache.relative_path(cache_key))
+                await asyncio.to_thread(write_audio_file, output_path, data)
+            except Exception as e:
+                print(f"Error speaking answer sentence by sentence, rendering it whole: {e}")
+                self._count("failed")
+                return text, await generate_audio_for_text_async(text, voice), streamed
+
+            audio_url = f"/{output_path}"
+            await asyncio.to_thread(audio_cache.put, cache_key, audio_url)
+        finally:
+            self._cancel(tasks)
+
+        with self._lock:
+            self.pipelined += 1
+            self.sentences += len(tasks)
+            self._first_sentence += marks.get("first_sentence", 0.0)
+            self._first_audio += marks.get("first_audio", 0.0)
+            self._total += time.perf_counter() - started
+        print(f"Answer spoken in {len(tasks)} sentences: {audio_url}")
+        return text, audio_url, streamed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pipeline counters
+
+        Returns:
+            Dictionary with answers by path and mean times to the first sentence,
+            the first sentence's audio and the finished clip
+        """
+        with self._lock:
+            pipelined = self.pipelined
+            return {
+                "enabled": self.enabled,
+                "pipelined": pipelined,
+                "cached": self.cached,
+                "batched": self.batched,
+                "unpipelined": self.unpipelined,
+                "failed": self.failed,
+                "truncated": self.truncated,
+                "mean_sentences": self.sentences / pipelined if pipelined else 0.0,
+                "mean_first_sentence_ms": self._first_sentence / pipelined * 1000 if pipelined else 0.0,
+                "mean_first_audio_ms": self._first_audio / pipelined * 1000 if pipelined else 0.0,
+                "mean_total_ms": self._total / pipelined * 1000 if pipelined else 0.0,
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @staticmethod
+    def _observe(stage: str, seconds: float, timings: Optional[Dict[str, float]]) -> None:
+        metrics.observe_stage(stage, seconds)
+        if timings is not None:
+            timings[stage] = seconds
+
+    @staticmethod
+    def _cancel(tasks: List[asyncio.Task]) -> None:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+# Create a global pipeline instance
+speech_pipeline = deferred(lambda: SpeechPipeline(
+    enabled=settings.SPEECH_PIPELINE_ENABLED,
+    concurrency=settings.SPEECH_PIPELINE_CONCURRENCY,
+    min_sentence_chars=settings.SPEECH_PIPELINE_MIN_SENTENCE_CHARS,
+))
@@ -0,0 +1,261 @@
+import asyncio
+import os
+import shutil
+import subprocess
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from config.settings import settings
+from services.tts_service import AUDIO_PROCESSING_AVAILABLE, decode_audio, encode_audio, write_audio_file
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class AudioFormat(NamedTuple):
+    """An audio format clients can ask for"""
+    name: str         # Format name used in requests, e.g. "opus"
+    extension: str    # File extension of the encoded clip
+    media_type: str   # Content type the clip is served with
+
+
+# Every clip is rendered as MP3 first; the other formats are transcoded from it
+AUDIO_FORMATS = {
+    "mp3": AudioFormat("mp3", "mp3", "audio/mpeg"),
+    "opus": AudioFormat("opus", "ogg", "audio/ogg"),
+    "aac": AudioFormat("aac", "aac", "audio/aac"),
+}
+
+DEFAULT_AUDIO_FORMAT = "mp3"
+
+# Media types a client may list in its Accept header
+ACCEPT_MEDIA_TYPES = {
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+    "audio/aac": "aac",
+    "audio/mp4": "aac",
+    "audio/x-m4a": "aac",
+}
+
+# Sample rates the Opus codec supports
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def is_audio_format_available(audio_format: str) -> bool:
+    """
+    Check if clips can be encoded in a format
+
+    Args:
+        audio_format: Format name, e.g. "opus"
+
+    Returns:
+        True if the format is known and its encoder is installed
+    """
+    if audio_format == DEFAULT_AUDIO_FORMAT:
+        return True
+    if audio_format == "opus":
+        return AUDIO_PROCESSING_AVAILABLE
+    if audio_format == "aac":
+        # libsndfile has no AAC encoder, so AAC needs ffmpeg
+        return shutil.which(settings.FFMPEG_PATH) is not None
+    return False
+
+
+def negotiate_audio_format(requested: Optional[str] = None, accept: Optional[str] = None) -> str:
+    """
+    Pick the audio format for a response
+
+    An explicit request field wins over the Accept header. Formats that are
+    unknown or can't be encoded here fall back to MP3, which every client plays.
+
+    Args:
+        requested: Format named in the request body, e.g. "opus"
+        accept: Value of the request's Accept header
+
+    Returns:
+        Name of the format to serve
+    """
+    if requested:
+        requested = requested.lower()
+        if is_audio_format_available(requested):
+            return requested
+        print(f"Warning: Audio format '{requested}' not available. Using '{DEFAULT_AUDIO_FORMAT}' as fallback.")
+        return DEFAULT_AUDIO_FORMAT
+
+    if accept:
+        candidates = []
+        for position, item in enumerate(accept.split(",")):
+            media_type, *params = [part.strip() for part in item.split(";")]
+            quality = 1.0
+            for param in params:
+                if param.startswith("q="):
+                    try:
+                        quality = float(param[2:])
+                    except ValueError:
+                        quality = 0.0
+            audio_format = ACCEPT_MEDIA_TYPES.get(media_type.lower())
+            if audio_format and quality > 0:
+                # Highest quality first, then the client's own order
+                candidates.append((-quality, position, audio_format))
+
+        for _, _, audio_format in sorted(candidates):
+            if is_audio_format_available(audio_format):
+                return audio_format
+
+    return DEFAULT_AUDIO_FORMAT
+
+
+def resample(audio: "np.ndarray", sample_rate: int, target_rate: int) -> "np.ndarray":
+    """
+    Band-limited resampling of a whole clip in the frequency domain
+
+    Args:
+        audio: Mono float samples
+        sample_rate: Sample rate of the audio in Hz
+        target_rate: Sample rate to convert to in Hz
+
+    Returns:
+        float32 samples at the target rate
+    """
+    import numpy as np
+
+    if sample_rate == target_rate or not len(audio):
+        return np.asarray(audio, dtype=np.float32)
+
+    length = round(len(audio) * target_rate / sample_rate)
+    spectrum = np.fft.rfft(audio)
+    resampled = np.zeros(length // 2 + 1, dtype=spectrum.dtype)
+    bins = min(len(spectrum), len(resampled))
+    resampled[:bins] = spectrum[:bins]
+    return (np.fft.irfft(resampled, length) * (length / len(audio))).astype(np.float32)
+
+
+def get_opus_sample_rate(sample_rate: int) -> int:
+    """
+    Get the Opus sample rate a clip is encoded at
+
+    Args:
+        sample_rate: Sample rate of the source audio in Hz
+
+    Returns:
+        The configured Opus rate, capped at the nearest supported rate above the source
+    """
+    target = min(settings.OPUS_SAMPLE_RATE, sample_rate)
+    return next((rate for rate in OPUS_SAMPLE_RATES if rate >= target), OPUS_SAMPLE_RATES[-1])
+
+
+def encode_opus(audio: "np.ndarray", sample_rate: int) -> bytes:
+    """
+    Encode audio as low-bitrate Opus in an Ogg container
+
+    Args:
+        audio: Mono float samples
+        sample_rate: Sample rate of the audio in Hz
+
+    Returns:
+        Encoded Ogg/Opus bytes
+    """
+    opus_rate = get_opus_sample_rate(sample_rate)
+    return encode_audio(resample(audio, sample_rate, opus_rate), opus_rate, "OGG",
+                        subtype="OPUS", compression_level=settings.OPUS_COMPRESSION_LEVEL)
+
+
+def encode_aac(data: bytes) -> bytes:
+    """
+    Encode a clip as low-bitrate AAC (ADTS stream) with ffmpeg
+
+    Args:
+        data: Encoded source clip, e.g. the MP3 master
+
+    Returns:
+        Encoded AAC bytes
+    """
+    result = subprocess.run(
+        [settings.FFMPEG_PATH, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-ac", "1", "-c:a", "aac", "-b:a", settings.AAC_BITRATE, "-f", "adts", "pipe:1"],
+        input=data, capture_output=True, check=True
+    )
+    return result.stdout
+
+
+def transcode(data: bytes, audio_format: str) -> bytes:
+    """
+    Convert an MP3 master clip to another format
+
+    Args:
+        data: Encoded MP3 master
+        audio_format: Target format name
+
+    Returns:
+        Encoded bytes in the target format
+    """
+    if audio_format == "opus":
+        return encode_opus(*decode_audio(data))
+    if audio_format == "aac":
+        return encode_aac(data)
+    raise ValueError(f"Unsupported audio format: {audio_format}")
+
+
+def get_transcode_path(master_path: str, audio_format: str) -> str:
+    """
+    Get the path of a clip's transcode, which sits next to the master render
+
+    Args:
+        master_path: Path of the MP3 master
+        audio_format: Target format name
+
+    Returns:
+        Path of the transcoded clip
+    """
+    return f"{os.path.splitext(master_path)[0]}.{AUDIO_FORMATS[audio_format].extension}"
+
+
+def get_audio_url_for_format(audio_url: str, audio_format: str) -> str:
+    """
+    Get the URL of a clip in the requested format, transcoding it on first use
+
+    Each format is only encoded once per clip; later requests find the file.
+    If the clip can't be transcoded the master URL is returned.
+
+    Args:
+        audio_url: URL path of the MP3 master
+        audio_format: Format name from negotiate_audio_format
+
+    Returns:
+        URL path of the clip in the requested format
+    """
+    if audio_format == DEFAULT_AUDIO_FORMAT or audio_format not in AUDIO_FORMATS:
+        return audio_url
+
+    master_path = audio_url.lstrip('/')
+    output_path = get_transcode_path(master_path, audio_format)
+    if os.path.exists(output_path):
+        return f"/{output_path}"
+
+    try:
+        with open(master_path, "rb") as f:
+            data = f.read()
+        write_audio_file(output_path, transcode(data, audio_format))
+    except Exception as e:
+        print(f"Error transcoding {audio_url} to {audio_format}: {e}")
+        return audio_url
+
+    print(f"Audio transcoded to {audio_format}: {output_path}")
+    return f"/{output_path}"
+
+
+async def get_audio_url_for_format_async(audio_url: str, audio_format: str) -> str:
+    """
+    Async version of get_audio_url_for_format (decoding and encoding run in a worker thread)
+
+    Args:
+        audio_url: URL path of the MP3 master
+        audio_format: Format name from negotiate_audio_format
+
+    Returns:
+        URL path of the clip in the requested format
+    """
+    if audio_format == DEFAULT_AUDIO_FORMAT:
+        return audio_url
+    return await asyncio.to_thread(get_audio_url_for_format, audio_url, audio_format)
@@ -1,107 +1,705 @@
 # services/tts_service.py
+import asyncio
+import importlib.util
+import io
+import math
 import os
-from typing import Optional
-from elevenlabs.client import ElevenLabs
-from elevenlabs import VoiceSettings
+import re
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
 from config.settings import settings
+from services.audio_cache import audio_cache, make_audio_cache_key
+from services.circuit_breaker import OPEN
+from services.clients import upstream_clients
+from services.deadline import hedged_upstream, stage_timeout
+from services.dsp_pool import dsp_pool
+from services.metrics import metrics
+from services.single_flight import single_flight
 
-# Try to import audio processing libraries for reverb effects
-try:
-    import librosa
-    import soundfile as sf
-    import numpy as np
-    AUDIO_PROCESSING_AVAILABLE = True
-except ImportError:
-    AUDIO_PROCESSING_AVAILABLE = False
-    print("Audio processing libraries not available. Install librosa and soundfile for reverb effects.")
+# Audio processing libraries for reverb effects are imported on first use,
+# so processes that never touch audio don't pay for loading them
+AUDIO_PROCESSING_AVAILABLE = all(importlib.util.find_spec(name) for name in ("numpy", "soundfile"))
+if not AUDIO_PROCESSING_AVAILABLE:
+    print("Audio processing libraries not available. Install numpy and soundfile for reverb effects.")
+
+
+# ElevenLabs model used for every voice
+ELEVENLABS_MODEL = "eleven_turbo_v2_5"  # Highest quality model available
+
+# Map voice names to ElevenLabs voice IDs
+VOICE_IDS = {
+    "deep_ah": "Tj9l48J9AJbry5yCP5eW", # Matthew Schmitz - Nosferatu Ancient Vampire Lord
+}
+
+# Highest quality settings optimized for vampire voice
+VOICE_SETTINGS = {
+    "stability": 0.6,           # Higher stability for dramatic effect
+    "similarity_boost": 0.9,    # Maximum voice characteristics preservation
+    "style": 0.3,               # Slight style enhancement for gothic character
+    "use_speaker_boost": True,  # Enhanced clarity for deep voice
+}
+
+# Reverb applied per voice (voices not listed here are left dry)
+VOICE_REVERB = {
+    "deep_ah": {"reverb_decay": 0.85, "room_size": 0.95},
+}
+
+# Identical clips requested at the same time are rendered and written once
+_speech_renders = single_flight("tts")
+
+# ElevenLabs calls are bounded by the "tts" stage budget and go through its circuit
+# breaker; those made on the event loop are hedged when slow as well
+_elevenlabs_calls = hedged_upstream("elevenlabs", stage="tts")
 
+# Fixed endings the personas put on every answer. Each is rendered once per
+# voice and joined to the synthesized part, so ElevenLabs only speaks the rest.
+FIXED_PHRASES = ("The shell has spoken.",)
 
-def add_godly_reverb(audio_path: str, reverb_decay: float = 0.8, room_size: float = 0.9) -> str:
+# Matches a fixed ending however the model punctuated or capitalized it
+_FIXED_PHRASE_PATTERNS = [
+    (phrase, re.compile(r"\s*" + r"\s+".join(re.escape(word) for word in phrase.rstrip(".").split())
+                        + r"[.!'\"]*\s*$", re.IGNORECASE))
+    for phrase in FIXED_PHRASES
+]
+
+# Dry (un-reverbed) renditions of the fixed phrases, keyed by (phrase, voice)
+_fixed_phrase_audio: Dict[tuple, tuple] = {}
+_fixed_phrase_renders = single_flight("tts_fixed_phrase")
+_fixed_phrase_counters = {"spliced": 0, "characters_saved": 0, "phrase_renders": 0}
+_fixed_phrase_lock = threading.Lock()
+
+
+def add_godly_reverb(audio: "np.ndarray", sample_rate: int, reverb_decay: float = 0.8,
+                     room_size: float = 0.9) -> "np.ndarray":
     """
-    Add godly reverb effect to an audio file for divine, ethereal atmosphere
+    Add godly reverb effect to decoded audio for divine, ethereal atmosphere
     Creates a rich, heavenly reverb like a voice speaking from the heavens
     
     Args:
-        audio_path: Path to the original audio file
+        audio: Mono audio samples
+        sample_rate: Sample rate of the audio in Hz
         reverb_decay: Reverb decay factor (0.0-1.0, default 0.8 for rich reverb)
         room_size: Simulated room size (0.0-1.0, default 0.9 for cathedral-like space)
         
     Returns:
-        Path to the processed audio file with godly reverb
+        Audio samples with godly reverb (the input unchanged on failure)
     """
-    if not AUDIO_PROCESSING_AVAILABLE:
-        print("Audio processing not available, returning original file")
-        return audio_path
-    
     try:
-        # Load the audio file
-        audio, sample_rate = librosa.load(audio_path, sr=None) # type: ignore
+        # Runs in the DSP worker pool so the CPU work doesn't hold the GIL of this process
+        with metrics.stage("reverb"):
+            output_audio = dsp_pool.reverb(audio, sample_rate, reverb_decay, room_size)
+        print("Godly reverb effect applied")
+        return output_audio
         
-        # Create multiple reverb tails at different delays for rich, godly sound
-        reverb_delays = [0.03, 0.07, 0.13, 0.19, 0.29, 0.41, 0.53]  # Prime numbers for natural sound
-        reverb_gains = [0.6, 0.5, 0.4, 0.35, 0.3, 0.25, 0.2]  # Decreasing gains
+    except Exception as e:
+        print(f"Error applying godly reverb effect: {e}")
+        return audio
+
+
+def decode_audio(data: bytes) -> tuple["np.ndarray", int]:
+    """
+    Decode an encoded clip held in memory
+    
+    Args:
+        data: Encoded audio bytes (e.g. MP3 from ElevenLabs)
         
-        # Calculate the longest delay to size the output buffer
-        max_delay = max(reverb_delays)
-        max_delay_samples = int(max_delay * sample_rate)
+    Returns:
+        Tuple of mono float32 samples and sample rate
+    """
+    import soundfile as sf
+    
+    audio, sample_rate = sf.read(io.BytesIO(data), dtype='float32')
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    return audio, sample_rate
+
+
+def encode_audio(audio: "np.ndarray", sample_rate: int, audio_format: str = "MP3",
+                 subtype: Optional[str] = None, compression_level: Optional[float] = None) -> bytes:
+    """
+    Encode audio samples in memory
+    
+    Args:
+        audio: Audio samples
+        sample_rate: Sample rate of the audio in Hz
+        audio_format: soundfile container format
+        subtype: soundfile codec within the container (e.g. "OPUS" for OGG)
+        compression_level: Encoder compression (0.0 = best quality, 1.0 = smallest)
         
-        # Create output buffer with room for reverb tail
-        reverb_length = int(sample_rate * 2.0 * room_size)  # 2 seconds max reverb tail
-        output_audio = np.zeros(len(audio) + reverb_length) # type: ignore
+    Returns:
+        Encoded audio bytes
+    """
+    import soundfile as sf
+    
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format=audio_format, subtype=subtype,
+             compression_level=compression_level)
+    return buffer.getvalue()
+
+
+class _StreamSink(io.RawIOBase):
+    """Append-only file object that hands encoded bytes out as soon as they are written"""
+    
+    def __init__(self):
+        self._pending = bytearray()
+        self._position = 0
+        self._written = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def readable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        size = len(data)
+        # Bytes already sent can't be changed; encoders only go back to patch
+        # header fields (e.g. frame counts) which streaming players don't need
+        if self._position == self._written:
+            self._pending += bytes(data)
+            self._written += size
+        self._position += size
+        return size
+    
+    def read(self, size: int = -1) -> bytes:
+        return b""
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        else:
+            self._position = self._written + offset
+        return self._position
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = bytes(self._pending)
+        self._pending.clear()
+        return data
+
+
+class StreamingEncoder:
+    """
+    Incremental audio encoder for progressive responses.
+    
+    Only the encoder's own look-ahead is buffered, so memory use does not grow
+    with the length of the clip.
+    """
+    
+    def __init__(self, sample_rate: int, audio_format: str = "MP3", subtype: Optional[str] = None,
+                 compression_level: Optional[float] = None):
+        import soundfile as sf
         
-        # Add the original audio
-        output_audio[:len(audio)] = audio
+        self._sink = _StreamSink()
+        self._file = sf.SoundFile(self._sink, mode='w', samplerate=sample_rate, channels=1,
+                                  format=audio_format, subtype=subtype,
+                                  compression_level=compression_level)
+    
+    def encode(self, audio: "np.ndarray") -> bytes:
+        """
+        Encode the next block of samples
         
-        # Add multiple reverb reflections for rich, divine sound
-        for delay, gain in zip(reverb_delays, reverb_gains):
-            delay_samples = int(delay * sample_rate)
-            adjusted_gain = gain * reverb_decay
-            
-            # Add reverb reflection
-            end_idx = delay_samples + len(audio)
-            if end_idx <= len(output_audio):
-                output_audio[delay_samples:end_idx] += audio * adjusted_gain
-        
-        # Add diffused reverb tail for heavenly atmosphere
-        for i in range(3):  # Multiple layers of diffusion
-            tail_delay = int(sample_rate * (0.1 + i * 0.15))  # Increasing delays
-            tail_gain = reverb_decay * (0.3 - i * 0.08)  # Decreasing gains
+        Args:
+            audio: Mono float samples
             
-            if tail_delay + len(audio) <= len(output_audio):
-                # Add filtered reverb tail (simulate frequency response of large space)
-                filtered_audio = audio * tail_gain
-                output_audio[tail_delay:tail_delay + len(audio)] += filtered_audio
+        Returns:
+            Encoded bytes ready to send (may be empty)
+        """
+        if len(audio):
+            self._file.write(audio)
+        return self._sink.drain()
+    
+    def close(self) -> bytes:
+        """
+        Finish the stream
+        
+        Returns:
+            The last encoded bytes
+        """
+        self._file.close()
+        return self._sink.drain()
+
+
+def write_audio_file(path: str, data: bytes) -> None:
+    """
+    Atomically write an audio file
+    
+    The data goes to a temporary file in the same directory which is then
+    renamed into place, so readers never see a partially written clip.
+    
+    Args:
+        path: Final path of the audio file
+        data: Encoded audio bytes
+    """
+    with metrics.stage("disk_write"):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
         
-        # Apply gentle low-pass filtering to simulate air absorption (makes it more ethereal)
-        # Simple moving average for high-frequency rolloff
-        kernel_size = 3
-        kernel = np.ones(kernel_size) / kernel_size # type: ignore
-        output_audio = np.convolve(output_audio, kernel, mode='same') # type: ignore
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def apply_voice_effects(data: bytes, voice: str = "deep_ah") -> bytes:
+    """
+    Apply the voice's post-processing to an encoded ElevenLabs clip
+    
+    Args:
+        data: Encoded audio bytes as returned by ElevenLabs
+        voice: Voice the clip was generated with
+        
+    Returns:
+        Encoded audio bytes of the finished clip
+    """
+    # Apply godly reverb effect for vampire voice
+    reverb = VOICE_REVERB.get(voice.lower())
+    if reverb and AUDIO_PROCESSING_AVAILABLE:
+        data = finish_voice_audio(*decode_audio(data), voice)
+    
+    return data
+
+
+def finish_voice_audio(audio: "np.ndarray", sample_rate: int, voice: str = "deep_ah") -> bytes:
+    """
+    Apply the voice's effects to decoded samples and encode the finished clip
+    
+    Args:
+        audio: Mono dry samples
+        sample_rate: Sample rate of the audio in Hz
+        voice: Voice the clip was generated with
         
-        # Normalize to prevent clipping while preserving dynamics
-        max_val = np.max(np.abs(output_audio)) # type: ignore
-        if max_val > 0.95:
-            output_audio = output_audio * (0.95 / max_val)
+    Returns:
+        Encoded audio bytes of the finished clip
+    """
+    reverb = VOICE_REVERB.get(voice.lower())
+    if reverb:
+        print("Applying divine reverb effect for vampire voice...")
+        audio = add_godly_reverb(audio, sample_rate, **reverb)
+    return encode_audio(audio, sample_rate)
+
+
+def split_fixed_phrase(text: str) -> tuple[str, Optional[str]]:
+    """
+    Split a known fixed ending off a text
+    
+    Args:
+        text: Text to be spoken
         
-        # Create output filename
-        base_name, ext = os.path.splitext(audio_path)
-        reverb_path = f"{base_name}_godly_reverb{ext}"
+    Returns:
+        Tuple of the part that has to be synthesized and the fixed phrase,
+        or the unchanged text and None if it doesn't end in a fixed phrase
+    """
+    for phrase, pattern in _FIXED_PHRASE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            variable = text[:match.start()].rstrip()
+            # Only split when something is left to say
+            if any(c.isalnum() for c in variable):
+                return variable, phrase
+    return text, None
+
+
+def match_fixed_phrase(text: str) -> Optional[str]:
+    """
+    Check if a text is nothing but a fixed phrase
+    
+    Args:
+        text: Text to be spoken, e.g. the last sentence of an answer
         
-        # Save the processed audio
-        sf.write(reverb_path, output_audio, sample_rate) # type: ignore
+    Returns:
+        The fixed phrase, or None if the text says anything else
+    """
+    for phrase, pattern in _FIXED_PHRASE_PATTERNS:
+        match = pattern.search(text)
+        if match and not any(c.isalnum() for c in text[:match.start()]):
+            return phrase
+    return None
+
+
+def get_fixed_phrase_audio(phrase: str, voice: str = "deep_ah") -> tuple["np.ndarray", int]:
+    """
+    Get the dry rendition of a fixed phrase, rendering it on first use
+    
+    Renditions are kept in memory and in FIXED_PHRASE_AUDIO_DIR, so each
+    phrase is synthesized once per voice and rendering setting.
+    
+    Args:
+        phrase: One of FIXED_PHRASES
+        voice: Voice to use
         
-        print(f"Godly reverb effect applied: {reverb_path}")
-        return reverb_path
+    Returns:
+        Tuple of mono float32 samples and sample rate
+    """
+    key = (phrase, voice.lower())
+    cached = _fixed_phrase_audio.get(key)
+    if cached is not None:
+        return cached
+    
+    # Dry rendition, so the reverb can run over the joined clip
+    phrase_key = make_audio_cache_key(phrase, voice, VOICE_SETTINGS, ELEVENLABS_MODEL, None)
+    path = os.path.join(settings.FIXED_PHRASE_AUDIO_DIR, voice.lower(), f"{phrase_key[:16]}.mp3")
+    
+    def render() -> bytes:
+        timeout = _blocking_timeout()
+        with _elevenlabs_calls.breaker.guard():
+            data = b"".join(_generate_blocking(phrase, voice, timeout))
+        write_audio_file(path, data)
+        with _fixed_phrase_lock:
+            _fixed_phrase_counters["phrase_renders"] += 1
+        print(f"Fixed phrase rendered: {path}")
+        return data
+    
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            data = f.read()
+    else:
+        data = _fixed_phrase_renders.do_sync(key, render)
+    
+    audio = decode_audio(data)
+    _fixed_phrase_audio[key] = audio
+    return audio
+
+
+def splice_fixed_phrase(data: bytes, phrase_audio: tuple["np.ndarray", int], voice: str = "deep_ah") -> bytes:
+    """
+    Join a synthesized clip to a fixed phrase and finish the result
+    
+    The reverb is applied once over the joined clip, so the tail of the
+    synthesized part rings on into the fixed phrase as if spoken in one take.
+    
+    Args:
+        data: Encoded dry clip of the variable part, as returned by ElevenLabs
+        phrase_audio: Dry samples and sample rate from get_fixed_phrase_audio
+        voice: Voice the clips were generated with
         
+    Returns:
+        Encoded audio bytes of the finished clip
+    """
+    from services.audio_splice import join_phrases
+    from services.transcode import resample
+    
+    audio, sample_rate = decode_audio(data)
+    phrase_samples, phrase_rate = phrase_audio
+    if phrase_rate != sample_rate:
+        phrase_samples = resample(phrase_samples, phrase_rate, sample_rate)
+    return finish_voice_audio(join_phrases(audio, phrase_samples, sample_rate), sample_rate, voice)
+
+
+def _prepare_fixed_phrase(text: str, voice: str) -> tuple[str, Optional[tuple]]:
+    # Returns the text to synthesize and the fixed phrase audio to append, if any
+    if not AUDIO_PROCESSING_AVAILABLE:
+        return text, None
+    variable, phrase = split_fixed_phrase(text)
+    if phrase is None:
+        return text, None
+    try:
+        phrase_audio = get_fixed_phrase_audio(phrase, voice)
     except Exception as e:
-        print(f"Error applying godly reverb effect: {e}")
-        return audio_path
+        print(f"Error loading fixed phrase '{phrase}', synthesizing the full text: {e}")
+        return text, None
+    with _fixed_phrase_lock:
+        _fixed_phrase_counters["spliced"] += 1
+        _fixed_phrase_counters["characters_saved"] += len(text) - len(variable)
+    return variable, phrase_audio
+
+
+def get_fixed_phrase_stats() -> Dict[str, Any]:
+    """
+    Get fixed phrase splicing counters
+    
+    Returns:
+        Dictionary with spliced clips, characters not sent to ElevenLabs and phrase renders
+    """
+    with _fixed_phrase_lock:
+        return dict(_fixed_phrase_counters, phrases_loaded=len(_fixed_phrase_audio))
+
+
+def _generation_options(text: str, voice: str) -> dict:
+    from elevenlabs import VoiceSettings
+    
+    # Highest quality settings optimized for vampire voice, shared by the sync and async clients
+    return {
+        "text": text,
+        # Get the voice ID, default to deep_ah (vampire voice) if not found
+        "voice": VOICE_IDS.get(voice.lower(), VOICE_IDS["deep_ah"]),
+        "model": ELEVENLABS_MODEL,
+        "voice_settings": VoiceSettings(**VOICE_SETTINGS),
+    }
+
+
+def _blocking_timeout() -> Optional[float]:
+    # Blocking calls can't be cancelled or hedged, so they are held to the "tts" stage
+    # budget by the HTTP client's timeout and a check of the budget between chunks
+    timeout = stage_timeout("tts")
+    if timeout is not None and timeout <= 0:
+        raise TimeoutError("No budget left for elevenlabs")
+    return timeout
+
+
+def _generate_blocking(text: str, voice: str, timeout: Optional[float], **options) -> Iterator[bytes]:
+    # The request is made on the first iteration, inside the caller's circuit breaker guard
+    if timeout is not None:
+        options["request_options"] = {"timeout_in_seconds": max(math.ceil(timeout), 1)}
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for chunk in upstream_clients.elevenlabs_sync().generate(**_generation_options(text, voice), **options):
+        if deadline is not None and time.monotonic() > deadline:
+            print("elevenlabs call ran out of its budget")
+            raise TimeoutError("elevenlabs call ran out of its budget")
+        yield chunk
+
+
+async def _synthesize_async(text: str, voice: str) -> bytes:
+    # Bounded by the "tts" stage budget and hedged when ElevenLabs is slow
+    async def attempt() -> bytes:
+        audio = await upstream_clients.elevenlabs().generate(**_generation_options(text, voice))
+        return b"".join([chunk async for chunk in audio])
+    with metrics.stage("tts"):
+        return await _elevenlabs_calls.call(attempt)
+
+
+def render_speech(text: str, voice: str = "deep_ah") -> bytes:
+    """
+    Synthesize speech with ElevenLabs and apply the voice's effects in memory
+    
+    A fixed ending such as "...The shell has spoken." is not sent to
+    ElevenLabs; its pre-rendered rendition is joined on instead.
+    
+    Args:
+        text: The text to convert to speech
+        voice: Voice to use for generation
+        
+    Returns:
+        Encoded audio bytes of the finished clip
+        
+    Raises:
+        TimeoutError: If the "tts" stage budget runs out first
+    """
+    text, phrase_audio = _prepare_fixed_phrase(text, voice)
+    timeout = _blocking_timeout()
+    with metrics.stage("tts"), _elevenlabs_calls.breaker.guard():
+        data = b"".join(_generate_blocking(text, voice, timeout))
+    if phrase_audio is not None:
+        return splice_fixed_phrase(data, phrase_audio, voice)
+    return apply_voice_effects(data, voice)
+
+
+async def render_speech_async(text: str, voice: str = "deep_ah") -> bytes:
+    """
+    Async version of render_speech
+    
+    The ElevenLabs request is awaited on the event loop; decoding, reverb and
+    encoding run in a worker thread.
+    
+    Args:
+        text: The text to convert to speech
+        voice: Voice to use for generation
+        
+    Returns:
+        Encoded audio bytes of the finished clip
+    """
+    # Loading (or on first use rendering) the fixed phrase blocks, so it runs in a thread
+    text, phrase_audio = await asyncio.to_thread(_prepare_fixed_phrase, text, voice)
+    data = await _synthesize_async(text, voice)
+    if phrase_audio is not None:
+        return await asyncio.to_thread(splice_fixed_phrase, data, phrase_audio, voice)
+    return await asyncio.to_thread(apply_voice_effects, data, voice)
+
+
+async def render_sentence_async(sentence: str, voice: str = "deep_ah") -> tuple["np.ndarray", int]:
+    """
+    Synthesize one sentence of a longer answer, without the voice's effects
+    
+    A sentence that is only a fixed phrase is taken from its rendition; a
+    fixed ending is joined on. The dry clips are stitched and finished by
+    stitch_sentences.
+    
+    Args:
+        sentence: The sentence to convert to speech
+        voice: Voice to use for generation
+        
+    Returns:
+        Tuple of mono float32 dry samples and sample rate
+    """
+    phrase = match_fixed_phrase(sentence)
+    if phrase is not None:
+        try:
+            return await asyncio.to_thread(get_fixed_phrase_audio, phrase, voice)
+        except Exception as e:
+            print(f"Error loading fixed phrase '{phrase}', synthesizing it: {e}")
+    
+    text, phrase_audio = await asyncio.to_thread(_prepare_fixed_phrase, sentence, voice)
+    data = await _synthesize_async(text, voice)
+    samples, sample_rate = await asyncio.to_thread(decode_audio, data)
+    if phrase_audio is not None:
+        samples = await asyncio.to_thread(_join_dry, [(samples, sample_rate), phrase_audio])
+    return samples, sample_rate
+
+
+def stitch_sentences(segments: list[tuple["np.ndarray", int]], voice: str = "deep_ah") -> bytes:
+    """
+    Join dry sentence clips into one clip and finish it
+    
+    Sentences are joined with the same pause as a fixed ending, and the
+    reverb runs once over the whole clip so it rings on across the joins.
+    
+    Args:
+        segments: Dry samples and sample rate of each sentence, in order
+        voice: Voice the clips were generated with
+        
+    Returns:
+        Encoded audio bytes of the finished clip
+    """
+    return finish_voice_audio(_join_dry(segments), segments[0][1], voice)
+
+
+def _join_dry(segments: list[tuple["np.ndarray", int]]) -> "np.ndarray":
+    # Joins clips at the first clip's sample rate
+    from services.audio_splice import join_phrases
+    from services.transcode import resample
+    
+    audio, sample_rate = segments[0]
+    for samples, rate in segments[1:]:
+        if rate != sample_rate:
+            samples = resample(samples, rate, sample_rate)
+        audio = join_phrases(audio, samples, sample_rate)
+    return audio
+
+
+def is_streaming_available() -> bool:
+    """
+    Check if progressive speech streaming can be used
+    
+    Returns:
+        True if ElevenLabs is configured and not being skipped by its circuit
+        breaker, and the audio libraries are installed
+    """
+    return (bool(settings.ELEVENLABS_API_KEY) and AUDIO_PROCESSING_AVAILABLE
+            and _elevenlabs_calls.breaker.state != OPEN)
+
+
+def _through_breaker(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    # A streamed call's latency, as the circuit breaker sees it, is the time to its first chunk
+    breaker = _elevenlabs_calls.breaker
+    probe = breaker.check()
+    started = time.perf_counter()
+    latency = None
+    try:
+        for chunk in chunks:
+            if latency is None:
+                latency = time.perf_counter() - started
+            yield chunk
+    except Exception:
+        breaker.record(False, time.perf_counter() - started, probe)
+        raise
+    except BaseException:
+        # The client went away mid-stream
+        breaker.release(probe)
+        raise
+    breaker.record(True, latency if latency is not None else time.perf_counter() - started, probe)
+
+
+def stream_speech(text: str, voice: str = "deep_ah", audio_format: str = "mp3") -> Iterator[bytes]:
+    """
+    Stream encoded speech while ElevenLabs is still generating it
+    
+    Raw PCM chunks are passed block by block through a stateful reverb and an
+    incremental encoder, so the first audio goes out after the first chunk
+    instead of after the whole clip has been rendered. A fixed ending is
+    streamed from its pre-rendered rendition after the synthesized part.
+    
+    Args:
+        text: The text to convert to speech
+        voice: Voice to use for generation
+        audio_format: "mp3", or "opus" for a low-bitrate Ogg/Opus stream
+        
+    Yields:
+        Encoded audio bytes
+        
+    Raises:
+        TimeoutError: If the "tts" stage budget runs out, which ends the stream
+    """
+    import numpy as np
+    from services.audio_splice import join_phrases
+    from services.reverb import StreamingReverb
+    from services.transcode import resample
+    
+    print(f"Streaming speech: {text} using voice: {voice}")
+    text, phrase_audio = _prepare_fixed_phrase(text, voice)
+    
+    if audio_format == "opus":
+        # Opus only takes a few sample rates, so ask ElevenLabs for one directly
+        output_format = f"pcm_{settings.OPUS_SAMPLE_RATE}"
+        encoder_options = {"audio_format": "OGG", "subtype": "OPUS",
+                           "compression_level": settings.OPUS_COMPRESSION_LEVEL}
+    else:
+        output_format = settings.ELEVENLABS_STREAM_FORMAT
+        encoder_options = {}
+    sample_rate = int(output_format.split("_")[1])
+    
+    chunks = _through_breaker(
+        _generate_blocking(text, voice, _blocking_timeout(), stream=True, output_format=output_format)
+    )
+    
+    reverb_params = VOICE_REVERB.get(voice.lower())
+    reverb = StreamingReverb(sample_rate, **reverb_params) if reverb_params else None
+    encoder = StreamingEncoder(sample_rate, **encoder_options)
+    
+    # 16-bit samples can be split across chunk boundaries
+    leftover = b""
+    for chunk in chunks:
+        data = leftover + chunk
+        usable = len(data) - len(data) % 2
+        leftover = data[usable:]
+        if not usable:
+            continue
+        
+        block = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        if reverb:
+            block = reverb.process(block)
+        
+        encoded = encoder.encode(block)
+        if encoded:
+            yield encoded
+    
+    if phrase_audio is not None:
+        # The synthesized part has already gone out, so only the pause and the
+        # fade-in of the phrase are added; the reverb tail carries across the join
+        phrase_samples, phrase_rate = phrase_audio
+        block = join_phrases(np.zeros(0, dtype=np.float32), resample(phrase_samples, phrase_rate, sample_rate), sample_rate)
+        if reverb:
+            block = reverb.process(block)
+        yield encoder.encode(block)
+    
+    if reverb:
+        yield encoder.encode(reverb.flush())
+    yield encoder.close()
 
 
 def get_speech_from_text(text: str, filename: str, voice: str = "deep_ah") -> str:
     """
     Generate audio from text using ElevenLabs API
     
+    The clip is synthesized, processed and encoded in memory; only the
+    finished file is written to disk. Concurrent calls for the same clip
+    share one ElevenLabs request.
+    
     Args:
         text: The text to convert to speech
         filename: Desired filename for the output
@@ -118,43 +716,84 @@ def get_speech_from_text(text: str, filename: str, voice: str = "deep_ah") -> st
             print("Warning: ELEVENLABS_API_KEY not found. Using placeholder audio.")
             return f"audio/classic/{voice.lower()}_placeholder.mp3"
         
-        client = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
+        output_path = os.path.join(settings.GENERATED_AUDIO_DIR, filename)
+        _speech_renders.do_sync(
+            (output_path, text, voice.lower()),
+            lambda: write_audio_file(output_path, render_speech(text, voice))
+        )
         
-        # Map voice names to ElevenLabs voice IDs
-        voice_mapping = {
-            "deep_ah": "Tj9l48J9AJbry5yCP5eW", # Matthew Schmitz - Nosferatu Ancient Vampire Lord
-        }
+        print(f"Audio generated successfully: {output_path}")
+        return f"/{output_path}"
         
-        # Get the voice ID, default to deep_ah (vampire voice) if not found
-        voice_id = voice_mapping.get(voice.lower(), "Tj9l48J9AJbry5yCP5eW")
-        
-        # Generate audio with highest quality settings optimized for vampire voice
-        # Using the finest model available with enhanced settings for gothic horror
-        audio = client.generate(
-            text=text,
-            voice=voice_id,
-            model="eleven_turbo_v2_5",  # Highest quality model available
-            voice_settings=VoiceSettings(
-                stability=0.6,           # Higher stability for dramatic effect
-                similarity_boost=0.9,    # Maximum voice characteristics preservation
-                style=0.3,               # Slight style enhancement for gothic character
-                use_speaker_boost=True   # Enhanced clarity for deep voice
-            )
-        )
+    except Exception as e:
+        print(f"Error generating audio with ElevenLabs: {e}")
+        # Fallback to placeholder
+        return f"audio/classic/{voice.lower()}_placeholder.mp3"
+
+
+def generate_audio_for_text(text: str, voice: str = "deep_ah") -> str:
+    """
+    Generate audio file for given text, reusing a cached render when possible
+    
+    Clips are content-addressed: the file name is a hash of the text, voice,
+    voice settings, model and reverb parameters, so a repeated request is
+    answered from the cache without calling ElevenLabs or applying reverb.
+    
+    Args:
+        text: Text to convert to speech
+        voice: Voice to use
         
-        # Ensure the generated audio directory exists
-        os.makedirs(settings.GENERATED_AUDIO_DIR, exist_ok=True)
-        output_path = os.path.join(settings.GENERATED_AUDIO_DIR, filename)
+    Returns:
+        URL path to the generated audio file
+    """
+    # Validate voice
+    if not is_voice_available(voice):
+        print(f"Warning: Voice '{voice}' not available. Using 'deep_ah' as fallback.")
+        voice = "deep_ah"
+    
+    cache_key = get_audio_cache_key(text, voice)
+    cached_url = audio_cache.get(cache_key)
+    metrics.cache_lookup("audio", bool(cached_url))
+    if cached_url:
+        print(f"Audio cache hit: {cached_url}")
+        return cached_url
+    
+    audio_url = get_speech_from_text(text, audio_cache.relative_path(cache_key), voice)
+    
+    # Only cache real renders, never the placeholder fallback
+    if audio_url.startswith(f"/{settings.GENERATED_AUDIO_DIR}/"):
+        audio_cache.put(cache_key, audio_url)
+    
+    return audio_url
+
+
+async def get_speech_from_text_async(text: str, filename: str, voice: str = "deep_ah") -> str:
+    """
+    Async version of get_speech_from_text
+    
+    Concurrent calls for the same clip share one ElevenLabs request; the
+    request is only cancelled once every caller has gone away.
+    
+    Args:
+        text: The text to convert to speech
+        filename: Desired filename for the output
+        voice: Voice to use for generation
         
-        # Save the audio file
-        with open(output_path, "wb") as f:
-            for chunk in audio:
-                f.write(chunk)
+    Returns:
+        Path to the audio file
+    """
+    print(f"Generating speech: {text} using voice: {voice}")
+    
+    try:
+        if not settings.ELEVENLABS_API_KEY:
+            print("Warning: ELEVENLABS_API_KEY not found. Using placeholder audio.")
+            return f"audio/classic/{voice.lower()}_placeholder.mp3"
         
-        # Apply godly reverb effect for vampire voice
-        if voice.lower() == "deep_ah":
-            print("Applying divine reverb effect for vampire voice...")
-            output_path = add_godly_reverb(output_path, reverb_decay=0.85, room_size=0.95)
+        output_path = os.path.join(settings.GENERATED_AUDIO_DIR, filename)
+        await _speech_renders.do(
+            (output_path, text, voice.lower()),
+            lambda: _render_to_file_async(text, voice, output_path)
+        )
         
         print(f"Audio generated successfully: {output_path}")
         return f"/{output_path}"
@@ -165,9 +804,14 @@ def get_speech_from_text(text: str, filename: str, voice: str = "deep_ah") -> st
         return f"audio/classic/{voice.lower()}_placeholder.mp3"
 
 
-def generate_audio_for_text(text: str, voice: str = "deep_ah") -> str:
+async def _render_to_file_async(text: str, voice: str, output_path: str) -> None:
+    data = await render_speech_async(text, voice)
+    await asyncio.to_thread(write_audio_file, output_path, data)
+
+
+async def generate_audio_for_text_async(text: str, voice: str = "deep_ah") -> str:
     """
-    Generate audio file for given text with proper file naming
+    Async version of generate_audio_for_text for use in request handlers
     
     Args:
         text: Text to convert to speech
@@ -181,11 +825,41 @@ def generate_audio_for_text(text: str, voice: str = "deep_ah") -> str:
         print(f"Warning: Voice '{voice}' not available. Using 'deep_ah' as fallback.")
         voice = "deep_ah"
     
-    # Create a safe filename from the text
-    safe_text = clean_filename(text)
-    filename = f"{safe_text}_{voice}.mp3"
+    cache_key = get_audio_cache_key(text, voice)
+    # A lookup checks the clip is still on disk, so it stays off the event loop
+    cached_url = await asyncio.to_thread(audio_cache.get, cache_key)
+    metrics.cache_lookup("audio", bool(cached_url))
+    if cached_url:
+        print(f"Audio cache hit: {cached_url}")
+        return cached_url
     
-    return get_speech_from_text(text, filename, voice)
+    audio_url = await get_speech_from_text_async(text, audio_cache.relative_path(cache_key), voice)
+    
+    # Only cache real renders, never the placeholder fallback
+    if audio_url.startswith(f"/{settings.GENERATED_AUDIO_DIR}/"):
+        await asyncio.to_thread(audio_cache.put, cache_key, audio_url)
+    
+    return audio_url
+
+
+def get_audio_cache_key(text: str, voice: str = "deep_ah") -> str:
+    """
+    Get the content hash identifying the clip for the given text and voice
+    
+    Args:
+        text: Text to convert to speech
+        voice: Voice to use
+        
+    Returns:
+        Hex digest covering text, voice, voice settings, model and reverb
+    """
+    return make_audio_cache_key(
+        text,
+        voice,
+        VOICE_SETTINGS,
+        ELEVENLABS_MODEL,
+        VOICE_REVERB.get(voice.lower())
+    )
 
 
 def get_available_voices() -> dict[str, str]:
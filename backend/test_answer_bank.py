@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-rendered classic answer bank
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.answer_bank as answer_bank
+from services.answer_bank import ClassicAnswerBank
+from services.tts_service import write_audio_file
+
+ANSWERS = {"Yes": ["Yes.", "It is certain."], "No": ["No."]}
+
+
+def test_loads_and_rotates_variants():
+    with tempfile.TemporaryDirectory() as directory:
+        bank = ClassicAnswerBank(directory, ANSWERS)
+        for text in ANSWERS["Yes"]:
+            write_audio_file(bank.variant_path("Yes", text, "deep_ah"), text.encode())
+
+        assert bank.load() == 2
+        picked = [bank.pick("Yes", "deep_ah") for _ in range(4)]
+        assert [clip.text for clip in picked] == ["Yes.", "It is certain.", "Yes.", "It is certain."]
+        assert picked[0].url == "/" + bank.variant_path("Yes", "Yes.", "deep_ah")
+
+        # Answers without a clip fall back to live synthesis
+        assert bank.pick("No", "deep_ah") is None
+        assert bank.missing() == [("No", "No.", "deep_ah")]
+
+        stats = bank.stats()
+        assert stats["variants"]["deep_ah/Yes"] == 2
+        assert stats["served"] == 4
+
+
+def test_renders_missing_lines_once():
+    calls = []
+
+    async def fake_render(text, voice="deep_ah"):
+        calls.append(text)
+        return f"audio:{text}".encode()
+
+    original = answer_bank.render_speech_async
+    answer_bank.render_speech_async = fake_render
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            bank = ClassicAnswerBank(directory, ANSWERS)
+            bank.load()
+            assert asyncio.run(bank.render_missing()) == 3
+            path = bank.variant_path("No", "No.", "deep_ah")
+            assert bank.pick("No", "deep_ah").url == "/" + path
+            with open(path, "rb") as f:
+                assert f.read() == b"audio:No."
+
+            # The next boot loads the rendered clips from disk
+            reloaded = ClassicAnswerBank(directory, ANSWERS)
+            assert reloaded.load() == 3
+            assert asyncio.run(reloaded.render_missing()) == 0
+            assert len(calls) == 3
+    finally:
+        answer_bank.render_speech_async = original
+
+
+if __name__ == "__main__":
+    test_loads_and_rotates_variants()
+    test_renders_missing_lines_once()
+    print("✅ Answer bank tests passed!")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the ready-made answer reservoir
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.answer_reservoir as answer_reservoir
+from config.settings import settings
+from services.answer_reservoir import AnswerReservoir, ReservoirItem
+from services.llm_service import LLM_ERROR_RESPONSE
+
+
+def _reservoir(make_answer=None, **options) -> AnswerReservoir:
+    async def no_answer():
+        return ""
+
+    return AnswerReservoir("test", make_answer or no_answer, depth=options.get("depth", 3),
+                           max_age=options.get("max_age", 3600), no_repeat=5, idle_delay=0)
+
+
+@contextmanager
+def _audio_store():
+    # Pooled clips are looked up in the generated audio store, so point it at a temporary one
+    original = settings.GENERATED_AUDIO_DIR
+    with tempfile.TemporaryDirectory(dir=backend_dir) as directory:
+        settings.GENERATED_AUDIO_DIR = os.path.relpath(directory)
+        try:
+            yield settings.GENERATED_AUDIO_DIR
+        finally:
+            settings.GENERATED_AUDIO_DIR = original
+
+
+def _item(directory: str, message: str, age: float = 0) -> ReservoirItem:
+    path = os.path.join(directory, f"{abs(hash(message))}.mp3")
+    with open(path, "wb") as f:
+        f.write(b"audio")
+    return ReservoirItem(message, f"/{path}", time.time() - age)
+
+
+def test_takes_ready_answers_and_falls_back_when_empty():
+    with _audio_store() as directory:
+        reservoir = _reservoir()
+        reservoir.add("deep_ah", _item(directory, "The tide turns... The shell has spoken."))
+        # Stale items and items whose clip was evicted are skipped
+        reservoir.add("deep_ah", _item(directory, "Old news... The shell has spoken.", age=7200))
+        evicted = _item(directory, "Gone... The shell has spoken.")
+        os.remove(os.path.join(directory, os.path.basename(evicted.audio_url)))
+        reservoir.add("deep_ah", evicted)
+        reservoir.add("deep_ah", _item(directory, "The wind waits... The shell has spoken."))
+
+        assert asyncio.run(reservoir.take("deep_ah")).message.startswith("The tide turns")
+        assert asyncio.run(reservoir.take("DEEP_AH")).message.startswith("The wind waits")
+        assert asyncio.run(reservoir.take("deep_ah")) is None
+
+        stats = reservoir.stats()
+        assert stats["served"] == 2 and stats["fallbacks"] == 1 and stats["expired"] == 2
+
+
+def test_clients_dont_hear_the_same_answer_twice():
+    with _audio_store() as directory:
+        reservoir = _reservoir()
+        reservoir.remember("client-a", "Same old... The shell has spoken.")
+        reservoir.add("deep_ah", _item(directory, "Same old... The shell has spoken."))
+        reservoir.add("deep_ah", _item(directory, "Something new... The shell has spoken."))
+
+        assert asyncio.run(reservoir.take("deep_ah", "client-a")).message.startswith("Something new")
+        # The skipped answer is kept for another client
+        assert asyncio.run(reservoir.take("deep_ah", "client-b")).message.startswith("Same old")
+        assert reservoir.stats()["repeats_skipped"] == 1
+
+
+def test_refill_only_pools_finished_answers():
+    answers = iter(["The sea knows... The shell has spoken.", LLM_ERROR_RESPONSE])
+
+    async def make_answer():
+        return next(answers)
+
+    async def fake_audio(text, voice="deep_ah"):
+        return f"/{settings.GENERATED_AUDIO_DIR}/ab/{abs(hash(text))}.mp3"
+
+    original = answer_reservoir.generate_audio_for_text_async
+    answer_reservoir.generate_audio_for_text_async = fake_audio
+    try:
+        reservoir = _reservoir(make_answer, depth=2)
+        assert reservoir.needs_refill() == "deep_ah"
+        assert asyncio.run(reservoir.refill_one("deep_ah"))
+        # Gemini errors never end up in the pool
+        assert not asyncio.run(reservoir.refill_one("deep_ah"))
+        assert reservoir.stats()["depth"] == {"deep_ah": 1}
+    finally:
+        answer_reservoir.generate_audio_for_text_async = original
+
+
+if __name__ == "__main__":
+    test_takes_ready_answers_and_falls_back_when_empty()
+    test_clients_dont_hear_the_same_answer_twice()
+    test_refill_only_pools_finished_answers()
+    print("✅ Answer reservoir tests passed!")
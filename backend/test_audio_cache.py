@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed TTS audio cache
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from services.audio_cache import AudioCache, make_audio_cache_key
+
+
+VOICE_SETTINGS = {"stability": 0.6, "similarity_boost": 0.9, "style": 0.3, "use_speaker_boost": True}
+REVERB = {"reverb_decay": 0.85, "room_size": 0.95}
+
+# Clip keys are SHA-256 digests
+AA, BB, CC, DD = (letter * 64 for letter in "abcd")
+
+
+def _write_clip(cache: AudioCache, key: str, size: int, extension: str = "mp3") -> str:
+    path = os.path.join(cache.directory, cache.relative_path(key, extension))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    # Cache URLs are relative to the working directory
+    return "/" + os.path.relpath(path)
+
+
+def _age(cache: AudioCache, key: str, seconds: float) -> None:
+    # Pretend a clip was created and last used some time ago
+    entry = cache._entries[key]
+    entry["created"] -= seconds
+    entry["last_access"] -= seconds
+
+
+def test_keys_use_full_content():
+    """Answers sharing a long prefix must not share a key"""
+    prefix = "The river does not carve the stone by force, but by persistence"
+    key_a = make_audio_cache_key(prefix + " alone.", "deep_ah", VOICE_SETTINGS, "model", REVERB)
+    key_b = make_audio_cache_key(prefix + " and time.", "deep_ah", VOICE_SETTINGS, "model", REVERB)
+    assert key_a != key_b
+
+    # Any rendering parameter changes the key as well
+    key_c = make_audio_cache_key(prefix + " alone.", "deep_ah", VOICE_SETTINGS, "model", None)
+    assert key_a != key_c
+
+    # Keys are stable
+    assert key_a == make_audio_cache_key(prefix + " alone.", "DEEP_AH", dict(VOICE_SETTINGS), "model", dict(REVERB))
+
+
+def test_hit_miss_and_persistence():
+    with tempfile.TemporaryDirectory(dir=backend_dir) as directory:
+        cache = AudioCache(os.path.relpath(directory), max_bytes=10_000, max_entries=10)
+        assert cache.get(AA) is None
+
+        url = _write_clip(cache, AA, 100)
+        assert url.endswith(os.path.join("aa", AA + ".mp3"))
+        cache.put(AA, url)
+        assert cache.get(AA) == url
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["bytes"] == 100
+
+        # Clips written since the index was saved are found on disk
+        assert AudioCache(os.path.relpath(directory), max_bytes=10_000, max_entries=10).get(AA) == url
+
+        # The sweeper saves the index, which a new instance picks up
+        cache.sweep()
+        reloaded = AudioCache(os.path.relpath(directory), max_bytes=10_000, max_entries=10)
+        assert reloaded.stats()["entries"] == 1
+        assert reloaded.get(AA) == url
+
+        # Files deleted behind the cache's back are treated as misses
+        os.remove(url.lstrip("/"))
+        assert reloaded.get(AA) is None
+
+
+def test_lru_eviction_by_size_and_count():
+    with tempfile.TemporaryDirectory(dir=backend_dir) as directory:
+        cache = AudioCache(os.path.relpath(directory), max_bytes=250, max_entries=10)
+        url_a = _write_clip(cache, AA, 100)
+        url_b = _write_clip(cache, BB, 100)
+        url_c = _write_clip(cache, CC, 100)
+        cache.put(AA, url_a)
+        cache.put(BB, url_b)
+        _age(cache, AA, 120)
+        _age(cache, BB, 120)
+
+        # Touch AA so that BB becomes the least recently used entry
+        assert cache.get(AA) == url_a
+        _age(cache, AA, 100)
+        cache.put(CC, url_c)
+
+        assert cache.get(BB) is None
+        assert not os.path.exists(url_b.lstrip("/"))
+        assert cache.get(AA) == url_a
+        assert cache.get(CC) == url_c
+        assert cache.stats()["evictions"] == 1
+
+        # Transcodes next to an evicted clip are removed with it
+        transcode = _write_clip(cache, AA, 10, "ogg")
+        cache.sweep()
+        assert cache.stats()["bytes"] == 210
+        _age(cache, AA, 120)
+        _age(cache, CC, 60)
+        url_d = _write_clip(cache, DD, 100)
+        cache.put(DD, url_d)
+        assert cache.get(AA) is None
+        assert not os.path.exists(transcode.lstrip("/"))
+
+        cache.max_entries = 1
+        cache.sweep()
+        assert cache.stats()["entries"] == 1
+        assert cache.get(DD) == url_d
+
+
+def test_recently_used_clips_are_kept():
+    """A URL that was just handed out must still exist when the client fetches it"""
+    with tempfile.TemporaryDirectory(dir=backend_dir) as directory:
+        cache = AudioCache(os.path.relpath(directory), max_bytes=150, max_entries=10)
+        cache.put(AA, _write_clip(cache, AA, 100))
+        cache.put(BB, _write_clip(cache, BB, 100))
+        assert cache.stats()["entries"] == 2
+
+
+def test_age_and_access_count_policies():
+    with tempfile.TemporaryDirectory(dir=backend_dir) as directory:
+        cache = AudioCache(os.path.relpath(directory), max_bytes=10_000, max_entries=2, policy="access_count")
+        for key in (AA, BB):
+            cache.put(key, _write_clip(cache, key, 10))
+        for _ in range(3):
+            cache.get(AA)
+        _age(cache, AA, 120)
+        _age(cache, BB, 120)
+        cache.put(CC, _write_clip(cache, CC, 10))
+        # BB was never played, so it goes first even though AA is older
+        assert cache.get(BB) is None
+        assert cache.get(AA) is not None
+
+    with tempfile.TemporaryDirectory(dir=backend_dir) as directory:
+        cache = AudioCache(os.path.relpath(directory), max_bytes=10_000, max_entries=10, policy="age", max_age=3600)
+        cache.put(AA, _write_clip(cache, AA, 10))
+        cache.put(BB, _write_clip(cache, BB, 10))
+        _age(cache, AA, 7200)
+        _age(cache, BB, 120)
+        summary = cache.sweep()
+        assert summary["evicted"] == 1
+        assert cache.get(AA) is None
+        assert cache.get(BB) is not None
+
+    try:
+        AudioCache(os.path.relpath(directory), max_bytes=1, max_entries=1, policy="random")
+        assert False, "Unknown policies must be rejected"
+    except ValueError:
+        pass
+
+
+def test_sweep_adopts_only_its_own_clips_and_cleans_up():
+    with tempfile.TemporaryDirectory(dir=backend_dir) as directory:
+        cache = AudioCache(os.path.relpath(directory), max_bytes=100, max_entries=10)
+        # A clip and its transcode written behind the index's back, and a stale temporary file
+        _write_clip(cache, AA, 50)
+        _write_clip(cache, AA, 10, "ogg")
+        stale = os.path.join(directory, "tmpabc.tmp")
+        with open(stale, "wb") as f:
+            f.write(b"\0")
+        os.utime(stale, (0, 0))
+        # Files the store never wrote: an older flat layout, and a hash outside its shard
+        foreign = [os.path.join(directory, "old_answer_deep_ah.mp3"), os.path.join(directory, f"{BB}.mp3")]
+        for path in foreign:
+            with open(path, "wb") as f:
+                f.write(b"\0" * 500)
+            os.utime(path, (0, 0))
+
+        cache.sweep()
+        stats = cache.stats()
+        assert stats["entries"] == 1
+        assert stats["files"] == 2
+        assert stats["bytes"] == 60
+        assert stats["evictions"] == 0
+        assert not os.path.exists(stale)
+        assert all(os.path.exists(path) for path in foreign)
+
+
+def test_clips_put_during_a_sweep_are_kept():
+    with tempfile.TemporaryDirectory(dir=backend_dir) as directory:
+        cache = AudioCache(os.path.relpath(directory), max_bytes=1000, max_entries=10)
+        cache.put(AA, _write_clip(cache, AA, 100))
+        scan = cache._scan
+
+        def scan_then_put(now):
+            # A clip is rendered while the sweep is walking the directory
+            groups = scan(now)
+            cache.put(BB, _write_clip(cache, BB, 100))
+            return groups
+
+        cache._scan = scan_then_put
+        cache.sweep()
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["bytes"] == 200
+
+
+def test_background_sweeper_enforces_quota():
+    async def scenario(cache: AudioCache) -> None:
+        await cache.start()
+        cache.put(AA, _write_clip(cache, AA, 100))
+        _age(cache, AA, 120)
+        await asyncio.to_thread(cache.put, BB, _write_clip(cache, BB, 100))
+        for _ in range(100):
+            if cache.stats()["evictions"]:
+                break
+            await asyncio.sleep(0.01)
+        assert cache.stats()["sweeper_running"]
+        await cache.shutdown()
+
+    with tempfile.TemporaryDirectory(dir=backend_dir) as directory:
+        cache = AudioCache(os.path.relpath(directory), max_bytes=150, max_entries=10, sweep_interval=3600)
+        asyncio.run(scenario(cache))
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["evictions_per_minute"] > 0
+        assert cache.get(AA) is None
+        assert os.path.exists(os.path.join(directory, AudioCache.INDEX_FILENAME))
+
+
+if __name__ == "__main__":
+    test_keys_use_full_content()
+    test_hit_miss_and_persistence()
+    test_lru_eviction_by_size_and_count()
+    test_recently_used_clips_are_kept()
+    test_age_and_access_count_policies()
+    test_sweep_adopts_only_its_own_clips_and_cleans_up()
+    test_clips_put_during_a_sweep_are_kept()
+    test_background_sweeper_enforces_quota()
+    print("✅ Audio cache tests passed!")
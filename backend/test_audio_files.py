@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for serving audio files with ETag, Range and immutable caching
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from services.audio_files import AudioFiles, parse_range, RangeNotSatisfiable
+
+HASHED_NAME = "0123456789abcdef"
+
+
+def _client(directory: str, **limits) -> tuple[TestClient, AudioFiles]:
+    files = AudioFiles(directory, limits.get("max_bytes", 1024 * 1024), limits.get("max_file_bytes", 64 * 1024))
+    return TestClient(Starlette(routes=[Mount("/audio", files)])), files
+
+
+def _write(directory: str, name: str, data: bytes) -> None:
+    with open(os.path.join(directory, name), "wb") as f:
+        f.write(data)
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    # Several ranges or nonsense are answered with the whole file
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("bytes=a-b", 100) is None
+    try:
+        parse_range("bytes=100-", 100)
+        assert False, "expected RangeNotSatisfiable"
+    except RangeNotSatisfiable:
+        pass
+
+
+def test_content_addressed_clips_are_immutable_and_cached_in_memory():
+    data = bytes(range(256)) * 40
+    with tempfile.TemporaryDirectory() as directory:
+        _write(directory, f"{HASHED_NAME}.mp3", data)
+        client, files = _client(directory)
+
+        first = client.get(f"/audio/{HASHED_NAME}.mp3")
+        assert first.status_code == 200 and first.content == data
+        assert first.headers["etag"] == f'"{HASHED_NAME}-mp3"'
+        assert "immutable" in first.headers["cache-control"]
+        assert first.headers["content-type"] == "audio/mpeg"
+
+        second = client.get(f"/audio/{HASHED_NAME}.mp3")
+        assert second.content == data
+        assert files.hot.stats()["hits"] == 1
+
+        revalidated = client.get(f"/audio/{HASHED_NAME}.mp3", headers={"If-None-Match": first.headers["etag"]})
+        assert revalidated.status_code == 304 and not revalidated.content
+        # Weak and listed validators, and "*", match as well
+        for if_none_match in (f'"other", W/{first.headers["etag"]}', '"other", *'):
+            response = client.get(f"/audio/{HASHED_NAME}.mp3", headers={"If-None-Match": if_none_match})
+            assert response.status_code == 304
+
+        # HEAD on a clip served from memory sends the headers only
+        head = client.head(f"/audio/{HASHED_NAME}.mp3")
+        assert head.status_code == 200 and not head.content
+        assert head.headers["content-length"] == str(len(data))
+
+
+def test_range_requests():
+    data = os.urandom(10_000)
+    with tempfile.TemporaryDirectory() as directory:
+        _write(directory, "yes.mp3", data)
+        # Hot (memory) and cold (disk) files answer ranges the same way
+        for max_file_bytes in (64 * 1024, 1024):
+            client, files = _client(directory, max_file_bytes=max_file_bytes)
+            response = client.get("/audio/yes.mp3", headers={"Range": "bytes=100-199"})
+            assert response.status_code == 206
+            assert response.content == data[100:200]
+            assert response.headers["content-range"] == "bytes 100-199/10000"
+
+            tail = client.get("/audio/yes.mp3", headers={"Range": "bytes=-500"})
+            assert tail.content == data[-500:]
+
+            assert client.get("/audio/yes.mp3", headers={"Range": "bytes=20000-"}).status_code == 416
+
+            # A stale If-Range gets the whole file
+            stale = client.get("/audio/yes.mp3", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+            assert stale.status_code == 200 and stale.content == data
+        assert files.cold > 0
+
+
+def test_mutable_files_are_revalidated_and_never_stale():
+    with tempfile.TemporaryDirectory() as directory:
+        _write(directory, "yes.mp3", b"first take")
+        client, _ = _client(directory)
+
+        first = client.get("/audio/yes.mp3")
+        assert first.headers["cache-control"] == "public, no-cache"
+
+        # Re-rendering the clip changes its content-hash ETag
+        _write(directory, "yes.mp3", b"second, longer take")
+        second = client.get("/audio/yes.mp3", headers={"If-None-Match": first.headers["etag"]})
+        assert second.status_code == 200
+        assert second.content == b"second, longer take"
+        assert second.headers["etag"] != first.headers["etag"]
+
+        assert client.get("/audio/missing.mp3").status_code == 404
+        assert client.get("/audio/../main.py").status_code == 404
+
+
+if __name__ == "__main__":
+    test_parse_range()
+    test_content_addressed_clips_are_immutable_and_cached_in_memory()
+    test_range_requests()
+    test_mutable_files_are_revalidated_and_never_stale()
+    print("✅ Audio file serving tests passed!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for reusing the pre-rendered fixed closing phrase
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.tts_service as tts_service
+from services.audio_splice import join_phrases, trim_silence
+from services.tts_service import decode_audio, encode_audio, split_fixed_phrase, splice_fixed_phrase
+
+
+def _tone(seconds: float, sample_rate: int, frequency: float = 220.0) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (0.3 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def test_split_fixed_phrase():
+    assert split_fixed_phrase("Even the brightest star eventually fades... The shell has spoken.") == \
+        ("Even the brightest star eventually fades...", "The shell has spoken.")
+    # Capitalization, spacing and punctuation the model got slightly wrong
+    assert split_fixed_phrase("Seek the sea...the shell  HAS spoken!") == ("Seek the sea...", "The shell has spoken.")
+    # Nothing left to synthesize, or no fixed ending at all
+    assert split_fixed_phrase("...The shell has spoken.") == ("...The shell has spoken.", None)
+    assert split_fixed_phrase("The shell has spoken, and it says no.") == \
+        ("The shell has spoken, and it says no.", None)
+
+
+def test_join_phrases_trims_and_pauses():
+    sr = 24000
+    silence = np.zeros(sr // 2, dtype=np.float32)
+    first = np.concatenate((silence, _tone(1.0, sr), silence))
+    second = np.concatenate((silence, _tone(0.5, sr, 330.0)))
+
+    assert len(trim_silence(first, sr)) < sr * 1.1
+    joined = join_phrases(first, second, sr, gap=0.25, crossfade=0.03)
+    # Leading silence of the first phrase is kept, the silence at the join isn't
+    expected = sr // 2 + sr + int(0.25 * sr) + sr // 2 - int(0.03 * sr)
+    assert abs(len(joined) - expected) < sr * 0.05
+    assert joined.dtype == np.float32
+    assert np.max(np.abs(joined)) < 0.35
+
+
+def test_splice_fixed_phrase_applies_reverb_across_join():
+    sr = 24000
+    variable = encode_audio(_tone(1.0, sr), sr)
+    phrase = (_tone(0.6, 44100, 330.0), 44100)
+    calls = []
+    original = tts_service.add_godly_reverb
+
+    def recording_reverb(audio, sample_rate, **kwargs):
+        calls.append(len(audio))
+        return audio
+
+    tts_service.add_godly_reverb = recording_reverb
+    try:
+        audio, sample_rate = decode_audio(splice_fixed_phrase(variable, phrase, "deep_ah"))
+    finally:
+        tts_service.add_godly_reverb = original
+
+    # The phrase is resampled to the synthesized clip's rate and one reverb pass covers both
+    assert sample_rate == sr
+    assert len(calls) == 1
+    assert abs(len(audio) / sr - 1.8) < 0.15
+
+
+if __name__ == "__main__":
+    test_split_fixed_phrase()
+    test_join_phrases_trims_and_pauses()
+    test_splice_fixed_phrase_applies_reverb_across_join()
+    print("✅ Audio splice tests passed!")
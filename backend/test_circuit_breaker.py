@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-provider circuit breakers
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.llm_service as llm_service
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from services.deadline import HedgedUpstream
+
+
+def _breaker(**options):
+    return CircuitBreaker("fake", failure_rate=0.5, slow_call=options.get("slow_call", 0), window=4,
+                          min_calls=4, open_for=options.get("open_for", 30), probes=1)
+
+
+def _refused(breaker):
+    try:
+        breaker.check()
+    except CircuitOpenError:
+        return True
+    return False
+
+
+async def _collect(pieces):
+    return [piece async for piece in pieces]
+
+
+def test_breaker_opens_on_failures():
+    breaker = _breaker()
+    for ok in (True, False, True):
+        breaker.record(ok, 0.1)
+    # Too few calls to judge
+    assert breaker.state == CLOSED
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+    assert _refused(breaker)
+    stats = breaker.stats()
+    assert stats["opened"] == 1 and stats["rejected"] == 1 and stats["retry_in"] > 0
+
+
+def test_slow_calls_count_as_failures():
+    breaker = _breaker(slow_call=1.0)
+    for _ in range(4):
+        breaker.record(True, 2.0)
+    assert breaker.state == OPEN and breaker.stats()["slow_calls"] == 4
+
+
+def test_half_open_probe_decides():
+    breaker = _breaker(open_for=0.01)
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    time.sleep(0.02)
+    assert breaker.state == HALF_OPEN
+
+    # One probe at a time; a failed probe opens the breaker again
+    assert breaker.check() is True
+    assert _refused(breaker)
+    breaker.record(False, 0.1, probe=True)
+    assert breaker.state == OPEN
+
+    time.sleep(0.02)
+    with breaker.guard():
+        pass
+    assert breaker.state == CLOSED
+
+
+def test_open_breaker_skips_the_upstream():
+    breaker = _breaker()
+    upstream = HedgedUpstream("fake", "fake_stage", hedge=False, percentile=95, min_samples=3, breaker=breaker)
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        raise ConnectionError("down")
+
+    async def scenario():
+        for _ in range(6):
+            try:
+                await upstream.call(failing)
+            except (ConnectionError, CircuitOpenError):
+                pass
+
+    asyncio.run(scenario())
+    # Four failures opened the breaker; the last two calls never reached the provider
+    assert len(attempts) == 4 and breaker.stats()["rejected"] == 2
+
+
+def test_llm_falls_back_at_once_while_gemini_is_open():
+    breaker = llm_service._gemini_calls.breaker
+    calls = []
+
+    class StalledModel:
+        async def generate_content_async(self, *args, **kwargs):
+            calls.append(1)
+            await asyncio.sleep(5)
+
+    original_get_model = llm_service.get_model
+    llm_service.get_model = lambda persona="default": StalledModel()
+    breaker._state, breaker._opened_at = OPEN, time.monotonic()
+    try:
+        started = time.perf_counter()
+        response = asyncio.run(llm_service.get_uncached_llm_response("Is Gemini down?", persona="food"))
+        assert response == llm_service.LLM_ERROR_RESPONSE
+        assert time.perf_counter() - started < 1
+
+        pieces = asyncio.run(_collect(llm_service.stream_llm_response("Is Gemini down?", persona="food")))
+        assert pieces == [llm_service.LLM_ERROR_RESPONSE]
+        # Gemini was never called
+        assert calls == []
+    finally:
+        llm_service.get_model = original_get_model
+        breaker._state = CLOSED
+
+
+if __name__ == "__main__":
+    test_breaker_opens_on_failures()
+    test_slow_calls_count_as_failures()
+    test_half_open_probe_decides()
+    test_open_breaker_skips_the_upstream()
+    test_llm_falls_back_at_once_while_gemini_is_open()
+    print("✅ Circuit breaker tests passed!")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for deadline budgets and hedged upstream calls
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.deadline as deadline
+import services.scraping_service as scraping_service
+import services.tts_service as tts_service
+from config.settings import settings
+from services.circuit_breaker import CircuitBreaker
+from services.deadline import HedgedUpstream, deadline_scope, parse_budgets, remaining, stage_timeout
+
+
+def _upstream(**options):
+    breaker = CircuitBreaker("fake", failure_rate=0.5, slow_call=0, window=20, min_calls=5, open_for=30, probes=1)
+    upstream = HedgedUpstream("fake", "fake_stage", hedge=options.get("hedge", True),
+                              percentile=95, min_samples=options.get("min_samples", 3), breaker=breaker)
+    for latency in options.get("latencies", ()):
+        upstream._latencies.append(latency)
+    return upstream
+
+
+def test_parse_budgets():
+    assert parse_budgets("intent=4000, tts = 1500,bad=x,") == {"intent": 4.0, "tts": 1.5}
+
+
+def test_budgets_nest():
+    assert remaining() is None
+    with deadline_scope(10):
+        outer = remaining()
+        with deadline_scope(1):
+            assert remaining() <= 1
+            # An inner scope never extends the deadline
+            with deadline_scope(60):
+                assert remaining() <= 1
+        assert 9 < remaining() <= outer
+        deadline.stage_budgets["fake_stage"] = 0.5
+        try:
+            assert stage_timeout("fake_stage") == 0.5
+        finally:
+            del deadline.stage_budgets["fake_stage"]
+    assert remaining() is None
+
+
+def test_slow_attempts_are_hedged():
+    attempts = []
+
+    async def attempt():
+        attempts.append(len(attempts))
+        # The first attempt stalls; the hedge answers quickly
+        await asyncio.sleep(5 if len(attempts) == 1 else 0.01)
+        return f"attempt {len(attempts)}"
+
+    upstream = _upstream(latencies=[0.02, 0.02, 0.02])
+    assert upstream.hedge_delay() == 0.02
+    assert asyncio.run(upstream.call(attempt)) == "attempt 2"
+    assert attempts == [0, 1]
+    stats = upstream.stats()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+
+    # Not hedged until enough latencies have been seen
+    assert _upstream(latencies=[0.02]).hedge_delay() is None
+    assert _upstream(hedge=False, latencies=[0.02] * 3).hedge_delay() is None
+
+
+def test_failed_attempt_leaves_the_hedge_to_finish():
+    attempts = []
+
+    async def attempt():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            raise ConnectionError("reset")
+        await asyncio.sleep(0.1)
+        return "hedge"
+
+    upstream = _upstream(latencies=[0.01] * 3)
+    assert asyncio.run(upstream.call(attempt)) == "hedge"
+    assert upstream.stats()["errors"] == 0
+
+
+def test_calls_are_cut_off_at_the_budget():
+    async def stalled():
+        await asyncio.sleep(5)
+
+    upstream = _upstream(hedge=False)
+
+    async def scenario():
+        with deadline_scope(0.05):
+            try:
+                await upstream.call(stalled)
+            except TimeoutError:
+                pass
+            else:
+                raise AssertionError("the stalled call should have timed out")
+            await asyncio.sleep(0.06)
+            # Nothing left: the next call fails without being made
+            try:
+                await upstream.call(stalled)
+            except TimeoutError:
+                return True
+
+    assert asyncio.run(scenario())
+    stats = upstream.stats()
+    assert stats["calls"] == 1 and stats["timeouts"] == 1 and stats["out_of_budget"] == 1
+
+
+def test_search_degrades_to_no_restaurants():
+    original_key = settings.SERPAPI_API_KEY
+    settings.SERPAPI_API_KEY = "test-key"
+
+    async def scenario():
+        with deadline_scope(0.001):
+            await asyncio.sleep(0.01)
+            return await scraping_service.find_restaurants_near(3.14, 101.69, "sushi")
+
+    try:
+        assert asyncio.run(scenario()) == []
+    finally:
+        settings.SERPAPI_API_KEY = original_key
+
+
+def test_blocking_tts_is_held_to_the_budget():
+    class SlowElevenLabs:
+        def __init__(self):
+            self.requests = []
+
+        def generate(self, **options):
+            self.requests.append(options.get("request_options"))
+            for _ in range(5):
+                time.sleep(0.03)
+                yield b"\0\0"
+
+    def raises_timeout(run):
+        try:
+            run()
+        except TimeoutError:
+            return True
+        return False
+
+    client = SlowElevenLabs()
+    tts_service.upstream_clients.elevenlabs_sync = lambda: client
+    try:
+        # Cut off between chunks, with the HTTP client's timeout set from the budget
+        with deadline_scope(0.05):
+            assert raises_timeout(lambda: tts_service.render_speech("Hello there", "deep_ah"))
+        assert client.requests == [{"timeout_in_seconds": 1}]
+        # Streams are cut off the same way (their audio modules are loaded first, outside the budget)
+        import services.audio_splice, services.reverb, services.transcode  # noqa: F401
+        with deadline_scope(0.05):
+            assert raises_timeout(lambda: list(tts_service.stream_speech("Hello there", "deep_ah")))
+
+        # No budget left: ElevenLabs isn't called at all
+        with deadline_scope(0.001):
+            time.sleep(0.01)
+            assert raises_timeout(lambda: tts_service.render_speech("Hello there", "deep_ah"))
+        assert len(client.requests) == 2 and client.requests[1] == {"timeout_in_seconds": 1}
+    finally:
+        del tts_service.upstream_clients.elevenlabs_sync
+
+
+if __name__ == "__main__":
+    test_parse_budgets()
+    test_budgets_nest()
+    test_slow_attempts_are_hedged()
+    test_failed_attempt_leaves_the_hedge_to_finish()
+    test_calls_are_cut_off_at_the_budget()
+    test_search_degrades_to_no_restaurants()
+    test_blocking_tts_is_held_to_the_budget()
+    print("✅ Deadline tests passed!")
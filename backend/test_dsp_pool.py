@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the audio DSP process pool
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from services.dsp_pool import DSPPool
+from services.reverb import apply_godly_reverb
+
+
+def _clip(seconds: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(seconds * sample_rate)) * 0.1).astype(np.float32)
+
+
+def test_pool_matches_inline_reverb():
+    pool = DSPPool(workers=2, max_queue=2, queue_timeout=30)
+    try:
+        audio = _clip(1.5, 22050)
+        expected = apply_godly_reverb(audio, 22050, 0.85, 0.95)
+        actual = pool.reverb(audio, 22050, 0.85, 0.95)
+        assert np.array_equal(actual, expected)
+
+        stats = pool.stats()
+        assert stats["completed"] == 1
+        assert stats["in_flight"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_zero_workers_runs_inline():
+    pool = DSPPool(workers=0, max_queue=0, queue_timeout=0)
+    audio = _clip(0.5, 16000)
+    assert np.array_equal(pool.reverb(audio, 16000, 0.8, 0.9), apply_godly_reverb(audio, 16000, 0.8, 0.9))
+    assert not pool.stats()["running"]
+
+
+def benchmark(workers: int = 4, clips: int = 32, seconds: float = 8.0):
+    """Compare clip throughput of inline DSP and the process pool"""
+    audio = [_clip(seconds, 44100, seed) for seed in range(clips)]
+
+    for pool_workers in (0, workers):
+        pool = DSPPool(workers=pool_workers, max_queue=clips, queue_timeout=60)
+        pool.start()
+        pool.reverb(audio[0], 44100, 0.85, 0.95)
+        with ThreadPoolExecutor(max_workers=max(pool_workers, 1) * 2) as threads:
+            start = time.perf_counter()
+            list(threads.map(lambda clip: pool.reverb(clip, 44100, 0.85, 0.95), audio))
+            elapsed = time.perf_counter() - start
+        pool.shutdown()
+        print(f"{pool_workers} workers: {clips / elapsed:.1f} clips/s")
+
+
+if __name__ == "__main__":
+    test_pool_matches_inline_reverb()
+    test_zero_workers_runs_inline()
+    print("✅ DSP pool tests passed!")
+    benchmark()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent /api/what-to-eat pipeline
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.food_pipeline as food_pipeline_module
+from services.food_pipeline import ANNOYED_VOICE, FoodPipeline, format_server_timing
+from services.scraping_service import RestaurantData
+
+STAGE_DELAY = 0.1
+
+
+def _patch(intent, searches, annoyed_calls):
+    """Replace the upstream stages with slow fakes (intent analysis finishes first); returns a restore function"""
+    async def analyze(question):
+        await asyncio.sleep(STAGE_DELAY)
+        return dict(intent)
+
+    async def search(latitude, longitude, query="restaurants"):
+        searches.append(query)
+        await asyncio.sleep(STAGE_DELAY * 1.5)
+        return [RestaurantData("Shell Diner", "1 Bikini Bottom", latitude, longitude, 4.5, "diner")]
+
+    class FakeSpeech:
+        async def speak(self, prompt, persona, voice="deep_ah", system_prompt="", stage="llm", timings=None):
+            await asyncio.sleep(STAGE_DELAY / 2)
+            timings[stage] = STAGE_DELAY / 2
+            name = prompt.split('"')[1]
+            return f"{name} calls to you... The shell has spoken.", "/audio/generated/description.mp3"
+
+    async def annoyed(question, persona="annoyed"):
+        annoyed_calls.append(question)
+        await asyncio.sleep(STAGE_DELAY * 1.5)
+        return "Ugh, food only... The shell has spoken."
+
+    originals = {name: getattr(food_pipeline_module, name) for name in (
+        "analyze_food_intent", "find_restaurants_near", "speech_pipeline", "get_annoyed_response")}
+    food_pipeline_module.analyze_food_intent = analyze
+    food_pipeline_module.find_restaurants_near = search
+    food_pipeline_module.speech_pipeline = FakeSpeech()
+    food_pipeline_module.get_annoyed_response = annoyed
+
+    def restore():
+        for name, value in originals.items():
+            setattr(food_pipeline_module, name, value)
+    return restore
+
+
+def test_search_runs_alongside_intent_analysis():
+    searches, annoyed_calls = [], []
+    restore = _patch({"is_food_related": True, "search_query": "sushi", "intent": "craving sushi"},
+                     searches, annoyed_calls)
+    try:
+        pipeline = FoodPipeline()
+        plan = asyncio.run(pipeline.plan("Where can I eat good sushi?", 3.14, 101.69, "deep_ah"))
+    finally:
+        restore()
+
+    assert plan.restaurant.name == "Shell Diner"
+    assert plan.message.startswith("Shell Diner")
+    # The description came with its audio
+    assert plan.audio_url == "/audio/generated/description.mp3"
+    assert searches == ["sushi"] and annoyed_calls == []
+    assert set(plan.timings) == {"intent", "search", "description"}
+    # Intent and search overlapped, so one stage's worth of time was saved
+    assert plan.saved > STAGE_DELAY * 0.5
+    assert plan.elapsed < sum(plan.timings.values())
+
+    stats = pipeline.stats()
+    assert stats["requests"] == 1 and stats["searches"]["used"] == 1
+    assert stats["mean_saved_ms"] > 0
+
+
+def test_search_is_redone_when_the_intent_refines_the_phrase():
+    searches, annoyed_calls = [], []
+    restore = _patch({"is_food_related": True, "search_query": "cheap noodle bars", "intent": "wants noodles"},
+                     searches, annoyed_calls)
+    try:
+        pipeline = FoodPipeline()
+        plan = asyncio.run(pipeline.plan("Are aliens real?", 3.14, 101.69, "deep_ah"))
+    finally:
+        restore()
+
+    # The speculative search was thrown away and the refined one used
+    assert searches == ["restaurants", "cheap noodle bars"]
+    assert plan.restaurant is not None
+    # The off-topic guess prepared an annoyed answer, which lost the race
+    assert annoyed_calls == ["Are aliens real?"]
+    assert "annoyed" not in plan.timings
+    stats = pipeline.stats()
+    assert stats["searches"]["redone"] == 1
+    assert stats["annoyed"] == {"started": 1, "used": 0, "cancelled": 1}
+
+
+def test_off_topic_question_cancels_the_search():
+    searches, annoyed_calls = [], []
+    restore = _patch({"is_food_related": False, "search_query": "restaurants", "intent": "asking about aliens"},
+                     searches, annoyed_calls)
+    try:
+        pipeline = FoodPipeline()
+        plan = asyncio.run(pipeline.plan("Are aliens real?", 3.14, 101.69, "rachel"))
+    finally:
+        restore()
+
+    assert plan.voice == ANNOYED_VOICE and plan.restaurant is None
+    assert plan.message.startswith("Ugh")
+    assert "search" not in plan.timings
+    # The annoyed answer was generated while the intent was analyzed
+    assert plan.saved > STAGE_DELAY * 0.5
+    stats = pipeline.stats()
+    assert stats["searches"]["cancelled"] == 1
+    assert stats["annoyed"]["used"] == 1
+
+
+def test_server_timing_header():
+    assert format_server_timing({"intent": 0.0123, "saved": 0.5}) == "intent;dur=12.3, saved;dur=500.0"
+
+
+if __name__ == "__main__":
+    test_search_runs_alongside_intent_analysis()
+    test_search_is_redone_when_the_intent_refines_the_phrase()
+    test_off_topic_question_cancels_the_search()
+    test_server_timing_header()
+    print("✅ Food pipeline tests passed!")
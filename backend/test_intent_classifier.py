@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the local food-intent classifier in front of the LLM
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.llm_service as llm_service
+from evaluate_intent_classifier import evaluate
+from services.intent_classifier import FoodIntentClassifier
+from services.scraping_service import analyze_food_intent
+
+
+def test_classifies_and_extracts_search_phrase():
+    classifier = FoodIntentClassifier(0.9)
+
+    food = classifier.classify("Any halal nasi lemak around here?")
+    assert food.is_food_related and food.confidence > 0.9
+    assert food.search_query == "halal nasi lemak"
+    assert food.intent == "craving halal nasi lemak"
+
+    assert classifier.classify("What should I eat?").search_query == "restaurants"
+    assert classifier.classify("Korean bbq or hotpot?").search_query == "korean bbq hotpot"
+
+    other = classifier.classify("Should I quit my job?")
+    assert not other.is_food_related and other.confidence > 0.9
+
+    # No clue either way: left to the LLM
+    assert classifier.classify("Are aliens real?").confidence < 0.9
+
+
+def test_llm_is_only_asked_below_the_threshold():
+    prompts = []
+
+    async def fake_llm(prompt, system_prompt="", persona="default"):
+        prompts.append(prompt)
+        return '{"is_food_related": false, "search_query": "restaurants", "intent": "asking about aliens"}'
+
+    original = llm_service.get_llm_response
+    llm_service.get_llm_response = fake_llm
+    try:
+        confident = asyncio.run(analyze_food_intent("Where can I eat good sushi?"))
+        assert confident["is_food_related"] and confident["search_query"] == "sushi"
+        assert prompts == []
+
+        unsure = asyncio.run(analyze_food_intent("Are aliens real?"))
+        assert unsure["intent"] == "asking about aliens"
+        assert len(prompts) == 1
+    finally:
+        llm_service.get_llm_response = original
+
+
+def test_evaluation_set():
+    result = evaluate(0.9, repeat=1)
+    assert result.correct / result.total >= 0.9
+    assert result.confident_correct == result.confident
+    assert result.confident / result.total >= 0.5
+
+
+if __name__ == "__main__":
+    test_classifies_and_extracts_search_phrase()
+    test_llm_is_only_asked_below_the_threshold()
+    test_evaluation_set()
+    print("✅ Intent classifier tests passed!")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for micro-batching concurrent LLM calls
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from services.llm_batcher import LLMBatcher, build_batch_prompt, parse_batch_reply
+
+CALL_DELAY = 0.05
+
+
+def _batcher(batch_reply=None, max_items=4):
+    """A batcher whose model answers "answer to <question>" after a short delay"""
+    calls = {"one": [], "batch": []}
+
+    async def generate_one(persona, prompt, system_prompt):
+        calls["one"].append(prompt)
+        await asyncio.sleep(CALL_DELAY)
+        return f"answer to {prompt}"
+
+    async def generate_batch(persona, batch_prompt, count):
+        questions = json.loads(batch_prompt.split("Questions: ", 1)[1])
+        assert len(questions) == count
+        calls["batch"].append(questions)
+        await asyncio.sleep(CALL_DELAY)
+        if batch_reply is not None:
+            return batch_reply(questions)
+        return json.dumps([f"answer to {question}" for question in questions])
+
+    batcher = LLMBatcher({"cryptic"}, window=0.02, max_items=max_items,
+                         generate_one=generate_one, generate_batch=generate_batch)
+    return batcher, calls
+
+
+async def _ask_together(batcher, persona, questions):
+    # The first call finds the persona idle; the rest arrive while it is in flight
+    first = asyncio.create_task(batcher.submit(persona, questions[0], "system"))
+    await asyncio.sleep(0)
+    rest = asyncio.gather(*(batcher.submit(persona, question, "system") for question in questions[1:]))
+    return [await first] + list(await rest)
+
+
+def test_parse_batch_reply():
+    assert parse_batch_reply('["a", "b"]', 2) == ["a", "b"]
+    assert parse_batch_reply('```json\n["a", {"answer": "b"}]\n```', 2) == ["a", "b"]
+    # Blank or non-text items are asked again on their own
+    assert parse_batch_reply('["a", "", 3]', 3) == ["a", None, None]
+    # Wrong length or not JSON: no answer can be matched to its question
+    assert parse_batch_reply('["a"]', 2) is None
+    assert parse_batch_reply("The shell has spoken.", 1) is None
+
+    prompt = build_batch_prompt("You are the conch.", ['Say "hi"', "Why?"])
+    assert prompt.startswith("You are the conch.") and prompt.count("You are the conch.") == 1
+    assert json.loads(prompt.split("Questions: ", 1)[1]) == ['Say "hi"', "Why?"]
+
+
+def test_concurrent_calls_share_one_batch():
+    batcher, calls = _batcher()
+    questions = ["Will I be rich?", "Should I move?", "Is it love?", "Who am I?"]
+    answers = asyncio.run(_ask_together(batcher, "cryptic", questions))
+
+    assert answers == [f"answer to {question}" for question in questions]
+    # The idle call went alone; the three that arrived meanwhile were batched
+    assert calls["one"] == ["Will I be rich?"]
+    assert calls["batch"] == [questions[1:]]
+    stats = batcher.stats()
+    assert stats["singles"] == 1 and stats["batches"] == 1 and stats["mean_batch_size"] == 3
+
+
+def test_full_batches_are_sent_without_waiting():
+    batcher, calls = _batcher(max_items=2)
+    questions = ["q1", "q2", "q3", "q4", "q5"]
+    answers = asyncio.run(_ask_together(batcher, "cryptic", questions))
+
+    assert answers == [f"answer to {question}" for question in questions]
+    assert calls["batch"] == [["q2", "q3"], ["q4", "q5"]]
+
+
+def test_failed_items_are_asked_alone():
+    # One answer is blank, so only that question is asked again
+    batcher, calls = _batcher(lambda questions: json.dumps(["first!", "", "third!"]))
+    answers = asyncio.run(_ask_together(batcher, "cryptic", ["q0", "q1", "q2", "q3"]))
+    assert answers == ["answer to q0", "first!", "answer to q2", "third!"]
+    assert calls["one"] == ["q0", "q2"]
+
+    # A reply that isn't a JSON array sends every question alone
+    batcher, calls = _batcher(lambda questions: "The shell has spoken.")
+    answers = asyncio.run(_ask_together(batcher, "cryptic", ["q0", "q1", "q2"]))
+    assert answers == ["answer to q0", "answer to q1", "answer to q2"]
+    stats = batcher.stats()
+    assert stats["parse_failures"] == 1 and stats["fallbacks"] == 2
+
+
+def test_other_personas_are_never_batched():
+    batcher, calls = _batcher()
+    answers = asyncio.run(_ask_together(batcher, "food", ["q0", "q1", "q2"]))
+    assert answers == ["answer to q0", "answer to q1", "answer to q2"]
+    assert calls["batch"] == [] and len(calls["one"]) == 3
+
+
+if __name__ == "__main__":
+    test_parse_batch_reply()
+    test_concurrent_calls_share_one_batch()
+    test_full_batches_are_sent_without_waiting()
+    test_failed_items_are_asked_alone()
+    test_other_personas_are_never_batched()
+    print("✅ LLM batcher tests passed!")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the tiered LLM response cache
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.llm_service as llm_service
+from services.llm_cache import LLMCache, make_llm_cache_key, parse_cache_policies
+
+POLICIES = {"cryptic": "reuse", "food": "fresh"}
+
+
+def _cache(directory: str, **options) -> LLMCache:
+    return LLMCache(os.path.join(directory, "llm.sqlite3"), options.get("max_entries", 100), 1000,
+                    options.get("ttl", 3600), POLICIES)
+
+
+def _with_fake_model(cache: LLMCache, run):
+    calls = []
+
+    async def fake_generate(full_prompt, persona="default"):
+        calls.append(full_prompt)
+        return f"answer {len(calls)}... The shell has spoken."
+
+    original_generate, original_cache = llm_service._generate, llm_service.llm_cache
+    llm_service._generate, llm_service.llm_cache = fake_generate, cache
+    try:
+        asyncio.run(run())
+    finally:
+        llm_service._generate, llm_service.llm_cache = original_generate, original_cache
+    return calls
+
+
+def test_key_normalizes_the_question():
+    key = make_llm_cache_key("cryptic", "Should I text them?", "system", "model")
+    assert make_llm_cache_key("cryptic", "  should i TEXT them ", "system", "model") == key
+    assert make_llm_cache_key("annoyed", "Should I text them?", "system", "model") != key
+    assert make_llm_cache_key("cryptic", "Should I text them?", "edited system", "model") != key
+    assert make_llm_cache_key("cryptic", "Should I text her?", "system", "model") != key
+    assert parse_cache_policies("cryptic=reuse, food=FRESH, annoyed=sometimes") == POLICIES
+
+
+def test_repeated_questions_skip_the_model():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = _cache(directory)
+
+        async def run():
+            first = await llm_service.get_llm_response("Should I text them?", "system", persona="cryptic")
+            again = await llm_service.get_llm_response("should I text them", "system", persona="cryptic")
+            assert again == first
+            # Always-fresh personas go to the model every time
+            await llm_service.get_llm_response("Pizza?", "system", persona="food")
+            await llm_service.get_llm_response("Pizza?", "system", persona="food")
+
+        calls = _with_fake_model(cache, run)
+        assert len(calls) == 3
+        stats = cache.stats()["personas"]
+        assert stats["cryptic"]["l1_hits"] == 1 and stats["cryptic"]["misses"] == 1
+        assert stats["cryptic"]["hit_rate"] == 0.5
+        assert stats["food"]["bypassed"] == 2
+        cache.close()
+
+
+def test_disk_tier_survives_restart_and_expires():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = _cache(directory)
+
+        async def ask():
+            return await llm_service.get_llm_response("Will it rain?", "system", persona="cryptic")
+
+        assert len(_with_fake_model(cache, ask)) == 1
+        cache.close()
+
+        # A new process starts with an empty L1 and finds the answer on disk
+        restarted = _cache(directory)
+        assert _with_fake_model(restarted, ask) == []
+        assert restarted.stats()["personas"]["cryptic"]["l2_hits"] == 1
+        restarted.close()
+
+        expired = _cache(directory, ttl=-1)
+        key = llm_service.get_llm_cache_key("cryptic", "Will it rain?", "system")
+        asyncio.run(expired.put("cryptic", key, "old answer"))
+        expired.close()
+        assert asyncio.run(_cache(directory).get("cryptic", key)) is None
+
+
+def test_failures_are_not_cached():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = _cache(directory)
+        calls = []
+
+        async def failing_generate(full_prompt, persona="default"):
+            calls.append(full_prompt)
+            raise RuntimeError("quota exceeded")
+
+        async def run():
+            for _ in range(2):
+                response = await llm_service.get_llm_response("Why?", "system", persona="cryptic")
+                assert "technical difficulties" in response
+
+        original_generate, original_cache = llm_service._generate, llm_service.llm_cache
+        llm_service._generate, llm_service.llm_cache = failing_generate, cache
+        try:
+            asyncio.run(run())
+        finally:
+            llm_service._generate, llm_service.llm_cache = original_generate, original_cache
+        assert len(calls) == 2
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_key_normalizes_the_question()
+    test_repeated_questions_skip_the_model()
+    test_disk_tier_survives_restart_and_expires()
+    test_failures_are_not_cached()
+    print("✅ LLM cache tests passed!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus-style /metrics endpoint
+"""
+
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from services.metrics import Counter, Histogram, Metrics, _endpoint
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, "tts")
+    lines = histogram.render()
+
+    assert lines[:2] == ["# HELP stage_seconds Stage time", "# TYPE stage_seconds histogram"]
+    assert 'stage_seconds_bucket{stage="tts",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="tts",le="1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="tts",le="+Inf"} 4' in lines
+    assert 'stage_seconds_sum{stage="tts"} 4.25' in lines
+    assert 'stage_seconds_count{stage="tts"} 4' in lines
+
+
+def test_cache_lookups_are_counted_per_endpoint():
+    metrics = Metrics(enabled=True)
+    token = _endpoint.set("/api/ask-anything")
+    try:
+        metrics.cache_lookup("audio", True)
+        metrics.cache_lookup("audio", True)
+        metrics.cache_lookup("llm", False)
+    finally:
+        _endpoint.reset(token)
+    metrics.cache_lookup("reservoir", False)
+
+    body = metrics.render()
+    assert 'conch_cache_lookups_total{endpoint="/api/ask-anything",cache="audio",result="hit"} 2' in body
+    assert 'conch_cache_lookups_total{endpoint="/api/ask-anything",cache="llm",result="miss"} 1' in body
+    # Lookups outside a request are the background work's
+    assert 'conch_cache_lookups_total{endpoint="background",cache="reservoir",result="miss"} 1' in body
+
+    counter = Counter("quoted_total", "Label escaping", ("text",))
+    counter.inc('say "hi"\n')
+    assert counter.render()[-1] == 'quoted_total{text="say \\"hi\\"\\n"} 1'
+
+
+def test_metrics_endpoint():
+    from main import app
+
+    client = TestClient(app)
+    assert client.get("/api/voices").status_code == 200
+    assert client.get("/api/voices/rachel/available").status_code == 200
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'conch_requests_total{endpoint="/api/voices",method="GET",status="200"}' in body
+    # Path parameters stay out of the labels
+    assert 'endpoint="/api/voices/{voice_name}/available"' in body
+    assert 'conch_request_duration_seconds_count{endpoint="/api/voices"}' in body
+    assert 'conch_stage_duration_seconds_count{stage="serialize"}' in body
+    # The scrape itself is in flight while it is rendered
+    assert 'conch_requests_in_flight{endpoint="/metrics"} 1' in body
+
+
+if __name__ == "__main__":
+    test_histogram_buckets_are_cumulative()
+    test_cache_lookups_are_counted_per_endpoint()
+    test_metrics_endpoint()
+    print("✅ Metrics tests passed!")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-persona Gemini model registry
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.llm_service as llm_service
+from services.llm_cache import LLMCache
+
+
+class FakeGenAI:
+    """Records the models created and the requests sent to them"""
+
+    def __init__(self, reply):
+        self.models = []
+        self.requests = []
+        self.reply = reply
+
+    def GenerativeModel(self, model_name, system_instruction=None, generation_config=None):
+        genai = self
+
+        class Model:
+            async def generate_content_async(self, contents, generation_config=None):
+                genai.requests.append((system_instruction, contents, generation_config))
+                return type("Response", (), {"text": genai.reply})()
+
+        self.models.append((model_name, system_instruction, generation_config))
+        return Model()
+
+
+def _with_fake_genai(reply, run):
+    genai = FakeGenAI(reply)
+    originals = llm_service.upstream_clients.gemini, llm_service._models, llm_service.llm_cache
+    with tempfile.TemporaryDirectory() as directory:
+        # No persona reuses answers, so every request reaches the model
+        llm_service.upstream_clients.gemini = lambda: genai
+        llm_service._models = {}
+        llm_service.llm_cache = LLMCache(os.path.join(directory, "llm.sqlite3"), 100, 1000, 3600, {})
+        try:
+            return run(), genai
+        finally:
+            llm_service.upstream_clients.gemini, llm_service._models, llm_service.llm_cache = originals
+
+
+def test_generation_configs():
+    assert llm_service.get_generation_config("cryptic") == {"max_output_tokens": 384}
+    intent = llm_service.get_generation_config("food_intent")
+    assert intent["response_mime_type"] == "application/json"
+    assert intent["response_schema"]["required"] == ["is_food_related", "search_query", "intent"]
+    # Reservoir personas answer with the model of the persona they fill in for
+    assert llm_service.get_generation_config("annoyed_reservoir") == llm_service.get_generation_config("annoyed")
+    assert llm_service.get_generation_config("default") == {}
+
+
+def test_cache_key_follows_the_instruction():
+    key = llm_service.get_llm_cache_key("cryptic", "Will it rain?")
+    assert llm_service.get_llm_cache_key("cryptic", "will it rain") == key
+    assert llm_service.get_llm_cache_key("cryptic", "Will it rain?", "extra") != key
+
+    original = llm_service.PERSONA_MODELS["cryptic"]
+    llm_service.PERSONA_MODELS["cryptic"] = original._replace(instruction=lambda: "An edited prompt")
+    try:
+        assert llm_service.get_llm_cache_key("cryptic", "Will it rain?") != key
+    finally:
+        llm_service.PERSONA_MODELS["cryptic"] = original
+
+
+def test_requests_send_only_the_question():
+    async def scenario():
+        await llm_service.get_uncached_llm_response("Should I move?", persona="annoyed")
+        await llm_service.get_uncached_llm_response("Should I stay?", persona="annoyed_reservoir")
+        await llm_service.get_uncached_llm_response("Why?", "You are a rock.")
+
+    _, genai = _with_fake_genai("Ugh. The shell has spoken.", lambda: asyncio.run(scenario()))
+
+    # One model for the annoyed persona and its reservoir, one plain model
+    assert len(genai.models) == 2
+    assert genai.models[0][1] == llm_service.get_annoyed_prompt()
+    assert genai.models[0][2] == {"max_output_tokens": 384}
+    assert genai.models[1][1] is None
+    assert [contents for _, contents, _ in genai.requests] == \
+        ["Should I move?", "Should I stay?", "You are a rock.\n\nUser question: Why?"]
+
+
+def test_batches_get_room_for_every_answer():
+    reply = json.dumps(["Maybe.", "Never."])
+    text, genai = _with_fake_genai(reply, lambda: asyncio.run(
+        llm_service._generate_batch("cryptic", "Questions: [\"a\", \"b\"]", 2)))
+
+    assert text == reply
+    generation_config = genai.requests[0][2]
+    assert generation_config["max_output_tokens"] == 384 * 2
+    assert generation_config["response_schema"] == {"type": "array", "items": {"type": "string"}}
+
+
+if __name__ == "__main__":
+    test_generation_configs()
+    test_cache_key_follows_the_instruction()
+    test_requests_send_only_the_question()
+    test_batches_get_room_for_every_answer()
+    print("✅ Persona model tests passed!")
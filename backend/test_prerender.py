@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental batch pre-render
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.prerender as prerender_module
+from services.prerender import PrerenderManifest, catalog_jobs, prerender
+
+CATALOG = {"Yes": ["Yes.", "It is certain."], "No": ["No.", "Never."]}
+
+
+def _jobs(directory):
+    return catalog_jobs(CATALOG, ["deep_ah"],
+                        lambda answer, text, voice: os.path.join(directory, voice, f"{text[:-1]}.mp3"))
+
+
+def test_renders_with_bounded_concurrency():
+    active = 0
+    peak = 0
+
+    async def fake_render(text, voice):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return f"audio:{text}".encode()
+
+    with tempfile.TemporaryDirectory() as directory:
+        manifest = PrerenderManifest(os.path.join(directory, "manifest.json"))
+        result = asyncio.run(prerender(_jobs(directory), manifest, concurrency=2, render=fake_render))
+
+        assert len(result.rendered) == 4 and not result.skipped and not result.failed
+        assert peak == 2
+        # Clips go straight to their final paths
+        with open(os.path.join(directory, "deep_ah", "Never.mp3"), "rb") as f:
+            assert f.read() == b"audio:Never."
+        assert os.path.exists(manifest.path)
+
+
+def test_skips_unchanged_and_renders_changed_lines():
+    calls = []
+
+    async def fake_render(text, voice):
+        calls.append(text)
+        if text == "Never.":
+            raise RuntimeError("quota exceeded")
+        return text.encode()
+
+    original = prerender_module.get_audio_cache_key
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            manifest = PrerenderManifest(os.path.join(directory, "manifest.json"))
+            first = asyncio.run(prerender(_jobs(directory), manifest, render=fake_render))
+            assert list(first.failed) == [os.path.join(directory, "deep_ah", "Never.mp3")]
+
+            # Only the failed line is retried on the next run
+            calls.clear()
+            reloaded = PrerenderManifest(manifest.path).load()
+            second = asyncio.run(prerender(_jobs(directory), reloaded, render=fake_render))
+            assert calls == ["Never."]
+            assert len(second.skipped) == 3
+
+            # A rendering tweak changes every key, so everything is rendered again
+            calls.clear()
+            prerender_module.get_audio_cache_key = lambda text, voice: "tweaked:" + original(text, voice)
+            third = asyncio.run(prerender(_jobs(directory), PrerenderManifest(manifest.path).load(),
+                                          render=fake_render))
+            assert sorted(calls) == sorted(text for lines in CATALOG.values() for text in lines)
+            assert len(third.rendered) == 3
+        finally:
+            prerender_module.get_audio_cache_key = original
+
+
+def test_adopts_existing_clips_and_prunes_removed_lines():
+    async def fake_render(text, voice):
+        return text.encode()
+
+    with tempfile.TemporaryDirectory() as directory:
+        jobs = _jobs(directory)
+        os.makedirs(os.path.dirname(jobs[0].path))
+        with open(jobs[0].path, "wb") as f:
+            f.write(b"hand-picked")
+
+        manifest = PrerenderManifest(os.path.join(directory, "manifest.json"))
+        result = asyncio.run(prerender(jobs, manifest, render=fake_render))
+        assert result.skipped == [jobs[0].path]
+        assert manifest.entries[jobs[0].path]["adopted"]
+
+        removed = manifest.prune(jobs[2:])
+        assert sorted(removed) == sorted(job.path for job in jobs[:2])
+        # Adopted files are kept, rendered ones are deleted
+        assert os.path.exists(jobs[0].path)
+        assert not os.path.exists(jobs[1].path)
+
+
+if __name__ == "__main__":
+    test_renders_with_bounded_concurrency()
+    test_skips_unchanged_and_renders_changed_lines()
+    test_adopts_existing_clips_and_prunes_removed_lines()
+    print("✅ Pre-render tests passed!")
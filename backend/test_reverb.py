@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the godly reverb engine
+Checks the cached impulse response against the original slice-add implementation
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from services.reverb import StreamingReverb, apply_godly_reverb, get_impulse_response
+
+
+def reference_godly_reverb(audio: np.ndarray, sample_rate: int,
+                           reverb_decay: float = 0.8, room_size: float = 0.9) -> np.ndarray:
+    """The original float64 slice-add reverb, kept as the sound we must match"""
+    reverb_delays = [0.03, 0.07, 0.13, 0.19, 0.29, 0.41, 0.53]
+    reverb_gains = [0.6, 0.5, 0.4, 0.35, 0.3, 0.25, 0.2]
+
+    reverb_length = int(sample_rate * 2.0 * room_size)
+    output_audio = np.zeros(len(audio) + reverb_length)
+    output_audio[:len(audio)] = audio
+
+    for delay, gain in zip(reverb_delays, reverb_gains):
+        delay_samples = int(delay * sample_rate)
+        end_idx = delay_samples + len(audio)
+        if end_idx <= len(output_audio):
+            output_audio[delay_samples:end_idx] += audio * gain * reverb_decay
+
+    for i in range(3):
+        tail_delay = int(sample_rate * (0.1 + i * 0.15))
+        tail_gain = reverb_decay * (0.3 - i * 0.08)
+        if tail_delay + len(audio) <= len(output_audio):
+            output_audio[tail_delay:tail_delay + len(audio)] += audio * tail_gain
+
+    kernel = np.ones(3) / 3
+    output_audio = np.convolve(output_audio, kernel, mode='same')
+
+    max_val = np.max(np.abs(output_audio))
+    if max_val > 0.95:
+        output_audio = output_audio * (0.95 / max_val)
+    return output_audio
+
+
+def _voice_like_signal(seconds: float, sample_rate: int) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    return (0.4 * envelope * np.sin(2 * np.pi * 110 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def test_matches_reference_sound():
+    for sample_rate, decay, room in [(44100, 0.85, 0.95), (22050, 0.8, 0.9), (16000, 0.5, 0.1)]:
+        audio = _voice_like_signal(2.5, sample_rate)
+        expected = reference_godly_reverb(audio.astype(np.float64), sample_rate, decay, room)
+        actual = apply_godly_reverb(audio, sample_rate, decay, room)
+
+        assert actual.dtype == np.float32
+        assert actual.shape == expected.shape
+        assert np.max(np.abs(actual - expected)) < 1e-4
+
+
+def test_quiet_signal_is_not_normalized():
+    audio = _voice_like_signal(1.0, 22050) * 0.01
+    expected = reference_godly_reverb(audio.astype(np.float64), 22050)
+    actual = apply_godly_reverb(audio, 22050)
+    assert np.max(np.abs(actual - expected)) < 1e-6
+
+
+def test_impulse_response_is_cached():
+    first = get_impulse_response(44100, 0.85, 0.95)
+    assert get_impulse_response(44100, 0.85, 0.95) is first
+    assert first.delays[0] == 0
+    # Dry signal + 7 reflections + 3 diffusion layers
+    assert len(first.delays) == 11
+
+
+def test_streaming_matches_one_shot():
+    """Block-wise processing with carried state renders the same clip"""
+    rng = np.random.default_rng(3)
+    audio = _voice_like_signal(2.0, 16000) * 0.02
+    expected = apply_godly_reverb(audio, 16000, 0.85, 0.95)
+
+    reverb = StreamingReverb(16000, 0.85, 0.95)
+    blocks, position = [], 0
+    while position < len(audio):
+        size = int(rng.integers(1, 4000))
+        blocks.append(reverb.process(audio[position:position + size]))
+        position += size
+    blocks.append(reverb.flush())
+    actual = np.concatenate(blocks)
+
+    assert actual.shape == expected.shape
+    assert np.max(np.abs(actual - expected)) < 1e-6
+
+
+def test_streaming_never_clips():
+    reverb = StreamingReverb(16000, 0.85, 0.95)
+    loud = _voice_like_signal(1.0, 16000) * 2.5
+    output = np.concatenate([reverb.process(loud[i:i + 1024]) for i in range(0, len(loud), 1024)]
+                            + [reverb.flush()])
+    assert np.max(np.abs(output)) <= 0.95 + 1e-6
+
+
+def benchmark(seconds: float = 8.0, sample_rate: int = 44100, runs: int = 5):
+    """Compare per-clip DSP time of the reference and the cached engine"""
+    audio = _voice_like_signal(seconds, sample_rate)
+    for name, fn in [("reference", reference_godly_reverb), ("engine", apply_godly_reverb)]:
+        fn(audio, sample_rate, 0.85, 0.95)
+        start = time.perf_counter()
+        for _ in range(runs):
+            fn(audio, sample_rate, 0.85, 0.95)
+        print(f"{name:>10}: {(time.perf_counter() - start) / runs * 1000:.1f} ms per {seconds:.0f}s clip")
+
+
+if __name__ == "__main__":
+    test_matches_reference_sound()
+    test_quiet_signal_is_not_normalized()
+    test_impulse_response_is_cached()
+    test_streaming_matches_one_shot()
+    test_streaming_never_clips()
+    print("✅ Reverb matches the reference sound")
+    benchmark()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for single-flight coalescing of upstream calls
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.llm_service as llm_service
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    group = SingleFlight("test")
+    calls = []
+
+    async def upstream(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def scenario():
+        results = await asyncio.gather(*[group.do("same", lambda: upstream(21)) for _ in range(5)],
+                                       group.do("other", lambda: upstream(1)))
+        assert results == [42] * 5 + [2]
+        # Once finished, the next call goes upstream again
+        assert await group.do("same", lambda: upstream(21)) == 42
+
+    asyncio.run(scenario())
+    assert calls == [21, 1, 21]
+    stats = group.stats()
+    assert stats["calls"] == 3
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_errors_reach_every_caller():
+    group = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        results = await asyncio.gather(*[group.do("key", failing) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(scenario())
+    assert group.stats()["errors"] == 1
+    assert group.stats()["coalesced"] == 2
+
+
+def test_cancellation():
+    group = SingleFlight("test")
+    finished = []
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+        return "done"
+
+    async def scenario():
+        # A cancelled caller doesn't cancel the call for the others
+        first = asyncio.create_task(group.do("key", slow))
+        second = asyncio.create_task(group.do("key", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+        assert first.cancelled()
+
+        # Once every caller is gone the upstream call is cancelled too
+        only = asyncio.create_task(group.do("key", slow))
+        await asyncio.sleep(0.01)
+        only.cancel()
+        await asyncio.sleep(0.06)
+        # A new caller starts a fresh call instead of joining the cancelled one
+        assert await group.do("key", slow) == "done"
+
+    asyncio.run(scenario())
+    assert len(finished) == 2
+    assert group.stats()["cancelled"] == 1
+
+
+def test_blocking_calls_share_one_result():
+    group = SingleFlight("test")
+    calls = []
+    started = threading.Event()
+
+    def upstream():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "clip"
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(group.do_sync, "key", upstream)
+        started.wait()
+        followers = [pool.submit(group.do_sync, "key", upstream) for _ in range(3)]
+        assert leader.result() == "clip"
+        assert [f.result() for f in followers] == ["clip"] * 3
+
+    assert len(calls) == 1
+    assert group.stats()["coalesced"] == 3
+
+
+def test_llm_prompts_are_coalesced():
+    calls = []
+
+    async def fake_generate(full_prompt, persona="default"):
+        calls.append(full_prompt)
+        await asyncio.sleep(0.01)
+        return "Perhaps... The shell has spoken."
+
+    original = llm_service._generate
+    llm_service._generate = fake_generate
+    try:
+        async def scenario():
+            return await asyncio.gather(*[llm_service.get_llm_response("Will it rain?", "system") for _ in range(4)])
+
+        assert asyncio.run(scenario()) == ["Perhaps... The shell has spoken."] * 4
+        assert len(calls) == 1
+    finally:
+        llm_service._generate = original
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_result()
+    test_errors_reach_every_caller()
+    test_cancellation()
+    test_blocking_calls_share_one_result()
+    test_llm_prompts_are_coalesced()
+    print("✅ Single-flight tests passed!")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Tests for speaking streamed LLM answers sentence by sentence
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.llm_service as llm_service
+import services.speech_pipeline as speech_pipeline_module
+from services.speech_pipeline import SpeechPipeline, split_sentences
+from services.tts_service import decode_audio, match_fixed_phrase, stitch_sentences
+
+CHUNKS = ["The tide", " turns. Ah... The moon", " weeps for you! The shell has spoken."]
+CHUNK_DELAY = 0.05
+
+
+async def _stream(chunks, delay=0.0):
+    for chunk in chunks:
+        await asyncio.sleep(delay)
+        yield chunk
+
+
+async def _collect(sentences):
+    return [sentence async for sentence in sentences]
+
+
+class FakeAudioCache:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, url):
+        self.entries[key] = url
+
+    def relative_path(self, key, extension="mp3"):
+        return f"{key[:2]}/{key}.{extension}"
+
+
+def _patch(**fakes):
+    originals = {name: getattr(speech_pipeline_module, name) for name in fakes}
+    for name, value in fakes.items():
+        setattr(speech_pipeline_module, name, value)
+
+    def restore():
+        for name, value in originals.items():
+            setattr(speech_pipeline_module, name, value)
+    return restore
+
+
+def test_split_sentences():
+    sentences = asyncio.run(_collect(split_sentences(_stream(CHUNKS), min_chars=10)))
+    # "Ah..." is too short on its own, so it joins the next sentence
+    assert sentences == ["The tide turns.", "Ah... The moon weeps for you!", "The shell has spoken."]
+
+    assert asyncio.run(_collect(split_sentences(_stream(["One. Two. Three"])))) == ["One.", "Two.", "Three"]
+    assert asyncio.run(_collect(split_sentences(_stream(["", "  "])))) == []
+    assert match_fixed_phrase(sentences[-1]) == "The shell has spoken."
+
+
+def test_sentences_are_synthesized_while_the_answer_streams():
+    stream_done = []
+    render_started = []
+    written = {}
+
+    async def stream(prompt, system_prompt="", persona="default"):
+        async for chunk in _stream(CHUNKS, CHUNK_DELAY):
+            yield chunk
+        stream_done.append(time.perf_counter())
+
+    async def no_cache(prompt, system_prompt="", persona="default"):
+        return None
+
+    async def render(sentence, voice="deep_ah"):
+        render_started.append((sentence, time.perf_counter()))
+        await asyncio.sleep(CHUNK_DELAY)
+        return np.zeros(100, dtype=np.float32), 22050
+
+    restore = _patch(
+        stream_llm_response=stream,
+        get_cached_llm_response=no_cache,
+        is_streaming_available=lambda: True,
+        render_sentence_async=render,
+        stitch_sentences=lambda segments, voice: b"stitched-%d" % len(segments),
+        write_audio_file=lambda path, data: written.update({path: data}),
+        audio_cache=FakeAudioCache(),
+    )
+    try:
+        pipeline = SpeechPipeline(enabled=True, concurrency=2, min_sentence_chars=10)
+        timings = {}
+        text, audio_url = asyncio.run(pipeline.speak("Will I be rich?", "cryptic", stage="answer", timings=timings))
+    finally:
+        restore()
+
+    assert text == "The tide turns. Ah... The moon weeps for you! The shell has spoken."
+    # Only the answer's streaming is timed as the stage, not the audio after it
+    assert len(CHUNKS) * CHUNK_DELAY <= timings["answer"] < pipeline.stats()["mean_total_ms"] / 1000
+    assert [sentence for sentence, _ in render_started] == \
+        ["The tide turns.", "Ah... The moon weeps for you!", "The shell has spoken."]
+    # The first sentence went to TTS before Gemini had finished the answer
+    assert render_started[0][1] < stream_done[0]
+    assert list(written.values()) == [b"stitched-3"]
+    assert audio_url == "/" + list(written)[0]
+
+    stats = pipeline.stats()
+    assert stats["pipelined"] == 1 and stats["mean_sentences"] == 3
+    assert 0 < stats["mean_first_sentence_ms"] < stats["mean_total_ms"]
+
+
+def test_cached_answers_and_failures_render_whole():
+    rendered_whole = []
+
+    async def cached(prompt, system_prompt="", persona="default"):
+        return "The answer you seek was sought before. The shell has spoken." if persona == "cryptic" else None
+
+    async def stream(prompt, system_prompt="", persona="default"):
+        async for chunk in _stream(CHUNKS):
+            yield chunk
+
+    async def failing_render(sentence, voice="deep_ah"):
+        raise RuntimeError("ElevenLabs is down")
+
+    async def whole(text, voice="deep_ah"):
+        rendered_whole.append(text)
+        return "/audio/generated/whole.mp3"
+
+    restore = _patch(
+        stream_llm_response=stream,
+        get_cached_llm_response=cached,
+        is_streaming_available=lambda: True,
+        render_sentence_async=failing_render,
+        generate_audio_for_text_async=whole,
+        audio_cache=FakeAudioCache(),
+    )
+    try:
+        pipeline = SpeechPipeline(enabled=True, concurrency=2, min_sentence_chars=10)
+        text, audio_url = asyncio.run(pipeline.speak("Again?", "cryptic"))
+        assert text.startswith("The answer you seek") and audio_url == "/audio/generated/whole.mp3"
+
+        text, audio_url = asyncio.run(pipeline.speak("A place to eat", "food"))
+        assert text.endswith("The shell has spoken.") and audio_url == "/audio/generated/whole.mp3"
+    finally:
+        restore()
+
+    assert len(rendered_whole) == 2
+    stats = pipeline.stats()
+    assert stats["cached"] == 1 and stats["failed"] == 1 and stats["pipelined"] == 0
+
+
+def test_answers_that_break_off_are_not_spoken():
+    rendered_whole = []
+    written = {}
+    audio_cache = FakeAudioCache()
+
+    class BrokenStream:
+        def __init__(self):
+            self.chunks = iter(CHUNKS[:1])
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                raise ConnectionError("stream reset")
+            return type("Chunk", (), {"text": chunk})()
+
+    class BrokenModel:
+        async def generate_content_async(self, contents, stream=False):
+            return BrokenStream()
+
+    async def no_cache(prompt, system_prompt="", persona="default"):
+        return None
+
+    async def render(sentence, voice="deep_ah"):
+        return np.zeros(100, dtype=np.float32), 22050
+
+    async def whole(text, voice="deep_ah"):
+        rendered_whole.append(text)
+        return "/audio/generated/error.mp3"
+
+    original_get_model = llm_service.get_model
+    llm_service.get_model = lambda persona="default": BrokenModel()
+    restore = _patch(
+        get_cached_llm_response=no_cache,
+        is_streaming_available=lambda: True,
+        render_sentence_async=render,
+        generate_audio_for_text_async=whole,
+        stitch_sentences=lambda segments, voice: b"stitched",
+        write_audio_file=lambda path, data: written.update({path: data}),
+        audio_cache=audio_cache,
+    )
+    try:
+        # Gemini breaks off after the first chunk
+        pieces = []
+
+        async def read_stream():
+            async for piece in llm_service.stream_llm_response("Will I be rich?", persona="food"):
+                pieces.append(piece)
+
+        try:
+            asyncio.run(read_stream())
+        except llm_service.LLMStreamTruncated:
+            pass
+        else:
+            raise AssertionError("the broken stream should have been reported")
+        assert pieces == CHUNKS[:1]
+
+        pipeline = SpeechPipeline(enabled=True, concurrency=2, min_sentence_chars=10)
+        text, audio_url = asyncio.run(pipeline.speak("Will I be rich?", "food"))
+    finally:
+        restore()
+        llm_service.get_model = original_get_model
+
+    assert text == llm_service.LLM_ERROR_RESPONSE
+    assert audio_url == "/audio/generated/error.mp3"
+    assert rendered_whole == [llm_service.LLM_ERROR_RESPONSE]
+    # Nothing of the partial answer was stitched or cached
+    assert written == {} and audio_cache.entries == {}
+    assert pipeline.stats()["truncated"] == 1 and pipeline.stats()["pipelined"] == 0
+
+
+def test_identical_answers_share_one_stream():
+    streams = []
+    asked = []
+
+    async def stream(prompt, system_prompt="", persona="default"):
+        streams.append(prompt)
+        async for chunk in _stream(CHUNKS, CHUNK_DELAY):
+            yield chunk
+
+    async def no_cache(prompt, system_prompt="", persona="default"):
+        return None
+
+    async def render(sentence, voice="deep_ah"):
+        return np.zeros(100, dtype=np.float32), 22050
+
+    async def uncached(prompt, system_prompt="", persona="default"):
+        asked.append(prompt)
+        return "The shell has spoken."
+
+    async def whole(text, voice="deep_ah"):
+        return "/audio/generated/whole.mp3"
+
+    restore = _patch(
+        stream_llm_response=stream,
+        get_cached_llm_response=no_cache,
+        get_uncached_llm_response=uncached,
+        generate_audio_for_text_async=whole,
+        is_streaming_available=lambda: True,
+        render_sentence_async=render,
+        stitch_sentences=lambda segments, voice: b"stitched",
+        write_audio_file=lambda path, data: None,
+        audio_cache=FakeAudioCache(),
+    )
+
+    async def scenario(pipeline):
+        return await asyncio.gather(*(pipeline.speak("Will I be rich?", "cryptic") for _ in range(3)))
+
+    try:
+        pipeline = SpeechPipeline(enabled=True, concurrency=2, min_sentence_chars=10)
+        answers = asyncio.run(scenario(pipeline))
+        # Without the pipeline the answer comes from the coalesced, hedged Gemini call
+        unpipelined = SpeechPipeline(enabled=False, concurrency=2, min_sentence_chars=10)
+        text, audio_url = asyncio.run(unpipelined.speak("Will I be poor?", "cryptic"))
+    finally:
+        restore()
+
+    assert streams == ["Will I be rich?"]
+    assert len(set(answers)) == 1
+    assert pipeline.stats()["pipelined"] == 1
+    assert asked == ["Will I be poor?"] and audio_url == "/audio/generated/whole.mp3"
+
+
+def test_stitch_sentences():
+    t = np.arange(4800) / 24000
+    first = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    second = (0.3 * np.sin(2 * np.pi * 330 * np.arange(9600) / 48000)).astype(np.float32)
+
+    audio, sample_rate = decode_audio(stitch_sentences([(first, 24000), (second, 48000)], voice="rachel"))
+    assert sample_rate == 24000
+    # Both sentences with a pause between them
+    assert len(audio) > len(first) + len(second) // 2
+
+
+if __name__ == "__main__":
+    test_split_sentences()
+    test_sentences_are_synthesized_while_the_answer_streams()
+    test_cached_answers_and_failures_render_whole()
+    test_answers_that_break_off_are_not_spoken()
+    test_identical_answers_share_one_stream()
+    test_stitch_sentences()
+    print("✅ Speech pipeline tests passed!")
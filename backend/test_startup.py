@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tests for backend startup cost
+Importing main.py must stay within the import time budget and leave the provider SDKs and DSP libraries unloaded
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from import_time_report import IMPORT_TIME_BUDGET_MS, loaded_lazy_modules, measure_import, total_import_ms
+
+
+def test_main_imports_no_heavy_libraries():
+    timings = measure_import("main")
+    assert loaded_lazy_modules(timings) == []
+
+
+def test_main_import_within_budget():
+    # Take the best of a few runs so a busy machine doesn't fail the budget
+    best = min(total_import_ms(measure_import("main")) for _ in range(3))
+    assert best <= IMPORT_TIME_BUDGET_MS, f"{best:.0f} ms > {IMPORT_TIME_BUDGET_MS} ms"
+
+
+def test_main_import_does_not_read_env_file():
+    # The global services read settings when first used, not when main imports them
+    timings = measure_import("main")
+    assert "dotenv" not in {t.module for t in timings}
+
+
+if __name__ == "__main__":
+    test_main_imports_no_heavy_libraries()
+    test_main_import_within_budget()
+    test_main_import_does_not_read_env_file()
+    print("✅ Startup tests passed!")
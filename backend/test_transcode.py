@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for audio format negotiation and cached transcodes
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import services.transcode as transcode
+from config.settings import settings
+from services.transcode import get_audio_url_for_format, negotiate_audio_format, resample
+from services.tts_service import StreamingEncoder
+
+
+def _tone(seconds: float, sample_rate: int, frequency: float = 220.0) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (0.3 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def test_negotiation():
+    original = settings.FFMPEG_PATH
+    settings.FFMPEG_PATH = "/nonexistent/ffmpeg"
+    try:
+        assert negotiate_audio_format() == "mp3"
+        assert negotiate_audio_format("OPUS") == "opus"
+        # The request field wins over the Accept header
+        assert negotiate_audio_format("mp3", "audio/ogg") == "mp3"
+        assert negotiate_audio_format(None, "audio/mpeg;q=0.5, audio/ogg;q=0.9") == "opus"
+        assert negotiate_audio_format(None, "audio/ogg;q=0, audio/mpeg") == "mp3"
+        assert negotiate_audio_format(None, "application/json, */*") == "mp3"
+        # Formats that can't be encoded here fall back to MP3 instead of the next choice
+        assert negotiate_audio_format("aac") == "mp3"
+        assert negotiate_audio_format("flac") == "mp3"
+        assert negotiate_audio_format(None, "audio/aac, audio/ogg;q=0.8") == "opus"
+    finally:
+        settings.FFMPEG_PATH = original
+
+
+def test_resample_keeps_pitch_and_duration():
+    audio = _tone(1.0, 44100)
+    resampled = resample(audio, 44100, 24000)
+    assert len(resampled) == 24000
+    peak_bin = int(np.argmax(np.abs(np.fft.rfft(resampled))))
+    assert abs(peak_bin - 220) <= 1
+
+
+def test_transcode_is_cached_next_to_master():
+    calls = []
+    original = transcode.transcode
+
+    def counting_transcode(data, audio_format):
+        calls.append(audio_format)
+        return original(data, audio_format)
+
+    transcode.transcode = counting_transcode
+    try:
+        with tempfile.TemporaryDirectory(dir=backend_dir) as directory:
+            # A real spoken clip, as rendered for the classic answers
+            master = os.path.join(directory, "clip.mp3")
+            shutil.copyfile(os.path.join(settings.CLASSIC_AUDIO_DIR, "british_lady", "Maybe.mp3"), master)
+            master_url = "/" + os.path.relpath(master)
+
+            url = get_audio_url_for_format(master_url, "opus")
+            assert url == master_url[:-len("mp3")] + "ogg"
+            assert get_audio_url_for_format(master_url, "opus") == url
+            assert calls == ["opus"]
+
+            audio, sample_rate = sf.read(url.lstrip("/"))
+            assert sample_rate == 24000
+            assert abs(len(audio) / sample_rate - sf.info(master).duration) < 0.1
+            # Opus speech is a fraction of the MP3 master
+            assert os.path.getsize(url.lstrip("/")) < os.path.getsize(master) / 2
+
+            assert get_audio_url_for_format(master_url, "mp3") == master_url
+    finally:
+        transcode.transcode = original
+
+
+def test_missing_master_falls_back_to_its_url():
+    url = "/audio/classic/deep_ah_placeholder.mp3"
+    assert get_audio_url_for_format(url, "opus") == url
+
+
+def test_streaming_opus_encoder():
+    encoder = StreamingEncoder(24000, "OGG", subtype="OPUS", compression_level=0.9)
+    audio = _tone(1.0, 24000)
+    data = b"".join(encoder.encode(audio[i:i + 2400]) for i in range(0, len(audio), 2400)) + encoder.close()
+    decoded, sample_rate = sf.read(io.BytesIO(data))
+    assert sample_rate == 24000
+    assert abs(len(decoded) - len(audio)) < 2400
+
+
+if __name__ == "__main__":
+    test_negotiation()
+    test_resample_keeps_pitch_and_duration()
+    test_transcode_is_cached_next_to_master()
+    test_missing_master_falls_back_to_its_url()
+    test_streaming_opus_encoder()
+    print("✅ Transcode tests passed!")
@@ -55,7 +55,7 @@ def test_vampire_voice():
     print("- The vampire voice should have a deep, eastern European accent")
     print("- Divine reverb effects should add ethereal, heavenly atmosphere")
     print("- Perfect for mystical conch responses")
-    print("- Files with '_godly_reverb' suffix have enhanced cathedral-like effects")
+    print("- Divine reverb is applied in memory before the clip is saved")
 
 
 def test_voice_comparison():